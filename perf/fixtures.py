@@ -0,0 +1,103 @@
+"""Synthetic outputs of wrk and wrk2, used by micro-benchmarks."""
+import json
+import uuid
+import random
+from pathlib import Path
+from datetime import datetime
+from wrktoolbox.benchmarks import BenchmarkSuite, BenchmarkConfig
+from wrktoolbox.stores.fs import JsonFileSystemBenchmarkOutputStore
+from wrktoolbox.wrkoutput import BenchmarkOutput
+
+
+WRK_OUTPUT = """
+Running 30s test @ https://foo.org/api/alive
+  10 threads and 400 connections
+  Thread Stats   Avg      Stdev     Max   +/- Stdev
+    Latency   376.96ms  268.10ms   1.25s    72.09%
+    Req/Sec     4.72      4.12    10.00     58.49%
+  Latency Distribution
+     50%  454.07ms
+     75%  555.73ms
+     90%  625.97ms
+     99%    1.24s
+  829 requests in 30.06s, 294.68KB read
+  Socket errors: connect 0, read 0, write 0, timeout 12
+  Non-2xx or 3xx responses: 829
+Requests/sec:     27.58
+Transfer/sec:      9.80KB
+"""
+
+WRK2_HEAD = """
+Running 30s test @ https://foo.org/api/alive
+  10 threads and 100 connections
+  Thread calibration: mean lat.: 180.088ms, rate sampling interval: 506ms
+  Thread Stats   Avg      Stdev     Max   +/- Stdev
+    Latency   161.91ms  150.49ms 876.03ms   95.00%
+    Req/Sec     0.33      0.70     2.00    100.00%
+  Latency Distribution (HdrHistogram - Recorded Latency)
+ 50.000%  129.15ms
+ 75.000%  142.46ms
+ 90.000%  148.09ms
+ 99.000%  873.98ms
+ 99.900%  876.54ms
+ 99.990%  876.54ms
+ 99.999%  876.54ms
+100.000%  876.54ms
+
+  Detailed Percentile spectrum:
+       Value   Percentile   TotalCount 1/(1-Percentile)
+
+"""
+
+WRK2_TAIL = """#[Mean    =      161.908, StdDeviation   =      150.488]
+#[Max     =      876.032, Total count    =        {count}]
+#[Buckets =           27, SubBuckets     =         2048]
+----------------------------------------------------------
+  {count} requests in 30.01s, 42.66KB read
+Requests/sec:      4.00
+Transfer/sec:      1.42KB
+"""
+
+
+def get_wrk2_output(spectrum_size: int) -> str:
+    """Returns an output of wrk2 with a detailed percentile spectrum of the given number of lines."""
+    lines = []
+    for index in range(spectrum_size - 1):
+        percentile = 1 - 0.5 ** (index * 20 / spectrum_size)
+        lines.append(f'{50 + index * 800 / spectrum_size:12.3f} {percentile:12.6f} '
+                     f'{index + 1:12d} {1 / (1 - percentile):12.2f}')
+    lines.append(f'{876.543:12.3f} {1:12.6f} {spectrum_size:12d} {"inf":>12}')
+    return WRK2_HEAD + '\n'.join(lines) + '\n' + WRK2_TAIL.format(count=spectrum_size)
+
+
+def get_outputs(count: int, raw_output: str = WRK_OUTPUT):
+    return [BenchmarkOutput.parse(raw_output, start_time=datetime.utcnow(), end_time=datetime.utcnow(),
+                                  test_id='alive')
+            for _ in range(count)]
+
+
+def write_archive(folder: Path, size: int, seed: int = 0) -> Path:
+    """Writes a JSON archive of a suite with the given number of outputs. A single output is stored using
+    the JSON store, then copied with new ids, so that large archives are created quickly."""
+    rng = random.Random(seed)
+    folder.mkdir(parents=True, exist_ok=True)
+
+    configuration = BenchmarkConfig('https://foo.org/api/alive', test_id='alive')
+    suite = BenchmarkSuite([configuration], [], None, start_time=datetime.utcnow())
+    output = BenchmarkOutput.parse(WRK_OUTPUT, suite_id=suite.id, start_time=datetime.utcnow(),
+                                   end_time=datetime.utcnow(), test_id='alive')
+    JsonFileSystemBenchmarkOutputStore(str(folder)).store(configuration, output)
+
+    source = next(folder.glob(f'*{output.id}*.json'))
+    data = json.loads(source.read_text())
+    source.unlink()
+    prefix = source.name[:-len(f'{output.id}.json')]
+
+    for _ in range(size):
+        output_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+        data['id'] = output_id
+        suite.benchmarks_ids.append(output_id)
+        (folder / f'{prefix}{output_id}.json').write_text(json.dumps(data))
+
+    JsonFileSystemBenchmarkOutputStore(str(folder)).store_suite(suite)
+    return folder
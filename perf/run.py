@@ -0,0 +1,237 @@
+"""
+Micro-benchmarks of wrktoolbox hot paths: startup of the CLI, parsing of wrk and wrk2 outputs, file system stores
+with each compression codec and the JSON importer, on plain and compacted archives. Results are saved in perf/results, to be compared across versions:
+
+    python perf/run.py
+    python perf/run.py --sizes 1000,10000,100000 --compare perf/results/<previous>.json
+"""
+import os
+import sys
+import json
+import logging
+import time
+import shutil
+import platform
+import argparse
+import statistics
+import subprocess
+import tempfile
+from pathlib import Path
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from wrktoolbox import version, compression  # noqa: E402
+from wrktoolbox.compaction import ArchiveCompactor  # noqa: E402
+from wrktoolbox.benchmarks import BenchmarkConfig, BenchmarkSuite  # noqa: E402
+from wrktoolbox.commands import import_builtin_types  # noqa: E402
+from wrktoolbox.results.importers.fs import JsonResultsImporter  # noqa: E402
+from wrktoolbox.stores.fs import JsonFileSystemBenchmarkOutputStore, BinFileSystemBenchmarkOutputStore  # noqa: E402
+from wrktoolbox.wrkoutput import BenchmarkOutput  # noqa: E402
+from perf.fixtures import WRK_OUTPUT, get_wrk2_output, get_outputs, write_archive  # noqa: E402
+
+
+RESULTS_FOLDER = ROOT / 'perf' / 'results'
+
+
+def measure(function: Callable[[], int], repeat: int) -> Dict[str, float]:
+    """Calls a function returning the number of operations it ran, and returns the operations per second
+    of the median run."""
+    rates = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        operations = function()
+        rates.append(operations / (time.perf_counter() - start))
+    return {
+        'ops_per_second': round(statistics.median(rates), 2),
+        'min_ops_per_second': round(min(rates), 2),
+        'max_ops_per_second': round(max(rates), 2),
+        'repeat': repeat
+    }
+
+
+def startup_benchmark(args: List[str], number: int) -> Callable[[], int]:
+    """Starts the CLI in new processes, like orchestration scripts do; startup time is dominated by imports."""
+    command = [sys.executable, '-c', 'from wrktoolbox.main import main; main()', *args]
+
+    def run():
+        for _ in range(number):
+            subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=str(ROOT), check=True)
+        return number
+    return run
+
+
+def parse_benchmark(raw_output: str, number: int) -> Callable[[], int]:
+    def run():
+        for _ in range(number):
+            BenchmarkOutput.parse(raw_output)
+        return number
+    return run
+
+
+def store_benchmark(store_type, folder: Path, number: int) -> Callable[[], int]:
+    configuration = BenchmarkConfig('https://foo.org/api/alive', test_id='alive')
+    outputs = get_outputs(number)
+
+    def run():
+        shutil.rmtree(folder, ignore_errors=True)
+        store = store_type(str(folder))
+        for output in outputs:
+            store.store(configuration, output)
+        return number
+    return run
+
+
+def compression_benchmark(codec: Optional[str], folder: Path, number: int) -> Dict[str, float]:
+    """Stores and imports outputs of wrk2 with a detailed percentile spectrum, using compact JSON compressed with
+    the given codec; returns write and read rates, and the size of files per output."""
+    configuration = BenchmarkConfig('https://foo.org/api/alive', test_id='alive')
+    outputs = get_outputs(number, get_wrk2_output(256))
+    suite = BenchmarkSuite([configuration], [], None, benchmarks_ids=[output.id for output in outputs],
+                           start_time=datetime.utcnow())
+
+    def write():
+        shutil.rmtree(folder, ignore_errors=True)
+        store = JsonFileSystemBenchmarkOutputStore(str(folder), compression=codec, indent=None)
+        for output in outputs:
+            store.store(configuration, output)
+        store.store_suite(suite)
+        return number
+
+    result = {'write_' + name: value for name, value in measure(write, 3).items() if 'ops' in name}
+    result.update({'read_' + name: value for name, value in measure(import_benchmark(folder), 3).items()})
+    result['ops_per_second'] = result['read_ops_per_second']
+    result['bytes_per_output'] = round(sum(path.stat().st_size for path in folder.glob('alive-*')) / number, 1)
+    return result
+
+
+def import_benchmark(folder: Path) -> Callable[[], int]:
+    def run():
+        importer = JsonResultsImporter(str(folder))
+        count = 0
+        for report in importer.import_suites():
+            for _ in importer.import_results(report):
+                count += 1
+        return count
+    return run
+
+
+def suite_benchmark(folder: Path, number: int) -> Callable[[], int]:
+    """Runs suites of benchmarks with the fake wrk executable, measuring the overhead of wrktoolbox
+    per benchmark: process creation, parsing, goals and stores."""
+    logger = logging.getLogger('wrktoolbox.perf')
+    import_builtin_types()
+
+    def run():
+        shutil.rmtree(folder, ignore_errors=True)
+        suite = BenchmarkSuite.from_dict({
+            'executable': f'{sys.executable} -m wrktoolbox.fakewrk',
+            'configurations': [{'url': f'https://foo.org/api/{index}', 'duration': 10, 'threads': 2}
+                               for index in range(number)],
+            'stores': [{'type': 'json', 'output_folder': str(folder)}],
+            'goals': ['no-errors', {'type': 'avg-latency', 'limit': 100}]
+        })
+        suite.run(logger)
+        return number
+    return run
+
+
+def run_benchmarks(sizes: List[int], spectrum_sizes: List[int], repeat: int) -> Dict[str, Dict[str, float]]:
+    results = {}
+
+    def add(name, function, times=repeat):
+        results[name] = measure(function, times)
+        print(f'{name:<32} {results[name]["ops_per_second"]:>14,.2f} ops/s', flush=True)
+
+    add('startup_help', startup_benchmark(['--help'], 10))
+    add('startup_run_help', startup_benchmark(['run', '--help'], 10))
+    add('parse_wrk', parse_benchmark(WRK_OUTPUT, 200))
+    for size in spectrum_sizes:
+        add(f'parse_wrk2_spectrum_{size}', parse_benchmark(get_wrk2_output(size), max(5, 20000 // size)))
+
+    with tempfile.TemporaryDirectory() as temp:
+        temp = Path(temp)
+        add('store_json', store_benchmark(JsonFileSystemBenchmarkOutputStore, temp / 'json', 500))
+        add('store_bin', store_benchmark(BinFileSystemBenchmarkOutputStore, temp / 'bin', 500))
+        add('suite_fakewrk', suite_benchmark(temp / 'suite', 20), 1)
+
+        for codec in (None, 'gzip', 'xz', 'zstd'):
+            if codec and not compression.is_available(codec):
+                continue
+            name = f'compression_{codec or "none"}'
+            results[name] = compression_benchmark(codec, temp / name, 200)
+            print(f'{name:<32} {results[name]["write_ops_per_second"]:>14,.2f} writes/s '
+                  f'{results[name]["read_ops_per_second"]:>10,.2f} reads/s '
+                  f'{results[name]["bytes_per_output"]:>10,.0f} bytes/output', flush=True)
+
+        for size in sizes:
+            folder = write_archive(temp / f'archive_{size}', size)
+            # large archives are imported once
+            add(f'import_json_{size}', import_benchmark(folder), 1 if size >= 10000 else repeat)
+
+            ArchiveCompactor(str(folder)).run(logging.getLogger('wrktoolbox.perf'))
+            add(f'import_segment_{size}', import_benchmark(folder), 1 if size >= 10000 else repeat)
+
+            ArchiveCompactor(str(folder), compact_after=0).run(logging.getLogger('wrktoolbox.perf'))
+            add(f'import_compacted_{size}', import_benchmark(folder), 1 if size >= 10000 else repeat)
+            shutil.rmtree(folder)
+    return results
+
+
+def get_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=str(ROOT),
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: Dict[str, Dict[str, float]], previous_file: str):
+    with open(previous_file, mode='rt', encoding='utf8') as file:
+        previous = json.load(file)
+
+    print(f'\nCompared with {previous["version"]} ({previous.get("commit")}, {previous["time"]}):')
+    for name, result in results.items():
+        reference = previous['results'].get(name)
+        if reference:
+            change = result['ops_per_second'] / reference['ops_per_second'] - 1
+            print(f'{name:<32} {change:>+8.1%}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Runs micro-benchmarks of wrktoolbox hot paths.')
+    parser.add_argument('--sizes', default='1000,10000', help='Sizes of synthetic archives imported.')
+    parser.add_argument('--spectrum-sizes', default='32,256,2048',
+                        help='Lines of detailed percentile spectrums in parsed wrk2 outputs.')
+    parser.add_argument('--repeat', default=5, type=int, help='Repetitions of each benchmark.')
+    parser.add_argument('--compare', default=None, help='Path of previous results to compare with.')
+    parser.add_argument('--output', default=None, help='Path of the results file.')
+    args = parser.parse_args()
+
+    results = run_benchmarks([int(value) for value in args.sizes.split(',')],
+                             [int(value) for value in args.spectrum_sizes.split(',')],
+                             args.repeat)
+
+    now = datetime.utcnow()
+    output_file = args.output or str(RESULTS_FOLDER / f'{version}-{now.strftime("%Y%m%dT%H%M%S")}.json')
+    os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+
+    with open(output_file, mode='wt', encoding='utf8') as file:
+        json.dump({
+            'version': version,
+            'commit': get_commit(),
+            'time': now.isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': results
+        }, file, indent=4)
+    print(f'Results written to {output_file}')
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
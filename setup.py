@@ -27,6 +27,7 @@ setup(name='wrktools',
                 'wrktoolbox.stores',
                 'wrktoolbox.plugins',
                 'wrktoolbox.goals',
+                'wrktoolbox.collectors',
                 'wrktoolbox.commands',
                 'wrktoolbox.reports',
                 'wrktoolbox.results',
@@ -41,4 +42,5 @@ setup(name='wrktools',
       entry_points="""
       [console_scripts]
       wrktoolbox=wrktoolbox.main:main
+      fakewrk=wrktoolbox.fakewrk:main
       """)
@@ -0,0 +1,109 @@
+import sys
+import json
+from datetime import datetime
+import pytest
+from wrktoolbox.benchmarks import BenchmarkSuite, BenchmarkConfig
+from wrktoolbox.commands import import_builtin_types
+from wrktoolbox.stores.fs import JsonFileSystemBenchmarkOutputStore
+from wrktoolbox.wrkoutput import BenchmarkOutput
+
+
+FAKE_WRK = f'{sys.executable} -m wrktoolbox.fakewrk'
+
+OUTPUT_TEMPLATE = """
+Running 30s test @ {url}
+  4 threads and 50 connections
+  Thread Stats   Avg      Stdev     Max   +/- Stdev
+    Latency   {latency:.2f}ms   10.00ms 500.00ms   90.00%
+    Req/Sec   250.00     20.00   300.00     70.00%
+  Latency Distribution
+     50%  {latency:.2f}ms
+     75%  {p75:.2f}ms
+     90%  {p90:.2f}ms
+     99%  {p99:.2f}ms
+  30000 requests in 30.00s, 10.00MB read
+Requests/sec:   {rps:.2f}
+Transfer/sec:    340.00KB
+"""
+
+
+def get_raw_output(url: str, rps: float, latency: float) -> str:
+    return OUTPUT_TEMPLATE.format(url=url, rps=rps, latency=latency, p75=latency * 1.2, p90=latency * 1.5,
+                                  p99=latency * 3)
+
+
+@pytest.fixture
+def make_output():
+    """Returns a function creating an output of wrk with the given throughput and average latency."""
+    def make(url: str, rps: float, latency: float, **kwargs) -> BenchmarkOutput:
+        return BenchmarkOutput.parse(get_raw_output(url, rps, latency), **kwargs)
+    return make
+
+
+@pytest.fixture
+def write_suite():
+    """Returns a function storing a suite in a folder with the JSON store, with outputs of wrk for each
+    test id, given as a list of (requests per second, average latency) tuples."""
+    def write(folder, values):
+        configurations = [BenchmarkConfig(f'https://foo.org/{test_id}', threads=4, concurrency=50, duration=30,
+                                          test_id=test_id, repeat=len(runs))
+                          for test_id, runs in values.items()]
+        suite = BenchmarkSuite(configurations, [], None, start_time=datetime.utcnow())
+        store = JsonFileSystemBenchmarkOutputStore(str(folder))
+
+        for configuration, runs in zip(configurations, values.values()):
+            for rps, latency in runs:
+                output = BenchmarkOutput.parse(get_raw_output(configuration.url, rps, latency),
+                                               suite_id=suite.id, start_time=datetime.utcnow(),
+                                               end_time=datetime.utcnow(), test_id=configuration.test_id)
+                suite.benchmarks_ids.append(output.id)
+                store.store(configuration, output)
+
+        store.store_suite(suite)
+        return suite
+    return write
+
+
+@pytest.fixture(scope='session', autouse=True)
+def builtin_types():
+    """Registers the built-in goals, stores, importers and report writers used in settings, like commands do."""
+    import_builtin_types()
+
+
+@pytest.fixture
+def fake_wrk():
+    """Returns the command running the fake wrk executable."""
+    return FAKE_WRK
+
+
+@pytest.fixture
+def suite_settings():
+    """Returns a function creating settings of a suite running short benchmarks of https://foo.org with the fake
+    wrk executable, storing outputs in a folder with the JSON store; keyword arguments override settings."""
+    def create(output_folder, **settings):
+        return dict({
+            'executable': FAKE_WRK,
+            'base_url': 'https://foo.org',
+            'duration': 1,
+            'threads': 2,
+            'stores': [{'type': 'json', 'output_folder': str(output_folder)}]
+        }, **settings)
+    return create
+
+
+@pytest.fixture
+def write_settings(tmp_path):
+    """Returns a function writing settings in a file of the temporary folder, returning the path of the file."""
+    def write(settings, file_name='settings.json'):
+        settings_file = tmp_path / file_name
+        settings_file.write_text(json.dumps(settings))
+        return str(settings_file)
+    return write
+
+
+@pytest.fixture
+def import_outputs():
+    """Returns a function importing the outputs of all suites with an importer."""
+    def import_all(importer):
+        return [output for report in importer.import_suites() for output in importer.import_results(report)]
+    return import_all
@@ -0,0 +1,100 @@
+import random
+import logging
+import pytest
+from pytest import raises
+from rocore.exceptions import InvalidArgument
+from wrktoolbox.ab import ABTest, PairedDifference, bootstrap_interval, compare_pairs
+from wrktoolbox.benchmarks import BenchmarkSuite, Benchmark
+from wrktoolbox.wrkoutput import BenchmarkOutput, LatencyDistributionResult
+
+
+def get_output(rps, p99, **kwargs):
+    return BenchmarkOutput(requests_per_second=rps,
+                           latency_distribution=LatencyDistributionResult([[50, p99 / 2, 'ms'],
+                                                                           [99, p99, 'ms']]),
+                           **kwargs)
+
+
+def test_bootstrap_interval_contains_mean():
+    values = [1.0, 2.0, 3.0, 4.0, 5.0]
+    low, high = bootstrap_interval(values, 0.95, 1000, random.Random(1))
+    assert low < 3 < high
+    assert low >= 1 and high <= 5
+
+
+@pytest.mark.parametrize('higher_is_better,low,high,expected_verdict', [
+    [True, -20, -5, 'regression'],
+    [True, 5, 20, 'improvement'],
+    [True, -5, 5, 'no-difference'],
+    [False, 5, 20, 'regression'],
+    [False, -20, -5, 'improvement'],
+    [True, -8, -2, 'no-difference']
+])
+def test_paired_difference_verdict(higher_is_better, low, high, expected_verdict):
+    difference = PairedDifference('metric', higher_is_better, 1000, 990, (low + high) / 2, low, high, 0.95,
+                                  tolerance=0.005 if low == -8 else 0)
+    assert difference.verdict == expected_verdict
+
+
+def test_compare_pairs_detects_regression_despite_drift():
+    # drift affects both variants in a round, B is consistently slower by about 5%
+    pairs = [(get_output(1000 + drift, 100), get_output(950 + drift, 100)) for drift in [0, 80, -60, 150, 30, -40]]
+    results = {item.metric: item for item in compare_pairs(pairs, ABTest({'url': 'a'}, {'url': 'b'}, seed=1,
+                                                                         percentiles=[99]))}
+
+    assert results['requests_per_second'].verdict == 'regression'
+    assert results['requests_per_second'].mean_difference == pytest.approx(-50)
+    assert results['p99_latency_ms'].verdict == 'no-difference'
+
+
+@pytest.mark.parametrize('value', [
+    {'a': {}, 'b': {}},
+    {'a': {'url': 'a'}, 'b': {'url': 'b'}, 'rounds': 1},
+    {'a': {'url': 'a'}, 'b': {'url': 'b'}, 'confidence': 95},
+    ['a', 'b']
+])
+def test_ab_test_raises_for_invalid_configuration(value):
+    with raises(InvalidArgument):
+        ABTest.from_configuration(value)
+
+
+def test_suite_runs_ab_test(monkeypatch):
+    def fake_run(self, logger=None, suite_id=None, **kwargs):
+        config = self.config
+        rps = 1000 if config.parameters['variant'] == 'a' else 800
+        return get_output(rps, 100, url=config.url, test_id=config.test_id, group=config.group,
+                          parameters=config.parameters)
+
+    monkeypatch.setattr(Benchmark, 'run', fake_run)
+
+    suite = BenchmarkSuite.from_dict({
+        'benchmarks': [
+            {
+                'test_id': 'builds',
+                'duration': 5,
+                'ab': {
+                    'a': {'url': 'https://old.foo.org'},
+                    'b': {'url': 'https://new.foo.org'},
+                    'rounds': 3,
+                    'seed': 0
+                }
+            }
+        ],
+        'stores': []
+    })
+    stored = []
+    monkeypatch.setattr(suite, 'store_output', lambda configuration, output: stored.append(output))
+
+    outputs = suite.run_ab_test(suite.configurations[0], logging.getLogger('tests'))
+
+    assert [output.url for output in outputs] == ['https://old.foo.org', 'https://new.foo.org'] * 3
+    assert [output.parameters for output in outputs[:2]] == [{'variant': 'a', 'round': 0},
+                                                               {'variant': 'b', 'round': 0}]
+    assert all(output.group == 'builds' for output in outputs)
+    assert stored == outputs
+
+    verdict = outputs[-1].goals_results[0]
+    assert verdict.success is False
+    assert verdict.details['metric'] == 'requests_per_second'
+    assert verdict.details['verdict'] == 'regression'
+    assert 'details' in verdict.to_dict()
@@ -1,4 +1,5 @@
 import pytest
+import logging
 from pytest import raises
 from rocore.exceptions import InvalidArgument
 # noinspection PyUnresolvedReferences
@@ -137,3 +138,74 @@ def test_benchmark_suite_root_settings(root_setting, value):
     assert conf['configurations'][0][root_setting] == value
     assert conf['configurations'][1][root_setting] == '$'
     assert conf['configurations'][2][root_setting] == value
+
+
+def test_benchmark_suite_expands_matrix():
+    suite = BenchmarkSuite.from_dict({
+        'threads': 4,
+        'benchmarks': [
+            {
+                'test_id': 'alive',
+                'url': 'https://foo.org',
+                'matrix': {
+                    'concurrency': [10, 50, 100, 400],
+                    'threads': [2, 8]
+                }
+            },
+            {
+                'url': 'https://foo.org/about'
+            }
+        ],
+        'stores': []
+    })
+
+    assert len(suite.configurations) == 9
+    first = suite.configurations[0]
+    assert first.test_id == 'alive_concurrency_10_threads_2'
+    assert first.group == 'alive'
+    assert first.parameters == {'concurrency': 10, 'threads': 2}
+    assert (first.concurrency, first.threads) == (10, 2)
+    assert [(item.concurrency, item.threads) for item in suite.configurations[:8]] == [
+        (10, 2), (10, 8), (50, 2), (50, 8), (100, 2), (100, 8), (400, 2), (400, 8)
+    ]
+    assert suite.configurations[8].group is None
+    assert suite.configurations[8].threads == 4
+
+
+@pytest.mark.parametrize('value,expected_values', [
+    [[10, 20], [10, 20]],
+    [100, [100]],
+    [{'start': 100, 'stop': 400, 'step': 100}, [100, 200, 300, 400]],
+    [{'start': 10, 'stop': 100, 'factor': 2}, [10, 20, 40, 80]],
+    [{'start': 1, 'stop': 10, 'factor': 1.5}, [1, 2, 3, 5, 8]]
+])
+def test_benchmark_suite_matrix_values(value, expected_values):
+    items = list(BenchmarkSuite.expand_matrix({'url': 'https://foo.org',
+                                                'matrix': {'responses_per_second': value}}, 0))
+
+    assert [item['responses_per_second'] for item in items] == expected_values
+    assert all(item['group'] == 'matrix_0' for item in items)
+
+
+@pytest.mark.parametrize('matrix', [
+    {'headers': [{'a': 'a'}]},
+    {'concurrency': {'start': 10}},
+    {'concurrency': {'start': 10, 'stop': 100, 'step': 0}}
+])
+def test_benchmark_suite_matrix_raises_for_invalid_configuration(matrix):
+    with raises(InvalidArgument):
+        list(BenchmarkSuite.expand_matrix({'url': 'https://foo.org', 'matrix': matrix}, 0))
+
+
+def test_benchmark_suite_warns_for_large_matrices(monkeypatch, caplog):
+    monkeypatch.setattr(BenchmarkSuite, 'matrix_size_warning', 5)
+    configuration = {'test_id': 'large', 'url': 'https://foo.org', 'matrix': {'concurrency': [10, 20, 40]}}
+
+    with caplog.at_level(logging.WARNING):
+        assert len(list(BenchmarkSuite.expand_matrix(configuration, 0))) == 3
+        assert not caplog.records
+
+        configuration['matrix']['threads'] = [2, 4]
+        assert len(list(BenchmarkSuite.expand_matrix(configuration, 0))) == 6
+
+    assert 'The matrix of `large` generates 6 configurations' in caplog.text
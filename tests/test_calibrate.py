@@ -0,0 +1,93 @@
+import json
+import socket
+import logging
+import http.client
+import pytest
+from rocore.exceptions import InvalidArgument
+from wrktoolbox.benchmarks import BenchmarkConfig, BenchmarkSuite, HostData
+from wrktoolbox.calibration import Calibration, CalibrationRun, calibrate, get_generator_settings
+from wrktoolbox.commands.calibrate import calibrate_core
+from wrktoolbox.sink import SinkServer
+
+
+def test_sink_answers_keep_alive_requests():
+    with SinkServer(workers=2) as sink:
+        connection = http.client.HTTPConnection(sink.host, sink.port, timeout=5)
+        for method, body in (('GET', None), ('POST', b'{"hello": "world"}'), ('GET', None)):
+            connection.request(method, '/foo', body=body)
+            response = connection.getresponse()
+            assert response.status == 200
+            assert response.read() == b'OK'
+        connection.close()
+
+
+def test_sink_answers_pipelined_requests():
+    with SinkServer() as sink:
+        with socket.create_connection((sink.host, sink.port), timeout=5) as sock:
+            sock.sendall(b'GET / HTTP/1.1\r\nHost: a\r\n\r\n'
+                         b'POST / HTTP/1.1\r\nHost: a\r\nContent-Length: 5\r\n\r\nhello'
+                         b'GET / HTTP/1.1\r\nHost: a\r\n\r\n')
+            data = b''
+            while data.count(b'200 OK') < 3:
+                chunk = sock.recv(4096)
+                assert chunk
+                data += chunk
+
+    assert data.count(b'HTTP/1.1 200 OK') == 3
+
+
+def test_generator_settings_are_distinct():
+    configurations = [BenchmarkConfig('http://a/', threads=2, concurrency=10),
+                      BenchmarkConfig('http://b/', threads=2, concurrency=10),
+                      BenchmarkConfig('http://a/', threads=4, concurrency=100)]
+
+    assert get_generator_settings(configurations) == [(2, 10), (4, 100)]
+
+
+def test_host_generator_ceiling_by_settings():
+    host = HostData(cpu_count=4, env={})
+    assert host.get_generator_ceiling(2, 10) is None
+
+    host.use_calibration(Calibration([CalibrationRun(2, 10, 5000.0), CalibrationRun(4, 100, 20000.0)]))
+
+    assert host.generator_ceiling == 20000.0
+    assert host.get_generator_ceiling(2, 10) == 5000.0
+    assert host.get_generator_ceiling(8, 200) == 20000.0
+    assert HostData(**host.to_dict()).get_generator_ceiling(2, 10) == 5000.0
+
+
+def test_calibrate_runs_against_sink(fake_wrk):
+    configurations = [BenchmarkConfig('https://foo.org/', threads=2, concurrency=10, executable=fake_wrk,
+                                      responses_per_second=100, script='foo.lua'),
+                      BenchmarkConfig('https://foo.org/', threads=2, concurrency=50, executable=fake_wrk)]
+
+    calibration = calibrate(configurations, duration=1, workers=1)
+
+    assert [(run.threads, run.concurrency) for run in calibration.runs] == [(2, 10), (2, 50)]
+    assert calibration.generator_ceiling == max(run.requests_per_second for run in calibration.runs)
+    assert calibration.runs[1].requests_per_second > calibration.runs[0].requests_per_second
+
+
+def test_suite_uses_calibration_file(tmp_path, caplog, suite_settings, write_settings):
+    settings = suite_settings(tmp_path, concurrency=10, benchmarks=[{'url': '/test1'}])
+    calibration_file = tmp_path / 'calibration.json'
+
+    calibrate_core(write_settings(settings), duration=1, workers=1, output_file=str(calibration_file))
+
+    data = json.loads(calibration_file.read_text())
+    assert data['runs'][0]['threads'] == 2
+    assert data['generator_ceiling'] > 0
+
+    suite = BenchmarkSuite.from_dict(dict(settings, calibration=str(calibration_file)))
+    assert suite.host.get_generator_ceiling(2, 10) == data['generator_ceiling']
+
+    with caplog.at_level(logging.WARNING):
+        suite.run(logging.getLogger('test'))
+
+    # fakewrk outputs the same values against the target and against the sink
+    assert 'near the ceiling of the load generator' in caplog.text
+
+
+def test_missing_calibration_file():
+    with pytest.raises(InvalidArgument):
+        Calibration.load('does-not-exist.json')
@@ -0,0 +1,166 @@
+import csv
+import time
+import pickle
+import threading
+import pytest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from wrktoolbox.benchmarks import BenchmarkSuite, BenchmarkConfig
+from wrktoolbox.collectors import MetricsCollector, PrometheusCollector, MetricSeries, CollectorsContext
+from wrktoolbox.collectors.collector import downsample
+from wrktoolbox.collectors.prometheus import parse_metrics
+from wrktoolbox.reports import MetricsTableWriter
+from wrktoolbox.results import SuiteReport
+
+
+METRICS_TEMPLATE = """# HELP process_cpu_seconds_total Total user and system CPU time spent in seconds.
+# TYPE process_cpu_seconds_total counter
+process_cpu_seconds_total {cpu}
+# HELP queue_depth Requests waiting to be handled.
+# TYPE queue_depth gauge
+queue_depth{{worker="1"}} 4
+queue_depth{{worker="2"}} 6
+# TYPE request_duration_seconds summary
+request_duration_seconds{{quantile="0.99"}} 0.25
+request_duration_seconds_sum 1500.5
+request_duration_seconds_count 9000
+go_goroutines 12
+"""
+
+
+class Handler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+    clients = set()
+    started = time.monotonic()
+
+    def do_GET(self):
+        Handler.clients.add(self.client_address)
+        body = METRICS_TEMPLATE.format(cpu=(time.monotonic() - Handler.started) * 0.5).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def metrics_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}/metrics'
+    server.shutdown()
+    server.server_close()
+
+
+def test_parse_metrics():
+    values = parse_metrics(METRICS_TEMPLATE.format(cpu=10.5))
+
+    assert values['process_cpu_seconds_total'] == ('counter', 10.5)
+    assert values['queue_depth{worker="2"}'] == ('gauge', 6)
+    assert values['request_duration_seconds{quantile="0.99"}'] == ('gauge', 0.25)
+    assert values['request_duration_seconds_count'] == ('counter', 9000)
+    assert values['go_goroutines'] == ('gauge', 12)
+
+
+def test_downsample():
+    points = [(float(t), float(t * 2)) for t in range(100)]
+    result = downsample(points, 10)
+
+    assert len(result) == 10
+    assert result[0] == (4.5, 9.0)
+    assert downsample(points[:5], 10) == points[:5]
+
+
+def test_prometheus_collector_polls_over_keep_alive_connection(metrics_url):
+    Handler.clients.clear()
+    collector = MetricsCollector.from_configuration({'type': 'prometheus',
+                                                     'url': metrics_url,
+                                                     'metrics': ['process_*', 'queue_depth'],
+                                                     'interval': 0.05,
+                                                     'name': 'api'})
+    collector.start()
+    time.sleep(0.5)
+    series = collector.stop()
+
+    assert set(series) == {'api:process_cpu_seconds_total', 'api:queue_depth{worker="1"}',
+                           'api:queue_depth{worker="2"}'}
+    assert len(Handler.clients) == 1
+
+    cpu = series['api:process_cpu_seconds_total']
+    assert cpu.kind == 'rate'
+    assert cpu.avg_value == pytest.approx(0.5, rel=0.2)
+    assert series['api:queue_depth{worker="1"}'].points[0][1] == 4
+
+
+def test_prometheus_collector_in_suite_configuration(metrics_url):
+    suite = BenchmarkSuite.from_dict({'configurations': [{'url': 'https://foo.org'}],
+                                      'stores': [],
+                                      'collectors': [{'type': 'prometheus', 'url': metrics_url}]})
+    collector = suite.collectors[0]
+
+    assert isinstance(collector, PrometheusCollector)
+    assert suite.to_dict()['collectors'][0].to_dict()['url'] == metrics_url
+    assert pickle.loads(pickle.dumps(collector)).url == metrics_url
+
+
+class FakeCollector(MetricsCollector):
+
+    type_name = 'fake'
+
+    def __init__(self, name, fail_on=None):
+        self.name = name
+        self.fail_on = fail_on
+        self.calls = []
+
+    def start(self):
+        self.calls.append('start')
+        if self.fail_on == 'start':
+            raise RuntimeError('start failed')
+
+    def stop(self):
+        self.calls.append('stop')
+        if self.fail_on == 'stop':
+            raise RuntimeError('stop failed')
+        return {self.name: MetricSeries(self.name, 'gauge', [[0, 1]])}
+
+
+def test_collectors_context_stops_all_collectors():
+    collectors = [FakeCollector('a', fail_on='stop'), FakeCollector('b')]
+
+    with CollectorsContext(collectors) as context:
+        pass
+
+    assert [collector.calls for collector in collectors] == [['start', 'stop'], ['start', 'stop']]
+    assert list(context.series) == ['b']
+
+
+def test_collectors_context_stops_started_collectors_when_start_fails():
+    collectors = [FakeCollector('a'), FakeCollector('b', fail_on='start'), FakeCollector('c')]
+
+    with pytest.raises(RuntimeError):
+        with CollectorsContext(collectors):
+            pass
+
+    assert [collector.calls for collector in collectors] == [['start', 'stop'], ['start'], []]
+
+
+def test_metrics_table_writer_joins_target_metrics(tmp_path, make_output):
+    output = make_output('https://foo.org/a', 1000, 20, test_id='a',
+                         target_metrics={'cpu': MetricSeries('cpu', 'rate', [[0, 0.5], [1, 0.7]])})
+    suite = BenchmarkSuite([BenchmarkConfig('https://foo.org/a', test_id='a')], [], None)
+    writer = MetricsTableWriter(str(tmp_path / 'metrics.csv'))
+
+    writer.write(SuiteReport(suite))
+    writer.write_output(SuiteReport(suite), output)
+    writer.close()
+
+    with open(tmp_path / 'metrics.csv', newline='') as file:
+        rows = list(csv.DictReader(file))
+
+    assert rows[0]['test_id'] == 'a'
+    assert float(rows[0]['requests_per_second']) == 1000
+    assert float(rows[0]['target:cpu']) == pytest.approx(0.6)
@@ -0,0 +1,236 @@
+import json
+import pytest
+from datetime import datetime, timedelta
+from click.testing import CliRunner
+from wrktoolbox.benchmarks import BenchmarkConfig, BenchmarkSuite
+from wrktoolbox.commands.compact import compact_command
+from wrktoolbox.compaction import ArchiveCompactor, DAY, ROLLUPS_FILE_NAME, compact_output
+from wrktoolbox.metrics import get_metrics
+from wrktoolbox.results.importers.fs import JsonResultsImporter
+from wrktoolbox.stores.fs import JsonFileSystemBenchmarkOutputStore, INDEX_FILE_NAME
+from wrktoolbox.stores.segments import is_segment, read_segment_header, write_segment
+from wrktoolbox.wrkoutput import BenchmarkOutput
+from perf.fixtures import get_wrk2_output
+from tests.test_output_stores import EXAMPLE_OUTPUT
+
+
+WRK2_OUTPUT = get_wrk2_output(64).replace('@ https://foo.org/api/alive', '@ https://foo.org/')
+
+
+def store_suite(folder, days_ago=0, count=3, urls=('https://foo.org/',), raw_output=EXAMPLE_OUTPUT) -> BenchmarkSuite:
+    store = JsonFileSystemBenchmarkOutputStore(str(folder))
+    start_time = datetime.utcnow() - timedelta(days=days_ago)
+    suite = BenchmarkSuite([], [store], None, plugins=[], start_time=start_time, end_time=start_time)
+    for url in urls:
+        config = BenchmarkConfig(url, test_id='alive', threads=2)
+        for _ in range(count):
+            output = BenchmarkOutput.parse(raw_output.replace('@ https://foo.org/', f'@ {url}'),
+                                           suite_id=suite.id, start_time=start_time, end_time=start_time,
+                                           test_id='alive')
+            suite.benchmarks_ids.append(output.id)
+            store.store(config, output)
+    store.store_suite(suite)
+    return suite
+
+
+def import_outputs(importer):
+    return {output.id: output for report in importer.import_suites() for output in importer.import_results(report)}
+
+
+def get_segments(folder):
+    return [path for path in folder.iterdir() if is_segment(path.name)]
+
+
+@pytest.mark.parametrize('codec', [None, 'gzip'])
+def test_packed_suites_are_imported_like_plain_files(tmp_path, codec):
+    suites = [store_suite(tmp_path, days_ago=2), store_suite(tmp_path, days_ago=1)]
+    expected = import_outputs(JsonResultsImporter(str(tmp_path)))
+
+    result = ArchiveCompactor(str(tmp_path), compression=codec).run()
+
+    assert result.packed_suites == 2
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(
+        [INDEX_FILE_NAME] + [path.name for path in get_segments(tmp_path)])
+
+    outputs = import_outputs(JsonResultsImporter(str(tmp_path)))
+    assert sorted(outputs) == sorted(expected) == sorted(suites[0].benchmarks_ids + suites[1].benchmarks_ids)
+    for output_id, output in outputs.items():
+        assert get_metrics(output) == get_metrics(expected[output_id])
+        assert output.raw_output == expected[output_id].raw_output
+
+    with open(tmp_path / INDEX_FILE_NAME, encoding='utf8') as index_file:
+        assert index_file.read() == ''
+
+
+def test_recent_suites_are_not_packed(tmp_path):
+    store_suite(tmp_path, days_ago=0)
+    old = store_suite(tmp_path, days_ago=3)
+
+    result = ArchiveCompactor(str(tmp_path), pack_after=DAY).run()
+
+    assert result.packed_suites == 1
+    segments = get_segments(tmp_path)
+    assert len(segments) == 1
+    assert read_segment_header(str(segments[0]))['suite']['id'] == str(old.id)
+    assert len(import_outputs(JsonResultsImporter(str(tmp_path)))) == 6
+
+
+def test_compacted_outputs_keep_metrics_and_fixed_percentiles(tmp_path):
+    store_suite(tmp_path, days_ago=10, raw_output=WRK2_OUTPUT)
+    expected = import_outputs(JsonResultsImporter(str(tmp_path)))
+
+    result = ArchiveCompactor(str(tmp_path), compact_after=7 * DAY, percentiles=[50, 90, 99, 100]).run()
+    assert result.compacted_outputs == 3
+
+    header = read_segment_header(str(get_segments(tmp_path)[0]))
+    assert all(entry['compacted'] for entry in header['outputs'])
+
+    outputs = import_outputs(JsonResultsImporter(str(tmp_path)))
+    assert sorted(outputs) == sorted(expected)
+    for output_id, output in outputs.items():
+        assert output.raw_output is None
+        assert get_metrics(output) == get_metrics(expected[output_id])
+
+        values = output.detailed_percentile_spectrum.values
+        assert len(values) <= 4 < len(expected[output_id].detailed_percentile_spectrum.values)
+        assert values[-1].percentile == 1
+
+
+def test_compacting_segments_again_does_nothing(tmp_path):
+    store_suite(tmp_path, days_ago=10)
+    ArchiveCompactor(str(tmp_path), compact_after=0).run()
+    result = ArchiveCompactor(str(tmp_path), compact_after=0).run()
+    assert result.to_dict() == dict(packed_suites=0, compacted_outputs=0, deleted_suites=0, rollups=0,
+                                    bytes_before=0, bytes_after=0)
+
+
+def test_compact_output_selects_first_values_reaching_percentiles():
+    data = {'raw_output': ['x'],
+            'detailed_percentile_spectrum': {'values': [{'value': index, 'percentile': index / 10}
+                                                        for index in range(11)]}}
+    compacted = compact_output(data, [25, 50, 99.9])
+
+    assert 'raw_output' not in compacted
+    assert [item['value'] for item in compacted['detailed_percentile_spectrum']['values']] == [3, 5, 10]
+    assert len(data['detailed_percentile_spectrum']['values']) == 11
+
+
+def test_expired_suites_are_deleted_keeping_rollups(tmp_path):
+    old = store_suite(tmp_path, days_ago=100, urls=['https://foo.org/a', 'https://foo.org/b'])
+    ArchiveCompactor(str(tmp_path)).run()
+    recent = store_suite(tmp_path, days_ago=1)
+
+    result = ArchiveCompactor(str(tmp_path), retention=30 * DAY).run()
+
+    assert result.deleted_suites == 1
+    assert result.rollups == 2
+    assert set(import_outputs(JsonResultsImporter(str(tmp_path)))) == set(recent.benchmarks_ids)
+
+    with open(tmp_path / ROLLUPS_FILE_NAME, encoding='utf8') as rollups_file:
+        rollups = [json.loads(line) for line in rollups_file]
+
+    assert [rollup['url'] for rollup in rollups] == ['https://foo.org/a', 'https://foo.org/b']
+    for rollup in rollups:
+        assert rollup['suite_id'] == str(old.id)
+        assert rollup['test_id'] == 'alive'
+        assert rollup['outputs'] == 3
+        assert rollup['metrics']['requests_per_second'] == 142.72
+
+
+def test_importer_filters_are_applied_to_segments(tmp_path):
+    store_suite(tmp_path, days_ago=5, urls=['https://foo.org/a', 'https://foo.org/b'])
+    recent = store_suite(tmp_path, days_ago=1, urls=['https://foo.org/a'])
+    ArchiveCompactor(str(tmp_path)).run()
+
+    outputs = import_outputs(JsonResultsImporter(str(tmp_path), filter_urls=['*/b']))
+    assert len(outputs) == 3
+    assert all(output.url == 'https://foo.org/b' for output in outputs.values())
+
+    since = datetime.utcnow() - timedelta(days=2)
+    outputs = import_outputs(JsonResultsImporter(str(tmp_path), since=since))
+    assert set(outputs) == set(recent.benchmarks_ids)
+
+
+def test_outputs_of_other_suites_are_left_in_place(tmp_path):
+    first = store_suite(tmp_path, days_ago=5, count=1)
+    second = store_suite(tmp_path, days_ago=1, count=1)
+
+    # the second suite reuses the output of the first one, like outputs of the result cache
+    suite_file = next(tmp_path.glob(f'suite-*-{second.id}.json'))
+    data = json.loads(suite_file.read_text())
+    data['benchmarks_ids'].extend(first.benchmarks_ids)
+    suite_file.write_text(json.dumps(data))
+
+    ArchiveCompactor(str(tmp_path), pack_after=2 * DAY).run()
+
+    segments = get_segments(tmp_path)
+    assert len(segments) == 1
+    assert [entry['id'] for entry in read_segment_header(str(segments[0]))['outputs']] == first.benchmarks_ids
+
+    importer = JsonResultsImporter(str(tmp_path), filter_suites=[str(second.id)])
+    assert set(import_outputs(importer)) == set(first.benchmarks_ids + second.benchmarks_ids)
+
+
+def test_dry_run_does_not_change_files(tmp_path):
+    store_suite(tmp_path, days_ago=100)
+    names = sorted(path.name for path in tmp_path.iterdir())
+
+    result = ArchiveCompactor(str(tmp_path), retention=DAY, dry_run=True).run()
+
+    assert result.deleted_suites == 1
+    assert sorted(path.name for path in tmp_path.iterdir()) == names
+
+
+def test_files_are_kept_when_segments_cannot_be_written(tmp_path, monkeypatch):
+    def fail(*args):
+        raise OSError('No space left on device')
+
+    store_suite(tmp_path, days_ago=10, raw_output=WRK2_OUTPUT)
+    names = sorted(path.name for path in tmp_path.iterdir())
+    monkeypatch.setattr('wrktoolbox.compaction.write_segment', fail)
+
+    with pytest.raises(OSError):
+        ArchiveCompactor(str(tmp_path)).run()
+    assert sorted(path.name for path in tmp_path.iterdir()) == names
+
+    monkeypatch.undo()
+    ArchiveCompactor(str(tmp_path)).run()
+    segment = get_segments(tmp_path)[0]
+    content = segment.read_bytes()
+    monkeypatch.setattr('wrktoolbox.compaction.write_segment', fail)
+
+    with pytest.raises(OSError):
+        ArchiveCompactor(str(tmp_path), compact_after=0).run()
+    assert segment.read_bytes() == content
+
+
+def test_partial_segments_are_removed(tmp_path):
+    with pytest.raises(TypeError):
+        write_segment(str(tmp_path / 'segment.jsonl'), {'id': 'foo'}, [{'id': 'bar', 'value': object()}])
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_compact_command(tmp_path):
+    store_suite(tmp_path, days_ago=10, raw_output=WRK2_OUTPUT)
+    store_suite(tmp_path, days_ago=100)
+
+    result = CliRunner().invoke(compact_command, ['--root-folder', str(tmp_path),
+                                                  '--compact-after', '7',
+                                                  '--retention', '30',
+                                                  '--percentile', '50',
+                                                  '--percentile', '99',
+                                                  '--compression', 'gzip'])
+
+    assert result.exit_code == 0, result.output
+    segments = get_segments(tmp_path)
+    assert len(segments) == 1 and segments[0].name.endswith('.jsonl.gz')
+    assert (tmp_path / ROLLUPS_FILE_NAME).exists()
+
+    outputs = import_outputs(JsonResultsImporter(str(tmp_path)))
+    assert len(outputs) == 3
+    assert all(len(output.detailed_percentile_spectrum.values) <= 2 for output in outputs.values())
+
+
+def test_compact_command_fails_for_missing_folder(tmp_path):
+    result = CliRunner().invoke(compact_command, ['--root-folder', str(tmp_path / 'missing')])
+    assert result.exit_code == 1
@@ -0,0 +1,41 @@
+import json
+import pytest
+from click.testing import CliRunner
+from wrktoolbox.commands.compare import compare_command, REGRESSIONS_EXIT_CODE
+from wrktoolbox.comparison import MetricComparison
+
+
+@pytest.mark.parametrize('metric,baseline,candidate,expected_status', [
+    ['requests_per_second', [1000], [900], 'regression'],
+    ['requests_per_second', [1000], [980], 'unchanged'],
+    ['avg_latency_ms', [100], [80], 'improvement'],
+    # noisy repeats widen the threshold
+    ['requests_per_second', [1000, 800, 1200], [900, 700, 1100], 'unchanged'],
+    ['requests_per_second', [1000, 1001, 999], [900, 901, 899], 'regression']
+])
+def test_metric_comparison_status(metric, baseline, candidate, expected_status):
+    assert MetricComparison(('a',), metric, baseline, candidate, 0.05, 2.0).status == expected_status
+
+
+def test_compare_command_exit_code_reflects_regressions(tmp_path, write_suite):
+    write_suite(tmp_path / 'baseline', {'alive': [(1000, 20), (1010, 21)], 'about': [(500, 40)]})
+    write_suite(tmp_path / 'same', {'alive': [(1005, 20), (1000, 20)], 'about': [(495, 40)]})
+    write_suite(tmp_path / 'slower', {'alive': [(800, 30), (790, 31)], 'about': [(500, 40)], 'new': [(1, 1)]})
+
+    runner = CliRunner()
+    result = runner.invoke(compare_command, ['--baseline', str(tmp_path / 'baseline'),
+                                             '--candidate', str(tmp_path / 'same')])
+    assert result.exit_code == 0
+
+    output_file = tmp_path / 'comparison.json'
+    result = runner.invoke(compare_command, ['--baseline', str(tmp_path / 'baseline'),
+                                             '--candidate', str(tmp_path / 'slower'),
+                                             '--output', str(output_file)])
+    assert result.exit_code == REGRESSIONS_EXIT_CODE
+
+    data = json.loads(output_file.read_text())
+    regressions = {(item['key'][0], item['metric']) for item in data['comparisons'] if item['status'] == 'regression'}
+    assert ('alive', 'requests_per_second') in regressions
+    assert ('alive', 'p99_latency_ms') in regressions
+    assert not any(key == 'about' for key, _ in regressions)
+    assert data['only_candidate'][0][0] == 'new'
@@ -0,0 +1,81 @@
+import gzip
+import pytest
+from datetime import datetime
+from rocore.exceptions import InvalidArgument
+from wrktoolbox import compression
+from wrktoolbox.benchmarks import BenchmarkConfig, BenchmarkSuite
+from wrktoolbox.metrics import get_metrics
+from wrktoolbox.results.importers.fs import JsonResultsImporter, BinResultsImporter
+from wrktoolbox.stores.fs import JsonFileSystemBenchmarkOutputStore, BinFileSystemBenchmarkOutputStore
+from wrktoolbox.wrkoutput import BenchmarkOutput
+from tests.test_output_stores import EXAMPLE_OUTPUT
+
+
+CODECS = [None, 'gzip', 'xz', pytest.param('zstd', marks=pytest.mark.skipif(not compression.is_available('zstd'),
+                                                                         reason='zstd is not available'))]
+
+
+def store_suite(store, count=3) -> BenchmarkSuite:
+    config = BenchmarkConfig('https://foo.org/', test_id='alive', threads=2)
+    suite = BenchmarkSuite([config], [store], None, plugins=[], start_time=datetime.utcnow())
+    for _ in range(count):
+        output = BenchmarkOutput.parse(EXAMPLE_OUTPUT, suite_id=suite.id, start_time=datetime.utcnow(),
+                                       end_time=datetime.utcnow())
+        suite.benchmarks_ids.append(output.id)
+        store.store(config, output)
+    store.store_suite(suite)
+    return suite
+
+
+def import_outputs(importer):
+    return [output for report in importer.import_suites() for output in importer.import_results(report)]
+
+
+@pytest.mark.parametrize('codec', CODECS)
+@pytest.mark.parametrize('store_type,importer_type', [
+    (JsonFileSystemBenchmarkOutputStore, JsonResultsImporter),
+    (BinFileSystemBenchmarkOutputStore, BinResultsImporter)
+])
+def test_compressed_outputs_are_imported(tmp_path, codec, store_type, importer_type):
+    suite = store_suite(store_type(str(tmp_path), compression=codec))
+
+    extension = compression.get_extension(codec)
+    assert len([path for path in tmp_path.iterdir() if path.name.endswith(store_type(str(tmp_path)).get_file_extension()
+                                                                          + extension)]) == 4
+
+    outputs = import_outputs(importer_type(str(tmp_path)))
+    assert sorted(output.id for output in outputs) == sorted(suite.benchmarks_ids)
+    assert all(get_metrics(output)['requests_per_second'] == 142.72 for output in outputs)
+
+
+def test_compact_json_is_smaller(tmp_path):
+    store_suite(JsonFileSystemBenchmarkOutputStore(str(tmp_path / 'indented')), 1)
+    store_suite(JsonFileSystemBenchmarkOutputStore(str(tmp_path / 'compact'), indent=None), 1)
+
+    def get_size(folder):
+        return sum(path.stat().st_size for path in folder.glob('alive-*.json'))
+
+    assert get_size(tmp_path / 'compact') < get_size(tmp_path / 'indented') * 0.8
+    assert len(import_outputs(JsonResultsImporter(str(tmp_path / 'compact')))) == 1
+
+
+def test_archives_can_mix_compressed_and_plain_files(tmp_path):
+    first = store_suite(JsonFileSystemBenchmarkOutputStore(str(tmp_path)))
+    second = store_suite(JsonFileSystemBenchmarkOutputStore(str(tmp_path), compression='gzip', indent=0))
+
+    with gzip.open(str(next(tmp_path.glob('alive-*.json.gz'))), mode='rt') as file:
+        assert '\n' not in file.read()
+
+    outputs = import_outputs(JsonResultsImporter(str(tmp_path)))
+    assert sorted(output.id for output in outputs) == sorted(first.benchmarks_ids + second.benchmarks_ids)
+
+
+def test_unsupported_compression_raises(tmp_path):
+    with pytest.raises(InvalidArgument):
+        JsonFileSystemBenchmarkOutputStore(str(tmp_path), compression='zip')
+
+
+def test_zstd_falls_back_to_gzip_when_not_available(tmp_path, monkeypatch):
+    monkeypatch.setattr(compression, 'is_available', lambda name: name != 'zstd')
+
+    assert JsonFileSystemBenchmarkOutputStore(str(tmp_path), compression='zstd').compression == 'gzip'
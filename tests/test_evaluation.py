@@ -0,0 +1,74 @@
+import json
+import pytest
+from click.testing import CliRunner
+from wrktoolbox.benchmarks import PerformanceGoalResult
+from wrktoolbox.commands.evaluate import evaluate_command
+from wrktoolbox.evaluation import evaluate_outputs, GoalsEvaluator
+from wrktoolbox.goals import RequestsPerSecondsGoal, PercentileLatencyGoal, NoErrorsGoal
+from wrktoolbox.results.importers.fs import JsonResultsImporter
+
+
+def test_goal_results_record_value_and_margin(tmp_path, write_suite):
+    write_suite(tmp_path, {'alive': [(1000, 20)]})
+    importer = JsonResultsImporter(str(tmp_path))
+    outputs = list(importer.import_results(next(importer.import_suites())))
+    goals = [RequestsPerSecondsGoal(1200), PercentileLatencyGoal(99, 100), NoErrorsGoal()]
+
+    evaluation = next(evaluate_outputs(outputs, goals))
+    rps, latency, errors = evaluation.goals_results
+
+    assert not evaluation.success
+    assert (rps.success, rps.value, rps.margin) == (False, 1000, -200)
+    assert latency.success and latency.value == pytest.approx(60) and latency.margin == pytest.approx(40)
+    assert errors.success and errors.value is None
+    assert 'value' not in errors.to_dict()
+    assert PerformanceGoalResult(**rps.to_dict()) == rps
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_evaluate_outputs_keeps_order(tmp_path, workers, write_suite):
+    write_suite(tmp_path, {f'test{index}': [(100 * index, 20)] for index in range(1, 9)})
+    importer = JsonResultsImporter(str(tmp_path))
+    outputs = list(importer.import_results(next(importer.import_suites())))
+
+    evaluations = list(evaluate_outputs(outputs, [RequestsPerSecondsGoal(450)], workers, batch_size=3))
+
+    assert [evaluation.output_id for evaluation in evaluations] == [output.id for output in outputs]
+    assert [evaluation.success for evaluation in evaluations] == \
+        [output.requests_per_second >= 450 for output in outputs]
+
+
+def test_goals_evaluator_reuses_workers_across_suites(tmp_path, write_suite):
+    write_suite(tmp_path / 'a', {'alive': [(1000, 20)]})
+    write_suite(tmp_path / 'b', {'alive': [(200, 20)]})
+
+    with GoalsEvaluator([RequestsPerSecondsGoal(500)], workers=2) as evaluator:
+        results, executors = [], []
+        for folder in ('a', 'b'):
+            importer = JsonResultsImporter(str(tmp_path / folder))
+            results.extend(evaluation.success for evaluation in
+                           evaluator.evaluate(importer.import_results(next(importer.import_suites()))))
+            executors.append(evaluator._executor)
+
+    assert results == [True, False]
+    assert executors[0] is executors[1] is not None
+    assert evaluator._executor is None
+
+
+def test_evaluate_command_writes_goals_results(tmp_path, write_suite):
+    write_suite(tmp_path / 'results', {'alive': [(1000, 20)], 'about': [(200, 40)]})
+    goals_file = tmp_path / 'goals.yaml'
+    goals_file.write_text("goals:\n  - type: requests-per-second\n    minimum: 500\n")
+
+    result = CliRunner().invoke(evaluate_command, ['--goals', str(goals_file),
+                                                   '--source', str(tmp_path / 'results'),
+                                                   '--output', str(tmp_path / 'goals'),
+                                                   '--workers', '1'])
+    assert result.exit_code == 0
+
+    files = list((tmp_path / 'goals').iterdir())
+    assert len(files) == 1
+    data = json.loads(files[0].read_text())
+    results = {item['test_id']: item['goals_results'][0] for item in data['evaluations']}
+    assert results['alive']['success'] and results['alive']['margin'] == 500
+    assert not results['about']['success'] and results['about']['margin'] == -300
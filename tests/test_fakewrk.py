@@ -0,0 +1,66 @@
+import logging
+import pytest
+from wrktoolbox.benchmarks import BenchmarkSuite
+from wrktoolbox.fakewrk import get_parser, get_output
+from wrktoolbox.results.importers.fs import JsonResultsImporter
+from wrktoolbox.wrkoutput import BenchmarkOutput
+
+
+def parse(*args) -> BenchmarkOutput:
+    return BenchmarkOutput.parse(get_output(get_parser().parse_args(list(args))))
+
+
+def test_fake_wrk_output_follows_littles_law():
+    output = parse('https://foo.org/api', '-c', '100', '-t', '4', '-d', '30', '--latency',
+                   '--fake-latency', '20', '--fake-sigma', '0.2')
+
+    assert output.threads == 4
+    assert output.connections == 100
+    assert output.requests_per_second == pytest.approx(100 / output.latency.avg.ms * 1000, rel=0.01)
+    assert sorted(output.latency_distribution.percentiles) == [50, 75, 90, 99]
+    assert output.latency_distribution.percentiles[50].ms == pytest.approx(20, rel=0.03)
+
+
+def test_fake_wrk_capacity_increases_latency():
+    unlimited = parse('https://foo.org/api', '-c', '400', '--fake-latency', '20')
+    limited = parse('https://foo.org/api', '-c', '400', '--fake-latency', '20', '--fake-capacity', '1000')
+
+    assert limited.requests_per_second == 1000
+    assert limited.latency.avg.ms > 10 * unlimited.latency.avg.ms
+
+
+def test_fake_wrk2_output_with_errors_and_spectrum():
+    output = parse('https://foo.org/api', '-c', '50', '-t', '2', '-d', '10', '-R', '500', '--latency',
+                   '--fake-spectrum', '300', '--fake-error-rate', '0.1', '--fake-timeout-rate', '0.01')
+
+    assert output.requests_per_second == 500
+    assert len(output.detailed_percentile_spectrum.values) == 300
+    assert 99.999 in output.latency_distribution.percentiles
+    assert output.not_successful_responses == 500
+    assert output.socket_errors.timeout_errors == 50
+
+
+def test_fake_wrk_output_is_deterministic():
+    args = ('https://foo.org/api', '-c', '10', '--latency')
+    assert get_output(get_parser().parse_args(args)) == get_output(get_parser().parse_args(args))
+
+
+def test_suite_runs_with_fake_executable(tmp_path, fake_wrk, suite_settings, import_outputs):
+    suite = BenchmarkSuite.from_dict(suite_settings(
+        tmp_path,
+        executable=fake_wrk + ' --fake-spectrum 4000',
+        duration=5,
+        configurations=[
+            {'test_id': 'alive', 'url': '/api/alive', 'concurrency': 50},
+            {'test_id': 'about', 'url': '/api/about', 'responses_per_second': 100, 'repeat': 2}
+        ],
+        goals=[{'type': 'expr', 'expression': 'error_ratio == 0'}]
+    ))
+    suite.run(logging.getLogger('wrktoolbox'))
+
+    outputs = import_outputs(JsonResultsImporter(str(tmp_path)))
+
+    assert sorted(output.test_id for output in outputs) == ['about', 'about', 'alive']
+    assert all(output.goals_results[0].success for output in outputs)
+    # large outputs of wrk2 are read while the process runs
+    assert max(len(output.raw_output) for output in outputs) > 4000
@@ -0,0 +1,86 @@
+import os
+import json
+import pytest
+from wrktoolbox.commands.run import run_core
+from wrktoolbox.results.importers.fs import JsonResultsImporter
+from wrktoolbox.stores.fs import INDEX_FILE_NAME, parse_file_name
+
+
+class CountingImporter(JsonResultsImporter):
+
+    type_name = 'counting-json'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.loaded = []
+
+    def _load_suite(self, item):
+        self.loaded.append(item.name)
+        return super()._load_suite(item)
+
+    def _load_output(self, item, scalar=False):
+        self.loaded.append(item.name)
+        return super()._load_output(item, scalar)
+
+
+@pytest.fixture
+def results_folder(tmp_path, monkeypatch, suite_settings, write_settings):
+    folder = tmp_path / 'results'
+    folder.mkdir()
+    settings_file = write_settings(suite_settings(folder, benchmarks=[
+        {'test_id': 'alive', 'url': '/api/alive'},
+        {'test_id': 'about', 'url': '/about'},
+        {'test_id': 'scaling', 'url': '/api/scaling', 'matrix': {'concurrency': [10, 20]}}
+    ]))
+
+    for location in ('europe', 'asia'):
+        monkeypatch.setenv('WRKTOOLBOX_LOCATION', location)
+        run_core(settings_file)
+    return folder
+
+
+def test_stores_write_index_entries(results_folder):
+    lines = (results_folder / INDEX_FILE_NAME).read_text().splitlines()
+    entries = [json.loads(line) for line in lines]
+
+    assert [entry['kind'] for entry in entries].count('suite') == 2
+    assert [entry['kind'] for entry in entries].count('output') == 8
+    for entry in entries:
+        assert (results_folder / entry['file']).is_file()
+        assert parse_file_name(entry['file'].split('/')[-1])[1] == entry['id']
+
+
+@pytest.mark.parametrize('options,expected_tests,expected_loaded', [
+    ({'filter_urls': ['*/api/alive']}, ['alive', 'alive'], 4),
+    ({'filter_test_ids': ['scaling*']}, ['scaling_concurrency_10'] * 2 + ['scaling_concurrency_20'] * 2, 6),
+    ({'filter_locations': ['asia']}, ['about', 'alive', 'scaling_concurrency_10', 'scaling_concurrency_20'], 5),
+    ({'filter_locations': ['asia'], 'filter_urls': ['*/about']}, ['about'], 2),
+])
+def test_indexed_files_not_matching_filters_are_not_loaded(results_folder, import_outputs, options, expected_tests,
+                                                           expected_loaded):
+    importer = CountingImporter(str(results_folder), **options)
+
+    assert sorted(output.test_id for output in import_outputs(importer)) == expected_tests
+    assert len(importer.loaded) == expected_loaded
+
+
+def test_file_names_are_used_without_index(results_folder, import_outputs):
+    os.remove(str(results_folder / INDEX_FILE_NAME))
+    all_outputs = import_outputs(JsonResultsImporter(str(results_folder)))
+    assert len(all_outputs) == 8
+
+    importer = CountingImporter(str(results_folder), filter_test_ids=['about'])
+    assert [output.test_id for output in import_outputs(importer)] == ['about', 'about']
+    assert len(importer.loaded) == 4
+
+    suite_id = all_outputs[0].suite_id
+    importer = CountingImporter(str(results_folder), filter_suites=[suite_id])
+    assert {output.suite_id for output in import_outputs(importer)} == {suite_id}
+    assert len(importer.loaded) == 5
+
+
+def test_incomplete_index_lines_are_ignored(results_folder, import_outputs):
+    with open(str(results_folder / INDEX_FILE_NAME), mode='at') as index_file:
+        index_file.write('{"kind": "out')
+
+    assert len(import_outputs(JsonResultsImporter(str(results_folder)))) == 8
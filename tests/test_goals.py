@@ -1,6 +1,15 @@
+import gc
+import pickle
+import weakref
+import logging
 import pytest
 from pytest import raises
 from wrktoolbox.goals import PercentileLatencyGoal, BenchmarkOutput, GoalException, NoErrorsGoal
+from rocore.exceptions import InvalidArgument
+from wrktoolbox.goals.baseline import NoRegressionGoal, BaselineRepository
+from wrktoolbox.goals.expressions import ExpressionGoal
+from wrktoolbox.benchmarks import PerformanceGoal, BenchmarkSuite, evaluate_goal
+from wrktoolbox.results.importers.fs import JsonResultsImporter
 from wrktoolbox.wrkoutput import LatencyDistributionResult, HdrHistogramLatencyDistributionResult, SocketErrorsResult
 
 
@@ -67,3 +76,181 @@ def test_percentile_goal_raises_for_missing_percentile():
 def test_no_errors_goal(output, expected_result):
     goal = NoErrorsGoal()
     assert goal.is_satisfied(output) == expected_result
+
+
+@pytest.fixture
+def baseline_output(make_output):
+    def make(test_id, rps, latency):
+        return make_output(f'https://foo.org/{test_id}', rps, latency, test_id=test_id)
+    return make
+
+
+@pytest.mark.parametrize('settings,rps,latency,expected_result', [
+    [{}, 960, 100, True],
+    [{}, 900, 100, False],
+    [{'tolerance': 15}, 900, 100, True],
+    [{'metric': 'avg_latency_ms'}, 1000, 104, True],
+    [{'percentile': 99}, 1000, 120, False],
+    # repeated baseline outputs spread between 800 and 1200 requests per second
+    [{'band': 2}, 700, 100, True],
+    [{'band': 0.5}, 700, 100, False],
+])
+def test_no_regression_goal(tmp_path, settings, rps, latency, expected_result, write_suite, baseline_output):
+    write_suite(tmp_path, {'a': [(1000, 100)], 'b': [(800, 100), (1000, 100), (1200, 100)]})
+    goal = NoRegressionGoal({'type': 'json', 'root_folder': str(tmp_path)}, **settings)
+    test_id = 'b' if 'band' in settings else 'a'
+
+    assert goal.is_satisfied(baseline_output(test_id, rps, latency)) is expected_result
+
+
+def test_no_regression_goal_loads_baseline_once(tmp_path, monkeypatch, write_suite, baseline_output):
+    write_suite(tmp_path, {'a': [(1000, 100)]})
+    importer = {'type': 'json', 'root_folder': str(tmp_path)}
+    calls = []
+    original_init = BaselineRepository.__init__
+
+    def init(self, *args):
+        calls.append(args)
+        original_init(self, *args)
+
+    monkeypatch.setattr(BaselineRepository, '__init__', init)
+    goals = [NoRegressionGoal(importer), NoRegressionGoal(importer, metric='avg_latency_ms')]
+    cache = {}
+    for goal in goals:
+        goal.use_cache(cache)
+
+    for _ in range(3):
+        for goal in goals:
+            assert goal.is_satisfied(baseline_output('a', 1000, 100))
+
+    assert len(calls) == 1
+
+
+def test_no_regression_goal_missing_baseline(tmp_path, write_suite, baseline_output):
+    write_suite(tmp_path, {'a': [(1000, 100)]})
+    importer = {'type': 'json', 'root_folder': str(tmp_path)}
+
+    assert NoRegressionGoal(importer).is_satisfied(baseline_output('c', 10, 100))
+
+    with raises(GoalException):
+        NoRegressionGoal(importer, require_baseline=True).is_satisfied(baseline_output('c', 10, 100))
+
+
+@pytest.mark.parametrize('importer', [
+    {'type': 'json', 'root_folder': '{tmp_path}'},
+    {'type': 'json', 'root_folder': '{tmp_path}/missing'},
+    {'type': 'unknown'}
+])
+def test_no_regression_goal_without_baseline_suite(tmp_path, importer, baseline_output):
+    importer = dict(importer, **{key: value.format(tmp_path=tmp_path) for key, value in importer.items()})
+    output = baseline_output('a', 1000, 100)
+
+    goal = NoRegressionGoal(importer)
+    assert goal.is_satisfied(output)
+    assert goal.measure(output) is None
+
+    with raises(GoalException, match='Cannot load the baseline'):
+        NoRegressionGoal(importer, require_baseline=True).is_satisfied(output)
+
+
+def test_suite_runs_without_baseline_suite(tmp_path, suite_settings, import_outputs):
+    (tmp_path / 'baseline').mkdir()
+    importer = {'type': 'json', 'root_folder': str(tmp_path / 'baseline')}
+    suite = BenchmarkSuite.from_dict(suite_settings(
+        tmp_path / 'out',
+        benchmarks=[{'test_id': 'alive', 'url': '/api/alive'}],
+        goals=[{'type': 'no-regression', 'importer': importer},
+               {'type': 'no-regression', 'importer': importer, 'require_baseline': True}]
+    ))
+    suite.run(logging.getLogger('tests'))
+
+    outputs = import_outputs(JsonResultsImporter(str(tmp_path / 'out')))
+    assert len(outputs) == 1
+    assert [result.success for result in outputs[0].goals_results] == [True, False]
+    assert 'Cannot load the baseline' in outputs[0].goals_results[1].error
+    assert suite._goals_cache == {}
+
+
+def test_no_regression_goal_is_pickled_without_baseline(tmp_path, write_suite, baseline_output):
+    write_suite(tmp_path, {'a': [(1000, 100)]})
+    goal = NoRegressionGoal({'type': 'json', 'root_folder': str(tmp_path)})
+    assert goal.is_satisfied(baseline_output('a', 1000, 100))
+
+    clone = pickle.loads(pickle.dumps(goal))
+    assert clone._cache == {}
+    assert 'BaselineRepository' not in pickle.dumps(goal).decode('latin-1')
+    assert '_cache' not in goal.to_dict()
+
+
+def test_no_regression_goal_from_configuration():
+    goal = PerformanceGoal.from_configuration({'type': 'no-regression',
+                                               'importer': {'type': 'json', 'root_folder': 'out'},
+                                               'percentile': 90,
+                                               'tolerance': 10})
+    assert isinstance(goal, NoRegressionGoal)
+    assert goal.metric == 'p90_latency_ms'
+    assert goal.to_dict()['importer'] == {'type': 'json', 'root_folder': 'out'}
+
+
+@pytest.mark.parametrize('expression,expected_result', [
+    ['p99 < 400ms', True],
+    ['p99 < 100ms', False],
+    ['p99 < 0.4s and error_ratio < 0.1%', True],
+    ['p99 < 100ms AND error_ratio < 0.1% OR rps > 5000', False],
+    ['p99 < 100ms OR rps > 900', True],
+    ['NOT rps > 900', False],
+    ['rps_per_thread >= 250 and 100 < p75 <= 120', True],
+    ['errors == 0 and timeouts == 0 and avg_latency * 2 < max_latency', True],
+    ['transfer_per_second > 300 * 1024', True],
+])
+def test_expression_goal(expression, expected_result, baseline_output):
+    output = baseline_output('a', 1000, 100)
+    assert ExpressionGoal(expression).is_satisfied(output) is expected_result
+
+
+@pytest.mark.parametrize('expression', [
+    'p99 < ',
+    'foo > 1',
+    '__import__("os").system("ls")',
+    'rps.real > 1',
+    '[1, 2] == [1, 2]'
+])
+def test_expression_goal_invalid_expression(expression):
+    with raises(InvalidArgument):
+        ExpressionGoal(expression)
+
+
+def test_expression_goal_missing_value(baseline_output):
+    with raises(GoalException):
+        ExpressionGoal('p99_9 < 100ms').is_satisfied(baseline_output('a', 1000, 100))
+
+
+def test_expression_goal_arithmetic_errors(baseline_output):
+    goal = ExpressionGoal('rps / non_2xx > 1')
+    output = baseline_output('a', 1000, 100)
+
+    with raises(GoalException, match='division by zero'):
+        goal.is_satisfied(output)
+
+    result = evaluate_goal(goal, output)
+    assert result.success is False and 'division by zero' in result.error
+
+
+def test_expression_goal_is_compiled_once_and_pickled():
+    goal = PerformanceGoal.from_configuration({'type': 'expr', 'expression': 'p90 < 200ms'})
+    copy = pickle.loads(pickle.dumps(goal))
+
+    assert copy._function is goal._function
+    assert copy.to_dict() == goal.to_dict() == {'type': 'expr',
+                                                'expression': 'p90 < 200ms',
+                                                'repr': 'Expression must be true: p90 < 200ms'}
+
+
+def test_expression_goals_keep_no_state_between_outputs(baseline_output):
+    output = baseline_output('a', 1000, 100)
+    reference = weakref.ref(output)
+    assert ExpressionGoal('rps > 900').is_satisfied(output) is True
+
+    del output
+    gc.collect()
+    assert reference() is None
@@ -0,0 +1,52 @@
+import sys
+import subprocess
+import pytest
+from wrktoolbox import hostmetrics
+from wrktoolbox.hostmetrics import ClientMonitor, ClientSummary, get_saturation_reasons
+from wrktoolbox.goals import ClientNotSaturatedGoal
+from wrktoolbox.wrkoutput import BenchmarkOutput
+
+
+requires_procfs = pytest.mark.skipif(not hostmetrics.is_supported(), reason='procfs is not available')
+
+
+@pytest.mark.parametrize('values,expected_reasons', [
+    [dict(threads=2, process_cores_avg=1.95, host_cpu_avg=0.3), 1],
+    [dict(threads=2, process_cores_avg=1.2, host_cpu_avg=0.3), 0],
+    [dict(threads=16, process_cores_avg=3.8, host_cpu_avg=0.95), 2],
+    [dict(threads=2, tcp_inuse_max=25000, tcp_tw_max=4000, ephemeral_ports=28232), 1],
+    [dict(threads=2, tcp_inuse_max=100, tcp_tw_max=4000, ephemeral_ports=28232), 0],
+])
+def test_saturation_reasons(values, expected_reasons):
+    summary = ClientSummary(10, 0.5, 4, **values)
+    assert len(get_saturation_reasons(summary)) == expected_reasons
+
+
+@requires_procfs
+def test_sockstat_and_load_average():
+    assert 'inuse' in hostmetrics.read_sockstat()
+    assert hostmetrics.read_load_average() >= 0
+
+
+@requires_procfs
+def test_client_monitor_measures_child_processes():
+    # the shell runs a CPU bound child process, like wrk is run by benchmarks
+    process = subprocess.Popen(f'{sys.executable} -c "import time\nend = time.time() + 1.5\nwhile time.time() < end: pass"',
+                               shell=True)
+
+    with ClientMonitor(process.pid, threads=1, interval=0.25) as monitor:
+        process.wait(10)
+
+    summary = monitor.get_summary()
+    assert summary.samples >= 4
+    assert summary.process_cores_max > 0.5
+    assert summary.tcp_inuse_max is not None
+    assert summary.saturated is (summary.process_cores_avg >= hostmetrics.CPU_SATURATION)
+
+
+def test_client_not_saturated_goal():
+    goal = ClientNotSaturatedGoal()
+    assert goal.is_satisfied(BenchmarkOutput())
+    assert goal.is_satisfied(BenchmarkOutput(client=ClientSummary(4, 0.5, 4, saturated=False)))
+    assert not goal.is_satisfied(BenchmarkOutput(client=ClientSummary(4, 0.5, 4, saturated=True,
+                                                                      reasons=['CPU'])))
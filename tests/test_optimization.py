@@ -0,0 +1,91 @@
+import logging
+import pytest
+from pytest import raises
+from rocore.exceptions import InvalidArgument
+from wrktoolbox.benchmarks import BenchmarkSuite, BenchmarkConfig, Benchmark
+from wrktoolbox.optimization import ConcurrencySearch, Probe
+from wrktoolbox.reports.scalability import UslModel
+from wrktoolbox.wrkoutput import BenchmarkOutput, LatencyResult
+
+
+MODEL = UslModel(100, 0.02, 0.0004)  # peak at about 49 concurrent connections
+
+
+def model_probe(concurrency):
+    return Probe(concurrency, MODEL.throughput(concurrency), MODEL.latency_ms(concurrency))
+
+
+def test_concurrency_search_finds_peak():
+    search = ConcurrencySearch(max_concurrency=1000, refine_steps=6)
+    probes = search.search(model_probe, 4)
+    best = search.get_best(probes)
+
+    assert abs(best.concurrency - MODEL.peak_concurrency) <= 4
+    assert len(probes) <= search.estimated_probes(4)
+
+
+def test_concurrency_search_respects_latency_limit():
+    search = ConcurrencySearch(max_concurrency=1000, latency_limit=300)
+    probes = search.search(model_probe, 4)
+    best = search.get_best(probes)
+
+    assert best.latency_ms <= 300
+    assert best.concurrency < MODEL.peak_concurrency
+
+
+@pytest.mark.parametrize('value', [
+    'throughput',
+    {'target': 'concurrency', 'factor': 1},
+    {'target': 'concurrency', 'min_concurrency': 100, 'max_concurrency': 10}
+])
+def test_concurrency_search_raises_for_invalid_configuration(value):
+    with raises(InvalidArgument):
+        ConcurrencySearch.from_configuration(value)
+
+
+def test_optimize_is_not_supported_for_wrk2():
+    with raises(InvalidArgument):
+        BenchmarkConfig('https://foo.org', responses_per_second=100, optimize='concurrency')
+
+
+def test_suite_runs_probes_and_confirmation(monkeypatch):
+    def fake_run(self, logger=None, suite_id=None, monitor_client=True, collectors=None, **kwargs):
+        config = self.config
+        return BenchmarkOutput(url=config.url,
+                               connections=config.concurrency,
+                               requests_per_second=MODEL.throughput(config.concurrency),
+                               latency=LatencyResult(MODEL.latency_ms(config.concurrency), 'ms', 1, 'ms', 1, 's', 50),
+                               suite_id=suite_id,
+                               test_id=config.test_id,
+                               group=config.group,
+                               parameters=config.parameters,
+                               **kwargs)
+
+    monkeypatch.setattr(Benchmark, 'run', fake_run)
+
+    stored = []
+    suite = BenchmarkSuite.from_dict({
+        'benchmarks': [
+            {
+                'test_id': 'alive',
+                'url': 'https://foo.org',
+                'threads': 2,
+                'duration': 60,
+                'optimize': {'target': 'concurrency', 'probe_duration': 2, 'max_concurrency': 256}
+            }
+        ],
+        'stores': []
+    })
+    monkeypatch.setattr(suite, 'store_output', lambda configuration, output: stored.append((configuration, output)))
+
+    final = suite.run_optimization(suite.configurations[0], logging.getLogger('tests'))
+    probes = [output for _, output in stored[:-1]]
+
+    assert stored[-1][1] is final
+    assert stored[-1][0].duration == 60
+    assert all(configuration.duration == 2 for configuration, _ in stored[:-1])
+    assert all(output.parent_id == final.id for output in probes)
+    assert final.probes_ids == [output.id for output in sorted(probes, key=lambda item: item.connections)]
+    assert final.connections == max(probes, key=lambda item: item.requests_per_second).connections
+    assert final.group == 'alive'
+    assert suite.benchmarks_ids[-1] == final.id
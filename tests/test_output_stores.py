@@ -1,11 +1,29 @@
 import pickle
 import pytest
+from wrktoolbox.hostmetrics import ClientSummary
+from wrktoolbox.collectors import MetricSeries
+from datetime import datetime
 from base64 import b64decode
 from wrktoolbox.benchmarks import BenchmarkSuite, BenchmarkConfig, BenchmarkPlugin
-from wrktoolbox.stores.fs import BinFileSystemBenchmarkOutputStore
+from wrktoolbox.stores.fs import BinFileSystemBenchmarkOutputStore, JsonFileSystemBenchmarkOutputStore
+from wrktoolbox.results import SuiteReport
+from wrktoolbox.results.importers.fs import JsonResultsImporter
 from wrktoolbox.wrkoutput import BenchmarkOutput
 
 
+EXAMPLE_OUTPUT = """
+Running 30s test @ https://foo.org/
+  12 threads and 400 connections
+  Thread Stats   Avg      Stdev     Max   +/- Stdev
+    Latency     1.49s   329.38ms   2.00s    73.97%
+    Req/Sec    35.90     39.35   170.00     83.51%
+  4294 requests in 30.09s, 2.06MB read
+  Socket errors: connect 0, read 0, write 0, timeout 1463
+Requests/sec:    142.72
+Transfer/sec:     70.09KB
+"""
+
+
 def test_suite_can_be_pickled():
     suite = BenchmarkSuite([
         BenchmarkConfig('http://localhost:44555'),
@@ -202,3 +220,34 @@ def test_output_can_be_pickled(raw_output):
     clone = pickle.loads(decoded)  # type: BenchmarkOutput
 
     assert result.raw_output == clone.raw_output
+
+
+def test_json_store_groups_matrix_outputs(tmp_path):
+    config = BenchmarkConfig('https://foo.org/', test_id='alive_concurrency_400', group='alive',
+                             parameters={'concurrency': 400})
+    suite = BenchmarkSuite([config], [], None)
+    output = BenchmarkOutput.parse(EXAMPLE_OUTPUT, suite_id=suite.id, start_time=datetime.utcnow(),
+                                   end_time=datetime.utcnow(), test_id=config.test_id,
+                                   group=config.group, parameters=config.parameters,
+                                   client=ClientSummary(8, 0.5, 4, 2, process_cores_avg=1.9, saturated=True,
+                                                        reasons=['CPU']),
+                                   target_metrics={'cpu': MetricSeries('cpu', 'rate', [(0.5, 0.25), (1.5, 0.75)])})
+    suite.benchmarks_ids.append(output.id)
+
+    store = JsonFileSystemBenchmarkOutputStore(str(tmp_path))
+    store.store(config, output)
+    store.store_suite(suite)
+
+    assert len(list((tmp_path / 'alive').iterdir())) == 1
+
+    importer = JsonResultsImporter(str(tmp_path))
+    report = next(importer.import_suites())  # type: SuiteReport
+    results = list(importer.import_results(report))
+
+    assert len(results) == 1
+    assert results[0].test_id == 'alive_concurrency_400'
+    assert results[0].group == 'alive'
+    assert results[0].parameters == {'concurrency': 400}
+    assert report.suite.configurations[0].parameters == {'concurrency': 400}
+    assert results[0].client == output.client
+    assert results[0].target_metrics == output.target_metrics
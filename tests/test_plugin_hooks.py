@@ -0,0 +1,100 @@
+import sys
+import types
+import logging
+import pytest
+from wrktoolbox.benchmarks import BenchmarkSuite, BenchmarkPlugin
+
+
+logger = logging.getLogger('test')
+
+
+def create_hooks_module(events, name='hooks_plugin'):
+    module = types.ModuleType(name)
+
+    def before_benchmark(config):
+        events.append(('before', config.url))
+        config.headers = dict(config.headers or {}, Authorization='Bearer fresh')
+
+    def after_benchmark(config, output):
+        events.append(('after', config.url, output.requests_per_second > 0))
+
+    def teardown(suite):
+        events.append(('teardown', suite.id))
+
+    module.before_benchmark = before_benchmark
+    module.after_benchmark = after_benchmark
+    module.teardown = teardown
+    return module
+
+
+@pytest.fixture
+def create_suite(monkeypatch, tmp_path, suite_settings):
+    def create(module, repeat=1) -> BenchmarkSuite:
+        monkeypatch.setitem(sys.modules, module.__name__, module)
+        return BenchmarkSuite.from_dict(suite_settings(tmp_path,
+                                                       repeat=repeat,
+                                                       benchmarks=[{'url': '/test1'}, {'url': '/test2'}],
+                                                       plugins=[module.__name__]))
+    return create
+
+
+def test_plugin_hooks_are_resolved_once():
+    module = create_hooks_module([])
+    module.setup = 'not a function'
+    plugin = BenchmarkPlugin(module)
+
+    assert set(plugin.hooks) == {'before_benchmark', 'after_benchmark', 'teardown'}
+    assert plugin.to_dict()['hooks'] == ['before_benchmark', 'after_benchmark', 'teardown']
+    assert BenchmarkPlugin(types.ModuleType('empty')).hooks == {}
+    assert 'hooks' not in BenchmarkPlugin(types.ModuleType('empty')).to_dict()
+
+
+def test_hooks_are_called_around_each_benchmark(create_suite):
+    events = []
+    suite = create_suite(create_hooks_module(events), repeat=2)
+
+    suite.run(logger)
+
+    assert events == [
+        ('before', 'https://foo.org/test1'),
+        ('after', 'https://foo.org/test1', True),
+        ('before', 'https://foo.org/test1'),
+        ('after', 'https://foo.org/test1', True),
+        ('before', 'https://foo.org/test2'),
+        ('after', 'https://foo.org/test2', True),
+        ('before', 'https://foo.org/test2'),
+        ('after', 'https://foo.org/test2', True),
+        ('teardown', suite.id)
+    ]
+    assert suite.configurations[0].headers['Authorization'] == 'Bearer fresh'
+
+    timings = suite.hooks_timings['hooks_plugin']
+    assert timings['before_benchmark']['count'] == 4
+    assert timings['after_benchmark']['count'] == 4
+    assert timings['teardown']['count'] == 1
+    assert timings['before_benchmark']['max_ms'] <= timings['before_benchmark']['total_ms']
+    assert suite.to_dict()['hooks_timings'] == suite.hooks_timings
+
+
+def test_teardown_is_called_when_benchmarks_fail(create_suite):
+    events = []
+    module = create_hooks_module(events)
+
+    def before_benchmark(config):
+        raise RuntimeError('token refresh failed')
+
+    module.before_benchmark = before_benchmark
+    suite = create_suite(module)
+
+    with pytest.raises(RuntimeError):
+        suite.run(logger)
+
+    assert events == [('teardown', suite.id)]
+
+
+def test_suites_without_hooks_record_no_timings(create_suite):
+    suite = create_suite(types.ModuleType('plain_plugin'))
+
+    suite.run(logger)
+
+    assert suite.hooks_timings == {}
@@ -0,0 +1,156 @@
+import sys
+import time
+import types
+import threading
+import asyncio
+import logging
+import pytest
+from wrktoolbox.benchmarks import (BenchmarkSuite, BenchmarkPlugin, BenchmarkPluginException, PluginSetupException,
+                                   get_setup_dependencies)
+
+
+logger = logging.getLogger('test')
+
+
+def create_plugin(name, setup=None, **attributes) -> BenchmarkPlugin:
+    module = types.ModuleType(name)
+    if setup is not None:
+        module.setup = setup
+    for key, value in attributes.items():
+        setattr(module, key, value)
+    return BenchmarkPlugin(module)
+
+
+def sleeping_setup(name, events, seconds=0.2):
+    def setup(suite, logger):
+        events.append(('start', name))
+        time.sleep(seconds)
+        events.append(('end', name))
+    return setup
+
+
+def create_suite(plugins) -> BenchmarkSuite:
+    return BenchmarkSuite([], [], None, plugins=plugins)
+
+
+def test_independent_plugins_are_set_up_concurrently():
+    events = []
+    suite = create_suite([create_plugin(f'plugin{index}', sleeping_setup(index, events), setup_independent=True)
+                          for index in range(4)])
+
+    start = time.perf_counter()
+    suite.setup_plugins(logger)
+
+    assert time.perf_counter() - start < 0.6
+    assert [event for event, _ in events[:4]] == ['start'] * 4
+    assert sorted(suite.plugins_timings) == ['plugin0', 'plugin1', 'plugin2', 'plugin3']
+    assert all(value >= 190 for value in suite.plugins_timings.values())
+
+
+def test_plugins_without_declarations_are_set_up_in_order():
+    events = []
+    suite = create_suite([create_plugin('a', sleeping_setup('a', events, 0.05)),
+                          create_plugin('b', sleeping_setup('b', events, 0.01)),
+                          create_plugin('c')])
+
+    suite.setup_plugins(logger)
+
+    assert events == [('start', 'a'), ('end', 'a'), ('start', 'b'), ('end', 'b')]
+    assert list(suite.plugins_timings) == ['a', 'b']
+
+
+def test_plugins_dependencies():
+    events = []
+    suite = create_suite([create_plugin('token', sleeping_setup('token', events, 0.1), setup_dependencies=[]),
+                          create_plugin('headers', sleeping_setup('headers', events, 0.01),
+                                        setup_dependencies=['token']),
+                          create_plugin('ip', sleeping_setup('ip', events, 0.01), setup_independent=True)])
+
+    suite.setup_plugins(logger)
+
+    assert events.index(('end', 'token')) < events.index(('start', 'headers'))
+    assert events.index(('end', 'ip')) < events.index(('end', 'token'))
+
+
+def test_async_plugin_setup():
+    async def setup(suite, logger):
+        await asyncio.sleep(0.01)
+        suite.public_ip = '127.0.0.1'
+
+    suite = create_suite([create_plugin('async_plugin', setup)])
+    suite.setup_plugins(logger)
+
+    assert suite.public_ip == '127.0.0.1'
+    assert 'async_plugin' in suite.plugins_timings
+
+
+def test_plugin_setup_timeout(monkeypatch):
+    events = []
+
+    async def slow_setup(suite, logger):
+        await asyncio.sleep(5)
+
+    monkeypatch.setitem(sys.modules, 'slow_plugin', types.ModuleType('slow_plugin'))
+    sys.modules['slow_plugin'].setup = slow_setup
+
+    suite = create_suite([BenchmarkPlugin({'module': 'slow_plugin', 'timeout': 0.1}),
+                          create_plugin('dependent', sleeping_setup('dependent', events),
+                                        setup_dependencies=['slow_plugin'])])
+
+    start = time.perf_counter()
+    with pytest.raises(PluginSetupException) as error:
+        suite.setup_plugins(logger)
+
+    assert time.perf_counter() - start < 1
+    assert error.value.plugin_name == 'slow_plugin'
+    assert 'timed out' in str(error.value)
+    assert events == []
+
+
+def test_timed_out_sync_setup_does_not_keep_the_process_alive():
+    release = threading.Event()
+    threads = []
+
+    def blocking_setup(suite, logger):
+        threads.append(threading.current_thread())
+        release.wait(5)
+
+    suite = create_suite([create_plugin('blocking', blocking_setup, setup_timeout=0.1)])
+
+    try:
+        with pytest.raises(PluginSetupException, match='timed out'):
+            suite.setup_plugins(logger)
+
+        assert threads[0].is_alive()
+        assert threads[0].daemon
+    finally:
+        release.set()
+
+
+def test_plugin_setup_error_is_raised():
+    def setup(suite, logger):
+        raise RuntimeError('Crash!')
+
+    suite = create_suite([create_plugin('failing', setup), create_plugin('other', lambda suite, logger: None)])
+
+    with pytest.raises(RuntimeError):
+        suite.setup_plugins(logger)
+
+
+def test_invalid_plugins_dependencies():
+    with pytest.raises(BenchmarkPluginException):
+        get_setup_dependencies([create_plugin('a', setup_dependencies=['missing'])])
+
+    with pytest.raises(BenchmarkPluginException):
+        get_setup_dependencies([create_plugin('a', setup_dependencies=['b']),
+                                create_plugin('b', setup_dependencies=['a'])])
+
+
+def test_plugin_options_are_stored():
+    plugin = create_plugin('a')
+    plugin.depends_on = []
+    plugin.timeout = 5
+
+    assert plugin.to_dict() == {'module': 'a', 'has_setup': False, 'depends_on': [], 'timeout': 5}
+    assert plugin.setup_dependencies == []
+    assert plugin.setup_timeout == 5.0
@@ -0,0 +1,141 @@
+import socket
+import logging
+import threading
+import pytest
+from pytest import raises
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from wrktoolbox.benchmarks import BenchmarkSuite, BenchmarkConfig
+from wrktoolbox.preflight import Preflight, PreflightException, OnPreflightFailure
+
+
+class Handler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        status = 404 if self.path.startswith('/missing') else 200
+        if self.path.startswith('/secret') and self.headers.get('Authorization') != 'Bearer example':
+            status = 401
+        body = b'Hello, World'
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class ClosingHandler(Handler):
+    """Closes connections after each response, without telling the client."""
+
+    def do_GET(self):
+        super().do_GET()
+        self.close_connection = True
+
+
+def serve(handler):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(scope='module')
+def base_url():
+    yield from serve(Handler)
+
+
+@pytest.fixture(scope='module')
+def closing_base_url():
+    yield from serve(ClosingHandler)
+
+
+def get_closed_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def get_suite(*urls, headers=None):
+    return BenchmarkSuite([BenchmarkConfig(url, headers=headers) for url in urls], [], None)
+
+
+def test_preflight_reuses_pooled_connections(base_url):
+    preflight = Preflight(concurrency=1)
+    results = preflight.check([BenchmarkConfig(base_url + f'/api/{i}') for i in range(5)])
+
+    assert all(result.success and result.status == 200 for result in results)
+    assert results[0].dns_ms is not None
+    assert results[0].first_byte_ms is not None
+    assert sum(1 for result in results if result.reused_connection) == 4
+
+
+def test_preflight_reconnects_when_pooled_connections_are_closed(closing_base_url):
+    results = Preflight(concurrency=1).check([BenchmarkConfig(closing_base_url + f'/api/{i}') for i in range(3)])
+
+    assert all(result.success and result.status == 200 for result in results)
+    assert not any(result.reused_connection for result in results)
+
+
+def test_preflight_checks_both_variants_of_ab_tests(base_url):
+    unreachable = f'http://127.0.0.1:{get_closed_port()}/'
+    configurations = [BenchmarkConfig(base_url + '/ok', ab={'a': {'url': base_url + '/ok'}, 'b': {'url': url}})
+                      for url in (base_url + '/other', unreachable)]
+
+    results = Preflight(on_failure='warn').check(configurations)
+
+    assert results[0].success is True
+    assert results[1].success is False and results[1].url == unreachable
+
+
+def test_preflight_uses_configured_headers(base_url):
+    preflight = Preflight(on_failure='warn')
+    results = preflight.check([BenchmarkConfig(base_url + '/secret'),
+                               BenchmarkConfig(base_url + '/secret', headers={'Authorization': 'Bearer example'})])
+    assert [result.status for result in results] == [401, 200]
+
+
+def test_preflight_accepts_responses_of_live_endpoints(base_url):
+    results = Preflight(on_failure='warn').check([BenchmarkConfig(base_url + '/secret'),
+                                                  BenchmarkConfig(base_url + '/missing')])
+    assert [(result.status, result.success) for result in results] == [(401, True), (404, False)]
+
+    results = Preflight(on_failure='warn', accepted_statuses=[200]).check([BenchmarkConfig(base_url + '/secret')])
+    assert results[0].success is False
+
+
+def test_preflight_first_byte_excludes_connection(base_url):
+    result = Preflight().check([BenchmarkConfig(base_url + '/ok')])[0]
+    assert result.first_byte_ms <= result.total_ms - result.connect_ms
+
+
+def test_preflight_fail_fast(base_url):
+    suite = get_suite(base_url + '/ok', base_url + '/missing')
+
+    with raises(PreflightException):
+        Preflight(on_failure='fail').run(suite, logging.getLogger('tests'))
+
+
+def test_preflight_skips_unreachable_benchmarks(base_url):
+    unreachable = f'http://127.0.0.1:{get_closed_port()}/'
+    suite = get_suite(base_url + '/ok', unreachable, base_url + '/missing')
+
+    Preflight(on_failure=OnPreflightFailure.SKIP).run(suite, logging.getLogger('tests'))
+
+    assert [configuration.url for configuration in suite.configurations] == [base_url + '/ok']
+    assert len(suite.preflight_results) == 3
+    assert suite.preflight_results[1].error is not None
+
+
+@pytest.mark.parametrize('value,enabled,on_failure', [
+    [True, True, OnPreflightFailure.FAIL],
+    [False, False, OnPreflightFailure.FAIL],
+    [{'on_failure': 'warn', 'timeout': 2}, True, OnPreflightFailure.WARN]
+])
+def test_preflight_from_configuration(value, enabled, on_failure):
+    preflight = Preflight.from_configuration(value)
+    assert preflight.enabled is enabled
+    assert preflight.on_failure == on_failure
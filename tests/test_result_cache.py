@@ -0,0 +1,163 @@
+import logging
+import pytest
+from datetime import datetime, timedelta
+from wrktoolbox.benchmarks import BenchmarkConfig, BenchmarkSuite
+from wrktoolbox.commands.run import run_core
+from wrktoolbox.compaction import ArchiveCompactor
+from wrktoolbox.resultcache import ResultCache
+from wrktoolbox.results.importers.fs import JsonResultsImporter
+from wrktoolbox.stores.fs import INDEX_FILE_NAME
+
+
+logger = logging.getLogger('test')
+
+
+@pytest.fixture
+def write_cached_settings(tmp_path, suite_settings, write_settings):
+    def write(target_version='1.0.0', repeat=1, **result_cache):
+        output_folder = tmp_path / 'out'
+        return write_settings(suite_settings(
+            output_folder,
+            repeat=repeat,
+            benchmarks=[{'test_id': 'a', 'url': '/test1'}, {'test_id': 'b', 'url': '/test2'}],
+            metadata={'target_version': target_version},
+            result_cache=dict({'importer': {'type': 'json', 'root_folder': str(output_folder)}}, **result_cache)
+        ))
+    return write
+
+
+def get_suites(tmp_path):
+    importer = JsonResultsImporter(str(tmp_path / 'out'))
+    return sorted((report.suite for report in importer.import_suites()), key=lambda suite: suite.start_time)
+
+
+def test_result_key_depends_on_script_content_and_target_version(tmp_path, fake_wrk):
+    script = tmp_path / 'post.lua'
+    script.write_text('wrk.method = "POST"')
+    config = BenchmarkConfig('https://foo.org/test1', threads=2, script=str(script))
+    key = config.get_result_key('1.0.0')
+
+    assert config.get_result_key('1.0.0') == key
+    assert config.get_result_key('1.0.1') != key
+    assert config.copy(concurrency=20).get_result_key('1.0.0') != key
+    assert config.copy(headers={'Authorization': 'Bearer x'}).get_result_key('1.0.0') != key
+    assert config.copy(executable=fake_wrk).get_result_key('1.0.0') != key
+    assert config.copy(latency_statistics=not config.latency_statistics).get_result_key('1.0.0') != key
+    assert config.copy(test_id='other').get_result_key('1.0.0') != key
+
+    script.write_text('wrk.method = "PUT"')
+    assert config.get_result_key('1.0.0') != key
+
+
+def test_cached_outputs_are_linked_instead_of_running_benchmarks(tmp_path, write_cached_settings):
+    settings = write_cached_settings(repeat=2)
+    run_core(settings)
+    run_core(settings)
+
+    first, second = get_suites(tmp_path)
+    assert len(first.benchmarks_ids) == 4
+    assert sorted(second.benchmarks_ids) == sorted(first.benchmarks_ids)
+    assert len(list((tmp_path / 'out').glob('a-*.json'))) == 2
+
+    report = next(report for report in JsonResultsImporter(str(tmp_path / 'out')).import_suites()
+                  if report.suite.id == second.id)
+    outputs = list(JsonResultsImporter(str(tmp_path / 'out')).import_results(report))
+    assert len(outputs) == 4
+    assert all(output.suite_id == first.id for output in outputs)
+    assert all(output.result_key for output in outputs)
+
+
+@pytest.mark.parametrize('indexed', [True, False])
+def test_outputs_linked_from_the_cache_are_not_reused_twice(tmp_path, write_cached_settings, indexed):
+    settings = write_cached_settings(repeat=2)
+    for _ in range(3):
+        if not indexed and (tmp_path / 'out' / INDEX_FILE_NAME).exists():
+            (tmp_path / 'out' / INDEX_FILE_NAME).unlink()
+        run_core(settings)
+
+    first, second, third = get_suites(tmp_path)
+    assert len(set(first.benchmarks_ids)) == 4
+    assert sorted(second.benchmarks_ids) == sorted(third.benchmarks_ids) == sorted(first.benchmarks_ids)
+
+
+def test_cached_outputs_are_selected_with_index_entries(tmp_path, monkeypatch, write_cached_settings):
+    settings = write_cached_settings()
+    run_core(settings)
+    loaded = []
+
+    def fail(self, data):
+        raise AssertionError('suites should not be parsed')
+
+    def parse_output(self, data):
+        loaded.append(data)
+        return original(self, data)
+
+    original = JsonResultsImporter.parse_output
+    monkeypatch.setattr(JsonResultsImporter, 'parse_suite', fail)
+    monkeypatch.setattr(JsonResultsImporter, 'parse_output', parse_output)
+    run_core(write_cached_settings(repeat=2))
+    monkeypatch.undo()
+
+    first, second = get_suites(tmp_path)
+    assert len(loaded) == 2
+    assert set(first.benchmarks_ids) < set(second.benchmarks_ids)
+    assert len(second.benchmarks_ids) == 4
+
+
+def test_cached_outputs_are_read_from_segments(tmp_path, write_cached_settings):
+    settings = write_cached_settings()
+    run_core(settings)
+    ArchiveCompactor(str(tmp_path / 'out')).run()
+    run_core(settings)
+
+    first, second = get_suites(tmp_path)
+    assert sorted(second.benchmarks_ids) == sorted(first.benchmarks_ids)
+
+
+def test_benchmarks_run_again_for_other_target_versions(tmp_path, write_cached_settings):
+    run_core(write_cached_settings('1.0.0'))
+    run_core(write_cached_settings('1.0.1'))
+
+    first, second = get_suites(tmp_path)
+    assert not set(first.benchmarks_ids) & set(second.benchmarks_ids)
+
+
+def test_result_cache_can_be_disabled(tmp_path, write_cached_settings):
+    settings = write_cached_settings()
+    run_core(settings)
+    run_core(settings, result_cache=False)
+
+    first, second = get_suites(tmp_path)
+    assert not set(first.benchmarks_ids) & set(second.benchmarks_ids)
+
+
+def test_stale_outputs_are_not_reused(tmp_path, fake_wrk, write_cached_settings):
+    settings = write_cached_settings()
+    run_core(settings)
+
+    cache = ResultCache({'type': 'json', 'root_folder': str(tmp_path / 'out')}, max_age=60)
+    config = BenchmarkConfig('https://foo.org/test1', test_id='a', threads=2, duration=1, executable=fake_wrk)
+    key = config.get_result_key('1.0.0')
+
+    output = cache.get(key, '1.0.0')
+    assert output is not None
+    assert cache.get(key, '1.0.0', repetition=1) is None
+    assert cache.get(key, '2.0.0') is None
+
+    output.__dict__['end_time'] = datetime.utcnow() - timedelta(seconds=120)
+    assert not cache.is_fresh(output)
+
+
+def test_missing_results_folder_runs_benchmarks(tmp_path, suite_settings):
+    suite = BenchmarkSuite.from_dict(suite_settings(
+        tmp_path / 'out',
+        benchmarks=[{'url': '/test1'}],
+        metadata={'target_version': '1.0.0'},
+        result_cache={'importer': {'type': 'json', 'root_folder': str(tmp_path / 'missing')}},
+        stores=[]
+    ))
+
+    suite.run(logger)
+
+    assert len(suite.benchmarks_ids) == 1
+    assert suite.cached_results == {}
@@ -0,0 +1,99 @@
+import json
+import logging
+import pytest
+from pytest import raises
+from rocore.exceptions import InvalidArgument
+from wrktoolbox.benchmarks import BenchmarkSuite, BenchmarkConfig
+from wrktoolbox.reports.generation import ReportGeneration
+from wrktoolbox.reports.scalability import fit_usl, UslModel, ScalabilityWriter
+from wrktoolbox.reports.writer import LogWriter
+from wrktoolbox.results import SuiteReport
+from wrktoolbox.results.importers.fs import JsonResultsImporter
+from wrktoolbox.wrkoutput import BenchmarkOutput, LatencyResult
+
+
+@pytest.mark.parametrize('throughput_one,contention,coherency', [
+    [1000, 0.05, 0.0002],
+    [250, 0.1, 0.00001],
+    [90, 0.02, 0.001]
+])
+def test_fit_usl_recovers_coefficients(throughput_one, contention, coherency):
+    expected = UslModel(throughput_one, contention, coherency)
+    points = [(n, expected.throughput(n)) for n in [1, 2, 4, 8, 16, 32, 64, 128, 256]]
+
+    model = fit_usl(points)
+
+    assert model.throughput_one == pytest.approx(throughput_one, rel=1e-3)
+    assert model.contention == pytest.approx(contention, rel=1e-2, abs=1e-4)
+    assert model.coherency == pytest.approx(coherency, rel=1e-2, abs=1e-6)
+    assert model.peak_concurrency == pytest.approx(expected.peak_concurrency, rel=1e-2)
+
+
+def test_usl_model_without_coherency_has_no_peak():
+    model = UslModel(100, 0.1, 0)
+    assert model.peak_concurrency is None
+    assert model.peak_throughput == pytest.approx(1000)
+
+    # linear scalability has no peak, and its peak throughput must be serializable in standard JSON
+    assert UslModel(100, 0, 0).peak_throughput is None
+
+
+def test_fit_usl_requires_three_concurrency_levels():
+    with raises(InvalidArgument):
+        fit_usl([(10, 100), (10, 110), (20, 190)])
+
+
+def test_scalability_writer(tmp_path):
+    expected = UslModel(500, 0.03, 0.0005)
+    configurations = [BenchmarkConfig('https://foo.org/', threads=4, concurrency=n, test_id=f'c{n}')
+                      for n in [10, 20, 40, 80, 160]]
+    other = BenchmarkConfig('https://foo.org/', threads=8, concurrency=10, test_id='other')
+    report = SuiteReport(BenchmarkSuite(configurations + [other], [], None))
+
+    output_file = tmp_path / 'usl.json'
+    writer = ScalabilityWriter(str(output_file))
+    writer.write(report)
+
+    for configuration in configurations + [other]:
+        n = configuration.concurrency
+        writer.write_output(report, BenchmarkOutput(url=configuration.url,
+                                                    connections=n,
+                                                    threads=configuration.threads,
+                                                    test_id=configuration.test_id,
+                                                    requests_per_second=expected.throughput(n),
+                                                    latency=LatencyResult(expected.latency_ms(n), 'ms',
+                                                                          1, 'ms', 1, 's', 50)))
+    writer.close()
+
+    assert len(writer.results) == 1
+    data = json.loads(output_file.read_text())[0]
+    assert data['url'] == 'https://foo.org/'
+    assert len(data['points']) == 5
+    assert data['points'][0]['littles_law_latency_ms'] == pytest.approx(data['points'][0]['avg_latency_ms'])
+    assert data['peak_concurrency'] == pytest.approx(expected.peak_concurrency, rel=1e-2)
+    assert data['peak_throughput'] == pytest.approx(expected.peak_throughput, rel=1e-2)
+
+
+def test_scalability_report_reads_only_scalar_values(tmp_path, monkeypatch, fake_wrk, suite_settings):
+    suite = BenchmarkSuite.from_dict(suite_settings(
+        tmp_path,
+        executable=fake_wrk + ' --fake-capacity 2000 --fake-spectrum 100',
+        benchmarks=[{'test_id': 'alive', 'url': '/api/alive', 'matrix': {'concurrency': [10, 20, 40, 80]}}]
+    ))
+    suite.run(logging.getLogger('test'))
+
+    def get_points(*writers):
+        writer = ScalabilityWriter()
+        ReportGeneration([JsonResultsImporter(str(tmp_path))], [writer, *writers]).run(logging.getLogger('test'))
+        return [result.points for result in writer.results]
+
+    expected = get_points(LogWriter())
+
+    def fail(*args, **kwargs):
+        raise AssertionError('raw outputs should not be parsed')
+
+    monkeypatch.setattr(BenchmarkOutput, 'parse', fail)
+    points = get_points()
+
+    assert len(points) == 1 and len(points[0]) == 4
+    assert points == expected
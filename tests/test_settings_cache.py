@@ -0,0 +1,126 @@
+import threading
+import urllib.error
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from wrktoolbox.commands import SettingsHttpSource, SettingsFormat
+from wrktoolbox.settingscache import SettingsCache
+
+
+class SettingsHandler(BaseHTTPRequestHandler):
+
+    content = b'duration: 10\n'
+    etag = '"v1"'
+    last_modified = None
+    status = None
+    requests = []
+
+    def do_GET(self):
+        self.requests.append(dict(self.headers))
+
+        if self.status:
+            self.send_error(self.status)
+            return
+
+        if (self.etag and self.headers.get('If-None-Match') == self.etag) or \
+                (self.last_modified and self.headers.get('If-Modified-Since') == self.last_modified):
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-yaml')
+        self.send_header('Content-Length', str(len(self.content)))
+        if self.etag:
+            self.send_header('ETag', self.etag)
+        if self.last_modified:
+            self.send_header('Last-Modified', self.last_modified)
+        self.end_headers()
+        self.wfile.write(self.content)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    handler = type('Handler', (SettingsHandler,), {'requests': []})
+    http_server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=http_server.serve_forever, daemon=True)
+    thread.start()
+    http_server.url = f'http://127.0.0.1:{http_server.server_port}/settings.yaml'
+    yield http_server
+    http_server.shutdown()
+    http_server.server_close()
+
+
+def test_settings_are_revalidated_with_etag(server, tmp_path):
+    source = SettingsHttpSource(SettingsCache(str(tmp_path)))
+
+    assert source.read(server.url) == ('duration: 10\n', SettingsFormat.YAML)
+    assert source.read(server.url) == ('duration: 10\n', SettingsFormat.YAML)
+
+    requests = server.RequestHandlerClass.requests
+    assert len(requests) == 2
+    assert 'If-None-Match' not in requests[0]
+    assert requests[1]['If-None-Match'] == '"v1"'
+
+
+def test_changed_settings_are_downloaded(server, tmp_path):
+    source = SettingsHttpSource(SettingsCache(str(tmp_path)))
+    source.read(server.url)
+
+    server.RequestHandlerClass.content = b'duration: 20\n'
+    server.RequestHandlerClass.etag = '"v2"'
+
+    assert source.read(server.url)[0] == 'duration: 20\n'
+    assert SettingsCache(str(tmp_path)).get(server.url).etag == '"v2"'
+
+
+def test_settings_are_revalidated_with_last_modified(server, tmp_path):
+    server.RequestHandlerClass.etag = None
+    server.RequestHandlerClass.last_modified = 'Wed, 21 Oct 2026 07:28:00 GMT'
+    source = SettingsHttpSource(SettingsCache(str(tmp_path)))
+
+    source.read(server.url)
+    assert source.read(server.url)[0] == 'duration: 10\n'
+    assert server.RequestHandlerClass.requests[1]['If-Modified-Since'] == 'Wed, 21 Oct 2026 07:28:00 GMT'
+
+
+def test_fresh_settings_are_not_revalidated(server, tmp_path):
+    source = SettingsHttpSource(SettingsCache(str(tmp_path), max_age=60))
+
+    source.read(server.url)
+    source.read(server.url)
+
+    assert len(server.RequestHandlerClass.requests) == 1
+
+
+def test_cached_settings_are_used_when_server_fails(server, tmp_path):
+    source = SettingsHttpSource(SettingsCache(str(tmp_path)))
+    source.read(server.url)
+
+    server.RequestHandlerClass.status = 503
+    assert source.read(server.url)[0] == 'duration: 10\n'
+
+    server.RequestHandlerClass.status = 404
+    with pytest.raises(urllib.error.HTTPError):
+        source.read(server.url)
+
+
+def test_cached_settings_are_used_when_server_is_unreachable(server, tmp_path):
+    source = SettingsHttpSource(SettingsCache(str(tmp_path)))
+    source.read(server.url)
+
+    server.shutdown()
+    server.server_close()
+
+    assert source.read(server.url)[0] == 'duration: 10\n'
+    with pytest.raises(urllib.error.URLError):
+        SettingsHttpSource(SettingsCache(str(tmp_path / 'empty'))).read(server.url)
+
+
+def test_settings_without_cache(server):
+    source = SettingsHttpSource()
+    assert source.read(server.url)[0] == 'duration: 10\n'
+    assert source.read(server.url)[0] == 'duration: 10\n'
+    assert all('If-None-Match' not in request for request in server.RequestHandlerClass.requests)
@@ -0,0 +1,156 @@
+import sys
+import types
+import logging
+import sqlite3
+import pytest
+from datetime import datetime, timedelta
+from rocore.exceptions import InvalidArgument
+from wrktoolbox.benchmarks import BenchmarkConfig, BenchmarkSuite
+from wrktoolbox.commands.run import run_core
+from wrktoolbox.metrics import get_metrics
+from wrktoolbox.results import ResultsFilter
+from wrktoolbox.results.importers.fs import JsonResultsImporter
+from wrktoolbox.results.importers.sqlite import SqliteResultsImporter
+from wrktoolbox.stores.sqlite import SqliteBenchmarkOutputStore
+from wrktoolbox.wrkoutput import BenchmarkOutput
+
+
+@pytest.fixture
+def run_suite(tmp_path, suite_settings, write_settings):
+    def run(benchmarks=None, batch_size=20):
+        run_core(write_settings(suite_settings(
+            tmp_path / 'out',
+            benchmarks=benchmarks or [
+                {'test_id': 'alive', 'url': '/api/alive', 'goals': [{'type': 'avg-latency', 'limit': 1000}]},
+                {'test_id': 'about', 'url': '/about', 'repeat': 2}
+            ],
+            stores=[{'type': 'sqlite', 'database': str(tmp_path / 'results.db'), 'batch_size': batch_size},
+                    {'type': 'json', 'output_folder': str(tmp_path / 'out')}]
+        )))
+    return run
+
+
+def test_sqlite_importer_returns_stored_suites_and_outputs(tmp_path, run_suite, import_outputs):
+    run_suite()
+
+    importer = SqliteResultsImporter(str(tmp_path / 'results.db'))
+    json_importer = JsonResultsImporter(str(tmp_path / 'out'))
+
+    reports = list(importer.import_suites())
+    assert [report.suite.id for report in reports] == [report.suite.id for report in json_importer.import_suites()]
+
+    outputs = {output.id: output for output in import_outputs(importer)}
+    expected = {output.id: output for output in import_outputs(json_importer)}
+
+    assert outputs.keys() == expected.keys()
+    for output_id, output in outputs.items():
+        assert get_metrics(output) == get_metrics(expected[output_id])
+        assert output.test_id == expected[output_id].test_id
+        assert [item.to_dict() for item in output.goals_results] == \
+            [item.to_dict() for item in expected[output_id].goals_results]
+
+
+def test_sqlite_store_writes_normalized_tables(tmp_path, run_suite):
+    run_suite()
+
+    connection = sqlite3.connect(str(tmp_path / 'results.db'))
+    try:
+        counts = {table: connection.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+                  for table in ('suites', 'configurations', 'outputs', 'percentiles', 'goals_results')}
+        indexes = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        plan = ' '.join(str(row) for row in
+                        connection.execute('EXPLAIN QUERY PLAN SELECT data FROM outputs WHERE url = ?', ['x']))
+    finally:
+        connection.close()
+
+    assert counts['suites'] == 1
+    assert counts['configurations'] == counts['outputs'] == 3
+    assert counts['percentiles'] > 0
+    assert counts['goals_results'] == 1
+    assert {'ix_outputs_suite_id', 'ix_outputs_url', 'ix_outputs_test_id', 'ix_outputs_start_time',
+            'ix_suites_location', 'ix_suites_start_time'} <= indexes
+    assert 'ix_outputs_url' in plan
+
+
+def test_sqlite_store_writes_outputs_in_batches(tmp_path):
+    database = str(tmp_path / 'results.db')
+    store = SqliteBenchmarkOutputStore(database, batch_size=2)
+    config = BenchmarkConfig('https://foo.org/', threads=2)
+
+    def count():
+        connection = sqlite3.connect(database)
+        try:
+            return connection.execute('SELECT COUNT(*) FROM outputs').fetchone()[0]
+        except sqlite3.OperationalError:
+            return 0
+        finally:
+            connection.close()
+
+    raw_output = 'Running 1s test @ https://foo.org/\n  2 threads and 10 connections\nRequests/sec:    142.72'
+    for expected in (0, 2, 2):
+        store.store(config, BenchmarkOutput.parse(raw_output))
+        assert count() == expected
+
+
+def test_sqlite_store_writes_pending_outputs_when_benchmarks_fail(tmp_path, monkeypatch, suite_settings):
+    module = types.ModuleType('failing_plugin')
+
+    def before_benchmark(config):
+        if config.test_id == 'about':
+            raise RuntimeError('token refresh failed')
+
+    module.before_benchmark = before_benchmark
+    monkeypatch.setitem(sys.modules, module.__name__, module)
+    suite = BenchmarkSuite.from_dict(suite_settings(
+        tmp_path / 'out',
+        benchmarks=[{'test_id': 'alive', 'url': '/api/alive'}, {'test_id': 'about', 'url': '/about'}],
+        plugins=[module.__name__],
+        stores=[{'type': 'sqlite', 'database': str(tmp_path / 'results.db'), 'batch_size': 20}]
+    ))
+
+    with pytest.raises(RuntimeError):
+        suite.run(logging.getLogger('test'))
+
+    connection = sqlite3.connect(str(tmp_path / 'results.db'))
+    try:
+        assert connection.execute('SELECT test_id FROM outputs').fetchall() == [('alive',)]
+        assert connection.execute('SELECT COUNT(*) FROM suites').fetchone()[0] == 0
+    finally:
+        connection.close()
+
+
+@pytest.mark.parametrize('options,expected_tests', [
+    ({}, ['about', 'about', 'alive']),
+    ({'filter_urls': ['*/api/*']}, ['alive']),
+    ({'filter_test_ids': ['ab*']}, ['about', 'about']),
+    ({'filter_urls': ['*/about'], 'filter_test_ids': ['alive']}, []),
+    ({'since': (datetime.utcnow() + timedelta(days=1)).isoformat()}, []),
+    ({'until': (datetime.utcnow() + timedelta(days=1)).isoformat()}, ['about', 'about', 'alive']),
+    ({'filter_locations': ['europe-*']}, ['about', 'about', 'alive']),
+    ({'filter_locations': ['asia']}, []),
+    ({'filter_suites': ['missing']}, []),
+])
+def test_importers_apply_filters(tmp_path, monkeypatch, options, expected_tests, run_suite, import_outputs):
+    monkeypatch.setenv('WRKTOOLBOX_LOCATION', 'europe-west')
+    run_suite()
+
+    for importer in (SqliteResultsImporter(str(tmp_path / 'results.db'), **options),
+                     JsonResultsImporter(str(tmp_path / 'out'), **options)):
+        assert sorted(output.test_id for output in import_outputs(importer)) == expected_tests
+
+
+def test_results_filter_matches_overlapping_times():
+    start = datetime(2026, 1, 1, 10)
+    item = ResultsFilter(since='2026-01-01T10:30:00', until=datetime(2026, 1, 1, 12))
+
+    assert item.match_time(start, start + timedelta(hours=1))
+    assert not item.match_time(start, start + timedelta(minutes=10))
+    assert not item.match_time(start + timedelta(hours=3))
+    assert item.match_time(None)
+    assert not ResultsFilter()
+    assert ResultsFilter(test_ids=['a'])
+
+
+def test_sqlite_importer_requires_existing_database(tmp_path):
+    with pytest.raises(InvalidArgument):
+        SqliteResultsImporter(str(tmp_path / 'missing.db'))
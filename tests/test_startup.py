@@ -0,0 +1,51 @@
+import sys
+import json
+import subprocess
+import pytest
+
+
+HEAVY_MODULES = ('pyparsing', 'yaml', 'roconfiguration', 'rocore.models', 'certifi', 'asyncio',
+                 'wrktoolbox.benchmarks', 'wrktoolbox.goals', 'wrktoolbox.stores', 'wrktoolbox.wrkoutput')
+
+SCRIPT = '''
+import sys, json
+from wrktoolbox.main import main
+try:
+    main(sys.argv[1:])
+except SystemExit:
+    pass
+print(json.dumps([name for name in {modules!r} if name in sys.modules]))
+'''
+
+
+def get_loaded_modules(*args):
+    # certifi might be imported by site customizations of the environment, it is ignored if loaded at startup
+    baseline = json.loads(subprocess.check_output([sys.executable, '-c',
+                                                   f'import sys, json; '
+                                                   f'print(json.dumps([name for name in {HEAVY_MODULES!r} '
+                                                   f'if name in sys.modules]))']))
+    output = subprocess.check_output([sys.executable, '-c', SCRIPT.format(modules=HEAVY_MODULES), *args],
+                                     stderr=subprocess.DEVNULL)
+    return set(json.loads(output.decode().strip().splitlines()[-1])) - set(baseline)
+
+
+@pytest.mark.parametrize('args', [
+    ['--help'],
+    ['--version'],
+    ['run', '--help'],
+    ['compare', '--help'],
+    ['evaluate', '--help']
+])
+def test_cli_startup_does_not_import_heavy_modules(args):
+    assert get_loaded_modules(*args) == set()
+
+
+def test_grammars_are_built_on_first_parse():
+    from wrktoolbox import wrkoutput
+    from wrktoolbox.wrkoutput import reqs_count_pattern
+
+    assert reqs_count_pattern is wrkoutput.get_patterns()['reqs_count_pattern']
+    assert wrkoutput.TotalRequestsResult.pattern is reqs_count_pattern
+
+    with pytest.raises(AttributeError):
+        getattr(wrkoutput, 'missing_pattern')
@@ -0,0 +1,111 @@
+import os
+import json
+from wrktoolbox.benchmarks import BenchmarkSuite
+from wrktoolbox.commands.run import run_core
+from wrktoolbox.results.importers.fs import JsonResultsImporter
+from wrktoolbox.suitecache import SuiteCache
+
+
+BENCHMARKS = [
+    {'url': '/test1', 'goals': [{'type': 'avg-latency', 'limit': 1000}]},
+    {'url': '/test2', 'matrix': {'concurrency': [10, 20]}}
+]
+
+
+def test_cached_suite_equals_created_suite(tmp_path, suite_settings):
+    content = json.dumps(suite_settings(tmp_path, benchmarks=BENCHMARKS))
+    cache = SuiteCache(str(tmp_path / 'cache'))
+    key = cache.get_key(content)
+    assert cache.load(key) is None
+
+    values = json.loads(content)
+    suite = BenchmarkSuite.from_dict(values)
+    cache.save(key, values, suite.configurations)
+
+    cached_values, configurations = cache.load(key)
+    cached_suite = BenchmarkSuite.from_dict(cached_values, configurations)
+
+    assert [c.to_dict() for c in cached_suite.configurations] == [c.to_dict() for c in suite.configurations]
+    assert [c.url for c in cached_suite.configurations] == ['https://foo.org/test1',
+                                                            'https://foo.org/test2',
+                                                            'https://foo.org/test2']
+    assert cached_suite.configurations[0].goals[0].limit == 1000
+    assert cached_suite.id != suite.id
+
+
+def test_cache_key_depends_on_content_and_environment(monkeypatch):
+    cache = SuiteCache()
+    key = cache.get_key('a: 1')
+
+    assert cache.get_key('a: 1') == key
+    assert cache.get_key('a: 2') != key
+
+    monkeypatch.setenv('WRKTOOLBOX_THINK_TIME', '3')
+    assert cache.get_key('a: 1') != key
+
+
+def test_cache_entry_is_invalidated_by_plugin_changes(tmp_path, monkeypatch):
+    (tmp_path / 'cacheplugin.py').write_text('')
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    cache = SuiteCache(str(tmp_path / 'cache'))
+    values = {'plugins': ['cacheplugin']}
+    cache.save('key', values, [])
+    assert cache.load('key') == (values, [])
+
+    stat = os.stat(tmp_path / 'cacheplugin.py')
+    os.utime(tmp_path / 'cacheplugin.py', ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert cache.load('key') is None
+
+
+def test_unreadable_cache_entry_is_ignored(tmp_path):
+    cache = SuiteCache(str(tmp_path))
+    (tmp_path / 'key.pickle').write_bytes(b'not a pickle')
+    assert cache.load('key') is None
+
+
+def test_cache_is_pruned(tmp_path):
+    cache = SuiteCache(str(tmp_path), max_entries=2)
+    for index in range(4):
+        cache.save(f'key{index}', {}, [])
+        os.utime(cache.get_path(f'key{index}'), (index, index))
+
+    assert sorted(os.listdir(tmp_path)) == ['key2.pickle', 'key3.pickle']
+
+
+def test_run_uses_cached_suite(tmp_path, monkeypatch, suite_settings, write_settings):
+    settings_file = write_settings(suite_settings(tmp_path / 'out', benchmarks=BENCHMARKS))
+    cache_folder = tmp_path / 'cache'
+
+    run_core(settings_file, str(cache_folder))
+    assert len(os.listdir(cache_folder)) == 1
+
+    def fail(data):
+        raise AssertionError('settings should not be normalized again')
+
+    monkeypatch.setattr(BenchmarkSuite, 'normalize_configuration', staticmethod(fail))
+    run_core(settings_file, str(cache_folder))
+    monkeypatch.undo()
+
+    importer = JsonResultsImporter(str(tmp_path / 'out'))
+    reports = list(importer.import_suites())
+    assert len(reports) == 2
+    assert all(len(list(importer.import_results(report))) == 3 for report in reports)
+
+
+def test_cached_suite_keeps_scripts_paths(tmp_path, monkeypatch, suite_settings, write_settings):
+    (tmp_path / 'scripts').mkdir()
+    (tmp_path / 'scripts' / 'post.lua').write_text('wrk.method = "POST"')
+    # NB: joining an absolute path again has no effect, the issue only shows with relative scripts folders
+    scripts_folder = os.path.relpath(tmp_path / 'scripts')
+    settings_file = write_settings(suite_settings(tmp_path / 'out',
+                                                  scripts_folder=scripts_folder,
+                                                  benchmarks=[{'url': '/test1', 'script': 'post.lua'}]))
+    scripts = []
+    monkeypatch.setattr(BenchmarkSuite, 'run', lambda suite, logger: scripts.append(suite.configurations[0].script))
+
+    run_core(settings_file, str(tmp_path / 'cache'))
+    run_core(settings_file, str(tmp_path / 'cache'))
+
+    assert len(os.listdir(tmp_path / 'cache')) == 1
+    assert scripts == [os.path.join(scripts_folder, 'post.lua')] * 2
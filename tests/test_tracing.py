@@ -0,0 +1,54 @@
+import json
+from click.testing import CliRunner
+from wrktoolbox import tracing
+from wrktoolbox.main import main
+
+
+def test_span_is_noop_when_disabled():
+    tracing.disable_tracing()
+    assert tracing.span('foo') is tracing.span('bar')
+
+    with tracing.span('foo'):
+        pass
+    assert tracing.get_tracer() is None
+
+
+def test_tracer_records_spans_and_summary():
+    tracer = tracing.enable_tracing()
+    try:
+        with tracing.span('outer', test_id='a'):
+            for _ in range(3):
+                with tracing.span('inner'):
+                    pass
+    finally:
+        tracing.disable_tracing()
+
+    events = {event['name']: event for event in tracer.events}
+    assert len(tracer.events) == 4
+    assert events['outer']['ph'] == 'X'
+    assert events['outer']['args'] == {'test_id': 'a'}
+    assert events['inner']['ts'] >= events['outer']['ts']
+
+    summary = {item.name: item for item in tracer.get_summary()}
+    assert summary['inner'].count == 3
+    assert summary['outer'].total_ms >= summary['inner'].total_ms
+
+
+def test_trace_option_writes_chrome_trace(tmp_path, write_suite):
+    write_suite(tmp_path / 'results', {'alive': [(1000, 20), (1100, 20)]})
+    settings = tmp_path / 'report.yaml'
+    settings.write_text(f'importers:\n  - type: json\n    root_folder: {tmp_path / "results"}\n'
+                        f'writers:\n  - type: log\n')
+    trace_file = tmp_path / 'trace.json'
+
+    try:
+        result = CliRunner().invoke(main, ['--trace', str(trace_file), 'reports', '--settings', str(settings)])
+    finally:
+        tracing.disable_tracing()
+
+    assert result.exit_code == 0, result.output
+    data = json.loads(trace_file.read_text())
+    names = [event['name'] for event in data['traceEvents']]
+    assert names.count('import_output') == 2
+    assert names.count('write_output') == 2
+    assert 'import_suite' in names
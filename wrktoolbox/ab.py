@@ -0,0 +1,149 @@
+import random
+from collections.abc import Mapping
+from typing import Optional, Dict, List, Sequence, Tuple
+from rocore.exceptions import InvalidArgument
+from wrktoolbox.wrkoutput import BenchmarkOutput
+from wrktoolbox.metrics import HIGHER_IS_BETTER, get_percentile, percentile_metric_name
+
+
+class ABVariant:
+
+    def __init__(self, url: Optional[str] = None, headers: Optional[Dict[str, str]] = None):
+        self.url = url
+        self.headers = headers
+
+    def to_dict(self):
+        return self.__dict__.copy()
+
+
+class ABTest:
+    """Settings of a paired A/B benchmark: short runs against A and B are alternated for a number of rounds,
+    and the paired differences of metrics are compared using bootstrap confidence intervals."""
+
+    def __init__(self,
+                 a: ABVariant,
+                 b: ABVariant,
+                 rounds: int = 5,
+                 percentiles: Sequence[float] = (50, 90, 99),
+                 confidence: float = 0.95,
+                 tolerance: float = 0.0,
+                 iterations: int = 2000,
+                 seed: Optional[int] = None):
+        if isinstance(a, Mapping):
+            a = ABVariant(**a)
+        if isinstance(b, Mapping):
+            b = ABVariant(**b)
+        if not (a.url or a.headers) and not (b.url or b.headers):
+            raise InvalidArgument('A/B variants must define a different `url` or `headers`')
+        if rounds < 2:
+            raise InvalidArgument('A/B tests require at least two rounds')
+        if not 0 < confidence < 1:
+            raise InvalidArgument('A/B `confidence` must be between 0 and 1')
+
+        self.a = a
+        self.b = b
+        self.rounds = rounds
+        self.percentiles = [float(value) for value in percentiles]
+        self.confidence = confidence
+        self.tolerance = tolerance
+        self.iterations = iterations
+        self.seed = seed
+
+    @classmethod
+    def from_configuration(cls, value) -> 'ABTest':
+        if isinstance(value, Mapping):
+            return cls(**value)
+        raise InvalidArgument('Invalid `ab` configuration; expected a mapping with `a` and `b` variants')
+
+    def to_dict(self):
+        return self.__dict__.copy()
+
+
+class PairedDifference:
+    """Paired difference of a metric between B and A, with its bootstrap confidence interval."""
+
+    def __init__(self,
+                 metric: str,
+                 higher_is_better: bool,
+                 mean_a: float,
+                 mean_b: float,
+                 mean_difference: float,
+                 low: float,
+                 high: float,
+                 confidence: float,
+                 tolerance: float):
+        self.metric = metric
+        self.higher_is_better = higher_is_better
+        self.mean_a = mean_a
+        self.mean_b = mean_b
+        self.mean_difference = mean_difference
+        self.low = low
+        self.high = high
+        self.confidence = confidence
+        self.tolerance = tolerance
+
+    @property
+    def verdict(self) -> str:
+        """Returns `regression` or `improvement` when the whole confidence interval of the difference lies beyond
+        the tolerance, otherwise `no-difference`."""
+        threshold = abs(self.mean_a) * self.tolerance
+        worse_low, worse_high = (-self.high, -self.low) if self.higher_is_better else (self.low, self.high)
+
+        if worse_low > threshold:
+            return 'regression'
+        if worse_high < -threshold:
+            return 'improvement'
+        return 'no-difference'
+
+    def __repr__(self):
+        return (f'A/B {self.metric}: B - A = {self.mean_difference:.3f} '
+                f'({self.confidence:.0%} CI {self.low:.3f} .. {self.high:.3f}); {self.verdict}')
+
+    def to_dict(self):
+        data = self.__dict__.copy()
+        data['verdict'] = self.verdict
+        return data
+
+
+def bootstrap_interval(values: Sequence[float],
+                       confidence: float,
+                       iterations: int,
+                       rng: random.Random) -> Tuple[float, float]:
+    """Returns the percentile bootstrap confidence interval of the mean of values."""
+    count = len(values)
+    means = sorted(sum(rng.choice(values) for _ in range(count)) / count for _ in range(iterations))
+    tail = (1 - confidence) / 2
+    return means[int(tail * (iterations - 1))], means[int((1 - tail) * (iterations - 1))]
+
+
+def _get_metrics(output: BenchmarkOutput, percentiles: Sequence[float]) -> Dict[str, Optional[float]]:
+    metrics = {'requests_per_second': output.requests_per_second}
+    for percentile in percentiles:
+        metrics[percentile_metric_name(percentile)] = get_percentile(output, percentile)
+    return metrics
+
+
+def compare_pairs(pairs: Sequence[Tuple[BenchmarkOutput, BenchmarkOutput]], ab: ABTest) -> List[PairedDifference]:
+    """Computes paired differences (B - A) of requests per second and latency percentiles, over rounds of an
+    A/B test. Metrics missing from any output are skipped."""
+    rng = random.Random(ab.seed)
+    values = [(_get_metrics(a, ab.percentiles), _get_metrics(b, ab.percentiles)) for a, b in pairs]
+    results = []
+
+    for metric in values[0][0]:
+        samples = [(a[metric], b[metric]) for a, b in values]
+        if any(a is None or b is None for a, b in samples):
+            continue
+
+        differences = [b - a for a, b in samples]
+        low, high = bootstrap_interval(differences, ab.confidence, ab.iterations, rng)
+        results.append(PairedDifference(metric,
+                                        metric in HIGHER_IS_BETTER,
+                                        sum(a for a, _ in samples) / len(samples),
+                                        sum(b for _, b in samples) / len(samples),
+                                        sum(differences) / len(differences),
+                                        low,
+                                        high,
+                                        ab.confidence,
+                                        ab.tolerance))
+    return results
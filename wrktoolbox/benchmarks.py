@@ -1,7 +1,14 @@
 import os
+import copy
+import json
+import math
 import yaml
 import time
+import hashlib
+import inspect
 import importlib
+import logging
+import itertools
 import subprocess
 import multiprocessing
 from collections.abc import Mapping
@@ -10,13 +17,23 @@ from enum import Enum
 from logging import Logger
 from functools import wraps
 from abc import abstractmethod
-from typing import Optional, Dict, Sequence, Any
+from typing import Optional, Dict, Sequence, Any, Iterable, Generator, List, Tuple, TYPE_CHECKING
 from rocore.exceptions import InvalidArgument, EmptyArgumentException
 from rocore.registry import Registry
 from rocore.models import Model, String, UInt, Enum as EnumType, Boolean, OfType, Collection, Guid, DateTime
 from .wrkoutput import BenchmarkOutput, Result, ParseFailure
+from .optimization import ConcurrencySearch, Probe
+from .ab import ABTest, compare_pairs
+from .metrics import get_metrics, get_percentile
+from . import hostmetrics
+from .collectors import MetricsCollector, CollectorsContext
+from .tracing import span
+from .calibration import Calibration, CEILING_THRESHOLD
 from datetime import datetime
 
+if TYPE_CHECKING:
+    from .resultcache import ResultCache
+
 
 class BenchmarkException(Exception):
     """Base class for exceptions happening during benchmarks."""
@@ -43,6 +60,14 @@ class BenchmarkPluginException(BenchmarkException):
         super().__init__(f'Invalid `plugins` configuration; {details}')
 
 
+class PluginSetupException(BenchmarkException):
+
+    def __init__(self, plugin_name: str, details: str, dependency_failed: bool = False):
+        super().__init__(f'Setup of plugin `{plugin_name}` failed; {details}')
+        self.plugin_name = plugin_name
+        self.dependency_failed = dependency_failed
+
+
 class WrkVariant(Enum):
     WRK = 'wrk'
     WRK2 = 'wrk2'
@@ -53,15 +78,25 @@ class PerformanceGoalResult(Result):
     def __init__(self,
                  success: bool,
                  goal: str,
-                 error: Optional[str] = None):
+                 error: Optional[str] = None,
+                 details: Optional[Dict[str, Any]] = None,
+                 value: Optional[float] = None,
+                 margin: Optional[float] = None):
         self.success = success
         self.goal = goal
         self.error = error
+        self.details = details
+        self.value = value
+        self.margin = margin
 
     def to_dict(self):
         data = super().to_dict()
-        if not self.error:
-            del data['error']
+        for name in ('error', 'details'):
+            if not data.get(name):
+                data.pop(name, None)
+        for name in ('value', 'margin'):
+            if data.get(name) is None:
+                data.pop(name, None)
         return data
 
 
@@ -71,6 +106,15 @@ class PerformanceGoal(Registry):
     def is_satisfied(self, output: BenchmarkOutput) -> bool:
         """Returns a value indicating whether a goal is satisfied."""
 
+    def measure(self, output: BenchmarkOutput) -> Optional[Tuple[float, float]]:
+        """Returns the value observed by a goal in an output, and its margin from the goal limit:
+        positive when the goal is satisfied. Goals that don't compare a value return None."""
+        return None
+
+    def use_cache(self, cache: Dict[str, Any]):
+        """Gives the goal a cache shared by the goals of a suite while it runs, for data that goals load once,
+        like baselines."""
+
     def assert_parsed(self, value: Any):
         assert value is not None
         assert not isinstance(value, ParseFailure)
@@ -92,6 +136,33 @@ class GoalException(BenchmarkException):
     """Base class for performance goal exceptions."""
 
 
+def evaluate_goal(goal: PerformanceGoal,
+                  output: BenchmarkOutput,
+                  logger: Optional[Logger] = None) -> PerformanceGoalResult:
+    """Checks a performance goal against an output, returning its result with the observed value and margin."""
+    try:
+        is_satisfied = goal.is_satisfied(output)
+        measure = goal.measure(output)
+    except (AssertionError, GoalException) as error:
+        if logger:
+            logger.exception('Error while checking performance goal', exc_info=error)
+        return PerformanceGoalResult(False, repr(goal), str(error))
+
+    if logger:
+        logger.debug(f'--> goal {goal.get_class_name()} satisfied: {is_satisfied}')
+
+    value, margin = measure if measure is not None else (None, None)
+    return PerformanceGoalResult(is_satisfied, repr(goal), None, value=value, margin=margin)
+
+
+def _get_file_hash(file_path: str) -> str:
+    try:
+        with open(file_path, mode='rb') as file:
+            return hashlib.sha1(file.read()).hexdigest()
+    except OSError:
+        return file_path
+
+
 class BenchmarkConfig(Model):
 
     test_id = String()
@@ -107,6 +178,11 @@ class BenchmarkConfig(Model):
     latency_statistics = Boolean()
     repeat = UInt()
     goals = Collection(PerformanceGoal)
+    group = String()
+    parameters = OfType(dict)
+    optimize = OfType(ConcurrencySearch)
+    ab = OfType(ABTest)
+    executable = String()
 
     def __init__(self,
                  url: str,
@@ -121,7 +197,12 @@ class BenchmarkConfig(Model):
                  latency_statistics: Optional[bool] = True,
                  test_id: str = None,
                  repeat: int = 1,
-                 goals: Optional[Sequence[PerformanceGoal]] = None):
+                 goals: Optional[Sequence[PerformanceGoal]] = None,
+                 group: Optional[str] = None,
+                 parameters: Optional[Dict[str, Any]] = None,
+                 optimize: Optional[ConcurrencySearch] = None,
+                 ab: Optional[ABTest] = None,
+                 executable: Optional[str] = None):
         if threads < 1 or threads is None:
             threads = multiprocessing.cpu_count()
 
@@ -131,6 +212,19 @@ class BenchmarkConfig(Model):
         if responses_per_second is not None and responses_per_second > 0:
             app_variant = WrkVariant.WRK2
 
+        if optimize is not None and not isinstance(optimize, ConcurrencySearch):
+            optimize = ConcurrencySearch.from_configuration(optimize)
+
+        if optimize is not None and app_variant == WrkVariant.WRK2:
+            raise InvalidArgument('Concurrency optimization is supported only for closed-loop wrk benchmarks, '
+                                  'without `responses_per_second`')
+
+        if ab is not None and not isinstance(ab, ABTest):
+            ab = ABTest.from_configuration(ab)
+
+        if ab is not None and optimize is not None:
+            raise InvalidArgument('A/B tests and concurrency optimization cannot be combined')
+
         self.test_id = test_id
         self.url = url
         self.threads = threads
@@ -144,6 +238,11 @@ class BenchmarkConfig(Model):
         self.headers = headers
         self.repeat = repeat
         self.goals = goals
+        self.group = group
+        self.parameters = parameters
+        self.optimize = optimize
+        self.ab = ab
+        self.executable = executable
 
     def __repr__(self):
         return f'<{self.__class__.__name__} {self.url}>'
@@ -177,11 +276,56 @@ class BenchmarkConfig(Model):
             'app_variant': self.app_variant.value,
             'responses_per_second': self.responses_per_second,
             'latency_statistics': self.latency_statistics,
-            'headers': self.headers
+            'headers': self.headers,
+            'group': self.group,
+            'parameters': self.parameters,
+            'optimize': self.optimize,
+            'ab': self.ab,
+            'executable': self.executable
         }
 
+    def copy(self, **changes) -> 'BenchmarkConfig':
+        """Returns a copy of this configuration, with the given settings changed."""
+        clone = copy.copy(self)
+        for name, value in changes.items():
+            setattr(clone, name, value)
+        return clone
+
+    fingerprint_settings = ('url',
+                            'threads',
+                            'concurrency',
+                            'duration',
+                            'timeout',
+                            'script',
+                            'app_variant',
+                            'responses_per_second',
+                            'headers')
+
+    def get_fingerprint(self, exclude: Iterable[str] = ()) -> str:
+        """Returns a hash of the settings that affect the results of a benchmark,
+        optionally excluding some of them (e.g. `concurrency` to compare results across a sweep)."""
+        data = self.to_dict()
+        values = {name: data[name] for name in self.fingerprint_settings if name not in exclude}
+        return hashlib.sha1(json.dumps(values, sort_keys=True).encode('utf8')).hexdigest()
+
+    # settings shaping outputs, besides the ones affecting results
+    output_settings = ('latency_statistics',
+                       'test_id',
+                       'group',
+                       'parameters')
+
+    def get_result_key(self, target_version: str) -> str:
+        """Returns a hash identifying the outputs of this benchmark against a version of the target: it includes
+        the settings that affect results or shape outputs, the content of the script and the load generator."""
+        data = self.to_dict()
+        values = {name: data[name] for name in self.fingerprint_settings + self.output_settings}
+        values['script'] = _get_file_hash(self.script) if self.script else None
+        values['executable'] = self.executable
+        values['target_version'] = str(target_version)
+        return hashlib.sha1(json.dumps(values, sort_keys=True).encode('utf8')).hexdigest()
+
     def get_cmd(self):
-        return f'{self.app_variant.value} {self.url} ' \
+        return f'{self.executable or self.app_variant.value} {self.url} ' \
                f'-c {self.concurrency} ' \
                f'-t {self.threads} ' \
                f'-d {self.duration} ' \
@@ -201,16 +345,36 @@ class Benchmark(Model):
         self.id = uuid4()
         self.config = config
 
-    def run(self, logger=None, suite_id=None) -> BenchmarkOutput:
+    def run(self,
+            logger=None,
+            suite_id=None,
+            monitor_client=True,
+            collectors: Optional[Sequence[MetricsCollector]] = None,
+            **kwargs) -> BenchmarkOutput:
+        """Runs the benchmark; additional keyword arguments are set on the output.
+        When supported, host metrics are sampled while the benchmark runs, to detect client saturation;
+        metrics of the target are collected by the given collectors."""
         config = self.config
         start_time = datetime.utcnow()
 
-        p = subprocess.Popen(config.get_cmd(), shell=True, stdout=subprocess.PIPE)
-        p.wait(config.duration + 12)
+        with CollectorsContext(collectors or []) as target:
+            with span('wrk', test_id=config.test_id):
+                p = subprocess.Popen(config.get_cmd(), shell=True, stdout=subprocess.PIPE)
+
+                # NB: communicate reads the output while waiting, large outputs would fill the pipe
+                if monitor_client and hostmetrics.is_supported():
+                    with hostmetrics.ClientMonitor(p.pid, config.threads) as monitor:
+                        output, _ = p.communicate(timeout=config.duration + 12)
+                    kwargs['client'] = monitor.get_summary()
+                else:
+                    output, _ = p.communicate(timeout=config.duration + 12)
+
+        if target.series:
+            kwargs['target_metrics'] = target.series
 
         end_time = datetime.utcnow()
 
-        output = p.stdout.read().decode()
+        output = output.decode()
 
         if logger and output:
             logger.debug(f'[*] Process output: \n\n{output}\n\n')
@@ -222,10 +386,15 @@ class Benchmark(Model):
 
             raise ProcessBenchmarkException(output, p.returncode)
 
-        return BenchmarkOutput.parse(output,
-                                     suite_id=suite_id,
-                                     start_time=start_time,
-                                     end_time=end_time)
+        with span('parse_output'):
+            return BenchmarkOutput.parse(output,
+                                         suite_id=suite_id,
+                                         start_time=start_time,
+                                         end_time=end_time,
+                                         test_id=config.test_id,
+                                         group=config.group,
+                                         parameters=config.parameters,
+                                         **kwargs)
 
 
 class BenchmarkOutputStore(Registry):
@@ -238,6 +407,10 @@ class BenchmarkOutputStore(Registry):
     def store_suite(self, suite: 'BenchmarkSuite'):
         """Stores information about a suite."""
 
+    def flush(self):
+        """Writes outputs buffered by the store. Suites call this when they stop, also when benchmarks fail;
+        stores writing outputs immediately don't need to implement it."""
+
 
 def exception_handle(catch_exc, exc_type):
     def decorator(fn):
@@ -251,14 +424,31 @@ def exception_handle(catch_exc, exc_type):
     return decorator
 
 
+PLUGIN_HOOKS = ('before_benchmark', 'after_benchmark', 'teardown')
+
+
 class BenchmarkPlugin:
+    """A module extending wrktoolbox, optionally defining a `setup(suite, logger)` function, which can be async,
+    and hooks called by suites: `before_benchmark(config)`, `after_benchmark(config, output)` and `teardown(suite)`.
+
+    Setup functions of plugins run concurrently when plugins declare their dependencies, with a
+    `setup_dependencies` list of plugins names (empty for independent plugins) or `setup_independent = True`;
+    otherwise a plugin is set up after the plugins configured before it. Dependencies and a timeout of setup,
+    in seconds, can also be configured in settings: `{module: name, depends_on: [...], timeout: 10}`,
+    or in modules with `setup_timeout`."""
 
     def __init__(self, module):
+        options = {}
         if isinstance(module, Mapping):
+            options = module
             module = module.get('module')
         if isinstance(module, str):
             module = importlib.import_module(module)
         self.module = module
+        self.depends_on = options.get('depends_on')
+        self.timeout = options.get('timeout')
+        self.hooks = {name: getattr(module, name) for name in PLUGIN_HOOKS
+                      if callable(getattr(module, name, None))}
 
     @property
     def setup(self):
@@ -268,18 +458,149 @@ class BenchmarkPlugin:
     def has_setup(self) -> bool:
         return hasattr(self.module, 'setup')
 
+    @property
+    def has_async_setup(self) -> bool:
+        return self.has_setup and inspect.iscoroutinefunction(self.setup)
+
+    @property
+    def setup_dependencies(self) -> Optional[List[str]]:
+        """Returns the names of plugins that must be set up before this plugin,
+        or None if the plugin doesn't declare its dependencies."""
+        if self.depends_on is not None:
+            return list(self.depends_on)
+        if getattr(self.module, 'setup_independent', False):
+            return []
+        dependencies = getattr(self.module, 'setup_dependencies', None)
+        return list(dependencies) if dependencies is not None else None
+
+    @property
+    def setup_timeout(self) -> Optional[float]:
+        if self.timeout is not None:
+            return float(self.timeout)
+        return getattr(self.module, 'setup_timeout', None)
+
     @property
     def name(self):
         return self.module.__name__
 
     def to_dict(self):
-        return {'module': self.name,
+        data = {'module': self.name,
                 'has_setup': self.has_setup}
+        if self.hooks:
+            data['hooks'] = list(self.hooks)
+        if self.depends_on is not None:
+            data['depends_on'] = self.depends_on
+        if self.timeout is not None:
+            data['timeout'] = self.timeout
+        return data
 
     def __repr__(self):
         return f'<Plugin {self.name}>'
 
 
+def get_setup_dependencies(plugins: Sequence[BenchmarkPlugin]) -> Dict[str, List[str]]:
+    """Returns the names of plugins each plugin depends on for setup, validating dependencies."""
+    names = [plugin.name for plugin in plugins]
+    dependencies = {}
+
+    for index, plugin in enumerate(plugins):
+        items = plugin.setup_dependencies
+        if items is None:
+            # plugins not declaring dependencies are set up in configuration order
+            items = names[:index]
+
+        missing = [name for name in items if name not in names]
+        if missing:
+            raise BenchmarkPluginException(f'plugin `{plugin.name}` depends on plugins not configured: '
+                                           f'{", ".join(missing)}')
+        dependencies[plugin.name] = items
+
+    def visit(name, path):
+        if name in path:
+            raise BenchmarkPluginException(f'circular dependency between plugins: {" -> ".join(path + [name])}')
+        for dependency in dependencies[name]:
+            visit(dependency, path + [name])
+
+    for name in names:
+        visit(name, [])
+    return dependencies
+
+
+def _run_in_daemon_thread(name: str, function, *args):
+    """Runs a function in a new daemon thread, returning an awaitable of its result. Unlike the threads of
+    executors, daemon threads don't keep the process alive when the function never returns."""
+    import asyncio
+    import threading
+    from concurrent.futures import Future
+
+    future = Future()
+
+    def run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            result = function(*args)
+        except BaseException as error:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    threading.Thread(target=run, name=name, daemon=True).start()
+    return asyncio.wrap_future(future)
+
+
+async def _setup_plugins(suite: 'BenchmarkSuite',
+                         plugins: Sequence[BenchmarkPlugin],
+                         logger: Logger) -> Dict[str, float]:
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    dependencies = get_setup_dependencies(plugins)
+    timings = {}
+    tasks = {}
+
+    async def setup(plugin: BenchmarkPlugin):
+        for name in dependencies[plugin.name]:
+            try:
+                await tasks[name]
+            except Exception:
+                raise PluginSetupException(plugin.name, f'its dependency `{name}` failed', dependency_failed=True)
+
+        if not plugin.has_setup:
+            return
+
+        logger.info(f' - {plugin.name}')
+        start = time.perf_counter()
+
+        with span('plugin_setup', plugin=plugin.name):
+            if plugin.has_async_setup:
+                awaitable = plugin.setup(suite, logger)
+            else:
+                awaitable = _run_in_daemon_thread(f'plugin-setup-{plugin.name}', plugin.setup, suite, logger)
+
+            try:
+                await asyncio.wait_for(awaitable, plugin.setup_timeout)
+            except asyncio.TimeoutError:
+                # NB: synchronous setup functions cannot be interrupted, they keep running in their daemon thread
+                # until they return or the process exits
+                logger.warning(f'Setup of plugin {plugin.name} timed out, it keeps running in the background')
+                raise PluginSetupException(plugin.name, f'timed out after {plugin.setup_timeout} seconds')
+            finally:
+                timings[plugin.name] = round((time.perf_counter() - start) * 1000, 3)
+
+    for plugin in plugins:
+        tasks[plugin.name] = loop.create_task(setup(plugin))
+
+    results = await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        # errors of dependencies are more relevant than the errors of plugins depending on them
+        errors.sort(key=lambda error: getattr(error, 'dependency_failed', False))
+        raise errors[0]
+    return timings
+
+
 @exception_handle(ModuleNotFoundError, BenchmarkPluginException)
 def handle_plugins(data):
     plugins = data.get('plugins')
@@ -300,13 +621,30 @@ class HostData:
 
     def __init__(self,
                  cpu_count: Optional[int] = None,
-                 env: Optional[Mapping] = None):
+                 env: Optional[Mapping] = None,
+                 generator_ceiling: Optional[float] = None,
+                 calibration_runs: Optional[List[Dict[str, Any]]] = None):
         if cpu_count is None:
             cpu_count = multiprocessing.cpu_count()
         if env is None:
             env = os.environ.copy()
         self.cpu_count = cpu_count
         self.env = env
+        self.generator_ceiling = generator_ceiling
+        self.calibration_runs = calibration_runs
+
+    def use_calibration(self, calibration: Calibration):
+        self.generator_ceiling = calibration.generator_ceiling
+        self.calibration_runs = [run.to_dict() for run in calibration.runs]
+
+    def get_generator_ceiling(self, threads: Optional[int] = None, concurrency: Optional[int] = None):
+        """Returns the requests per second measured by calibration with the given threads and connections,
+        or the highest value measured by calibration."""
+        # NB: hosts stored by older versions don't have calibration data
+        for run in getattr(self, 'calibration_runs', None) or []:
+            if run.get('threads') == threads and run.get('concurrency') == concurrency:
+                return run.get('requests_per_second')
+        return getattr(self, 'generator_ceiling', None)
 
     def to_dict(self):
         return self.__dict__.copy()
@@ -321,6 +659,7 @@ class BenchmarkSuite(Model):
     stores = Collection(BenchmarkOutputStore)
     plugins = Collection((str, BenchmarkPlugin))
     goals = Collection(PerformanceGoal)
+    collectors = Collection(MetricsCollector)
     benchmarks_ids = Collection(str)
     start_time = DateTime()
     end_time = DateTime()
@@ -333,7 +672,19 @@ class BenchmarkSuite(Model):
                      'responses_per_second',
                      'headers',
                      'latency_statistics',
-                     'repeat'}
+                     'repeat',
+                     'executable'}
+
+    matrix_settings = {'url',
+                       'threads',
+                       'concurrency',
+                       'duration',
+                       'timeout',
+                       'responses_per_second',
+                       'script'}
+
+    # matrices are expanded eagerly when suites are created: a warning is logged for larger ones
+    matrix_size_warning = 1000
 
     def __init__(self,
                  configurations: Sequence[BenchmarkConfig],
@@ -348,7 +699,10 @@ class BenchmarkSuite(Model):
                  metadata: Optional[Any] = None,
                  start_time: Optional[datetime] = None,
                  end_time: Optional[datetime] = None,
-                 host_data: Optional[HostData] = None):
+                 host_data: Optional[HostData] = None,
+                 collectors: Optional[Sequence[MetricsCollector]] = None,
+                 result_cache: Optional['ResultCache'] = None,
+                 resolve_scripts: bool = True):
         if host_data is None:
             host_data = HostData()
         if benchmarks_ids is None:
@@ -369,9 +723,17 @@ class BenchmarkSuite(Model):
         self.start_time = start_time
         self.end_time = end_time
         self.benchmarks_ids = benchmarks_ids
+        self.preflight_results = None
+        self.plugins_timings = {}  # type: Dict[str, float]
+        self.hooks_timings = {}  # type: Dict[str, Dict[str, Dict[str, float]]]
+        self._plugins_hooks = None
+        self.collectors = collectors or []
+        self.result_cache = result_cache
+        self.cached_results = {}  # type: Dict[str, str]
+        self._goals_cache = {}  # type: Dict[str, Any]
         self._check_configurations_ids(configurations)
 
-        if scripts_folder:
+        if scripts_folder and resolve_scripts:
             for configuration in configurations:
                 if configuration.script:
                     configuration.script = os.path.join(scripts_folder, configuration.script)
@@ -382,6 +744,42 @@ class BenchmarkSuite(Model):
         if any(isinstance(plugin, str) for plugin in self.plugins):
             self.plugins = [BenchmarkPlugin(name) for name in self.plugins]
 
+    def setup_plugins(self, logger: Logger):
+        """Runs the setup functions of plugins, concurrently according to their dependencies, recording
+        the time each setup took, in milliseconds, in `plugins_timings`."""
+        import asyncio
+
+        self.load_plugins()
+        if not self.plugins or not any(plugin.has_setup for plugin in self.plugins):
+            return
+
+        self.plugins_timings = asyncio.run(_setup_plugins(self, self.plugins, logger))
+
+    def _get_hooks(self, name: str) -> List[Tuple[str, Any]]:
+        if self._plugins_hooks is None:
+            # NB: hooks are resolved once, most plugins don't define any
+            self.load_plugins()
+            self._plugins_hooks = {hook: [(plugin.name, plugin.hooks[hook]) for plugin in self.plugins or []
+                                          if hook in plugin.hooks]
+                                   for hook in PLUGIN_HOOKS}
+        return self._plugins_hooks[name]
+
+    def call_hooks(self, name: str, *args):
+        """Calls the hooks with the given name defined by plugins, recording their count, total and maximum
+        duration in milliseconds in `hooks_timings`, by plugin and hook."""
+        for plugin_name, hook in self._get_hooks(name):
+            start = time.perf_counter()
+            with span('plugin_hook', plugin=plugin_name, hook=name):
+                hook(*args)
+            elapsed = (time.perf_counter() - start) * 1000
+
+            timings = self.hooks_timings.setdefault(plugin_name, {}).get(name)
+            if timings is None:
+                timings = self.hooks_timings[plugin_name][name] = {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0}
+            timings['count'] += 1
+            timings['total_ms'] += elapsed
+            timings['max_ms'] = max(timings['max_ms'], elapsed)
+
     def estimated_time(self) -> int:
         """Returns an estimated time required for completion, in seconds.
         This estimate does not count time spent by implementations of output store."""
@@ -389,6 +787,14 @@ class BenchmarkSuite(Model):
         for configuration in self.configurations:
             i += configuration.duration * configuration.repeat
 
+            if configuration.ab:
+                i += (configuration.duration + self.think_time) * (2 * configuration.ab.rounds - 1) \
+                    * configuration.repeat
+
+            if configuration.optimize:
+                i += configuration.optimize.estimated_probes(configuration.threads) \
+                    * (configuration.optimize.probe_duration + self.think_time)
+
             if configuration.app_variant == WrkVariant.WRK2:
                 # thread calibration may take about 10 seconds
                 i += 10
@@ -424,36 +830,211 @@ class BenchmarkSuite(Model):
         logger.info('Estimated time %s s', self.estimated_time())
         self.start_time = datetime.utcnow()
         configurations_count = len(self.configurations)
+        target_version = self.get_target_version()
 
-        for configuration in self.configurations:
-            if not configuration.repeat:
-                continue
-
-            for i in range(configuration.repeat):
-                benchmark = Benchmark(configuration)
-                benchmark.suite_id = self.id
+        if self.result_cache is not None and target_version is None:
+            logger.warning('[*] Cached results are not used, `target_version` is not defined in metadata')
 
-                logger.info(f'Running benchmark...\n{configuration.get_cmd()}')
+        for goal in itertools.chain(self.goals or [],
+                                    *(configuration.goals or [] for configuration in self.configurations)):
+            goal.use_cache(self._goals_cache)
 
-                output = benchmark.run(logger, self.id)
+        try:
+            for configuration in self.configurations:
+                if not configuration.repeat:
+                    continue
 
-                self.benchmarks_ids.append(output.id)
+                result_key = configuration.get_result_key(target_version) \
+                    if target_version is not None and not configuration.optimize and not configuration.ab else None
 
-                self.check_goals(configuration, output, logger)
+                for i in range(configuration.repeat):
+                    if result_key and self.use_cached_result(configuration, result_key, i, logger):
+                        continue
 
-                logger.debug(f'Storing output for benchmark {benchmark.id}...')
-                self.store_output(configuration, output)
+                    with span('benchmark', test_id=configuration.test_id, repetition=i):
+                        if configuration.optimize:
+                            self.run_optimization(configuration, logger)
+                        elif configuration.ab:
+                            self.run_ab_test(configuration, logger)
+                        else:
+                            self.run_benchmark(configuration, logger, result_key=result_key)
 
-                logger.info('---')
+                    logger.info('---')
 
-                if self.think_time and i + 1 < configurations_count:
-                    logger.debug(f'Waiting for {self.think_time} seconds')
-                    time.sleep(self.think_time)
+                    if self.think_time and i + 1 < configurations_count:
+                        self.wait(logger)
+        finally:
+            self._goals_cache.clear()
+            # NB: outputs buffered by stores are kept, and plugins release their resources, also when benchmarks fail
+            self.flush_stores(logger)
+            self.call_hooks('teardown', self)
 
         logger.debug(f'Storing suite data')
         self.end_time = datetime.utcnow()
         self.store_self()
 
+    def get_target_version(self) -> Optional[str]:
+        """Returns the version of the target defined in metadata, identifying its build."""
+        if isinstance(self.metadata, Mapping) and self.metadata.get('target_version') is not None:
+            return str(self.metadata['target_version'])
+        return None
+
+    def use_cached_result(self,
+                          configuration: BenchmarkConfig,
+                          result_key: str,
+                          repetition: int,
+                          logger: Logger) -> Optional[BenchmarkOutput]:
+        """Links a stored output of the same benchmark, run against the same version of the target,
+        instead of running the benchmark; returns None when the result cache has no such output."""
+        if self.result_cache is None:
+            return None
+
+        output = self.result_cache.get(result_key, self.get_target_version(), repetition)
+        if output is None:
+            return None
+
+        logger.info(f'Using cached output {output.id} of suite {output.suite_id} for {configuration.test_id}')
+        logger.info('---')
+        self.benchmarks_ids.append(output.id)
+        self.cached_results[output.id] = output.suite_id
+        return output
+
+    def wait(self, logger: Logger):
+        logger.debug(f'Waiting for {self.think_time} seconds')
+        with span('think_time'):
+            time.sleep(self.think_time)
+
+    def run_benchmark(self,
+                      configuration: BenchmarkConfig,
+                      logger: Logger,
+                      check_goals: bool = True,
+                      store: bool = True,
+                      **kwargs) -> BenchmarkOutput:
+        """Runs a single benchmark, checking goals and storing its output;
+        additional keyword arguments are set on the output."""
+        benchmark = Benchmark(configuration)
+        benchmark.suite_id = self.id
+
+        self.call_hooks('before_benchmark', configuration)
+
+        logger.info(f'Running benchmark...\n{configuration.get_cmd()}')
+
+        output = benchmark.run(logger, self.id, collectors=self.collectors, **kwargs)
+
+        self.call_hooks('after_benchmark', configuration, output)
+
+        self.benchmarks_ids.append(output.id)
+
+        if output.client is not None and output.client.saturated:
+            logger.warning(f'[*] The load generator was likely the bottleneck of this benchmark: '
+                           f'{"; ".join(output.client.reasons)}')
+
+        ceiling = self.host.get_generator_ceiling(configuration.threads, configuration.concurrency)
+        if ceiling and output.requests_per_second and output.requests_per_second >= ceiling * CEILING_THRESHOLD:
+            logger.warning(f'[*] Requests per second ({output.requests_per_second:.2f}) are near the ceiling '
+                           f'of the load generator measured by calibration ({ceiling:.2f})')
+
+        if check_goals:
+            self.check_goals(configuration, output, logger)
+
+        if store:
+            logger.debug(f'Storing output for benchmark {benchmark.id}...')
+            self.store_output(configuration, output)
+        return output
+
+    def run_ab_test(self, configuration: BenchmarkConfig, logger: Logger) -> List[BenchmarkOutput]:
+        """Alternates short runs against variants A and B, then compares paired differences of metrics.
+        Verdicts are added as goals results to the last output; all outputs share the benchmark's group."""
+        ab = configuration.ab
+        group = configuration.group or configuration.test_id
+        variants = []
+
+        for name, variant in (('a', ab.a), ('b', ab.b)):
+            variants.append((name, configuration.copy(url=variant.url or configuration.url,
+                                                      headers=variant.headers or configuration.headers,
+                                                      group=group)))
+
+        pairs = []
+        runs = []
+        for i in range(ab.rounds):
+            pair = []
+            for name, variant_configuration in variants:
+                if self.think_time and runs:
+                    self.wait(logger)
+
+                run_configuration = variant_configuration.copy(test_id=f'{configuration.test_id}_{name}_{i}',
+                                                               parameters={'variant': name, 'round': i})
+                output = self.run_benchmark(run_configuration, logger, store=False)
+                runs.append((run_configuration, output))
+                pair.append(output)
+            pairs.append(tuple(pair))
+
+        differences = compare_pairs(pairs, ab)
+        last_output = runs[-1][1]
+
+        for difference in differences:
+            logger.info(repr(difference))
+            last_output.goals_results.append(PerformanceGoalResult(difference.verdict != 'regression',
+                                                                   repr(difference),
+                                                                   details=difference.to_dict()))
+
+        for run_configuration, output in runs:
+            self.store_output(run_configuration, output)
+        return [output for _, output in runs]
+
+    def run_optimization(self, configuration: BenchmarkConfig, logger: Logger) -> BenchmarkOutput:
+        """Runs short probes to find the concurrency with the highest throughput, then a full length
+        confirmation benchmark at the best concurrency. Probes are stored as normal outputs, referencing the
+        confirmation output by `parent_id`; the confirmation output lists them in `probes_ids`."""
+        search = configuration.optimize
+        output_id = str(uuid4())
+        group = configuration.group or configuration.test_id
+
+        probes_count = 0
+
+        def probe(concurrency: int) -> Probe:
+            nonlocal probes_count
+            if self.think_time and probes_count:
+                self.wait(logger)
+            probes_count += 1
+            probe_configuration = configuration.copy(test_id=f'{configuration.test_id}_probe_{concurrency}',
+                                                     concurrency=concurrency,
+                                                     duration=search.probe_duration,
+                                                     group=group,
+                                                     parameters={'concurrency': concurrency, 'probe': True})
+            output = self.run_benchmark(probe_configuration, logger, check_goals=False, parent_id=output_id)
+            return Probe(concurrency,
+                         output.requests_per_second,
+                         self._get_probe_latency(output, search.latency_percentile),
+                         output.id)
+
+        logger.info(f'Searching the best concurrency for {configuration.test_id}...')
+        probes = search.search(probe, configuration.threads)
+        best = search.get_best(probes)
+
+        if not search.is_acceptable(best):
+            logger.warning(f'No probe satisfied the latency limit of {search.latency_limit} ms; '
+                           f'using the lowest probed concurrency')
+
+        logger.info(f'Best concurrency for {configuration.test_id}: {best.concurrency} '
+                    f'({best.requests_per_second} requests/sec)')
+
+        if self.think_time:
+            self.wait(logger)
+
+        return self.run_benchmark(configuration.copy(concurrency=best.concurrency,
+                                                     group=group,
+                                                     parameters={'concurrency': best.concurrency}),
+                                  logger,
+                                  benchmark_id=output_id,
+                                  probes_ids=[item.output_id for item in probes])
+
+    @staticmethod
+    def _get_probe_latency(output: BenchmarkOutput, percentile: Optional[float]) -> Optional[float]:
+        if percentile is None:
+            return get_metrics(output).get('avg_latency_ms')
+        return get_percentile(output, percentile)
+
     def check_goals(self, configuration: BenchmarkConfig, output: BenchmarkOutput, logger: Logger):
         if not self.goals and not configuration.goals:
             logger.debug(f'No performance goals are defined for {configuration.test_id}')
@@ -467,26 +1048,29 @@ class BenchmarkSuite(Model):
                      goals: Sequence[PerformanceGoal],
                      logger: Logger):
         for goal in goals:
-            try:
-                is_satisfied = goal.is_satisfied(output)
-            except (AssertionError, GoalException) as error:
-                logger.exception('Error while checking performance goal', exc_info=error)
-                result = PerformanceGoalResult(False, repr(goal), str(error))
-            else:
-                logger.debug(f'--> goal {goal.get_class_name()} satisfied: {is_satisfied}')
-                result = PerformanceGoalResult(is_satisfied, repr(goal), None)
-
-            output.goals_results.append(result)
+            with span('check_goal', goal=goal.get_class_name()):
+                output.goals_results.append(evaluate_goal(goal, output, logger))
 
     def store_self(self):
         for store in self.stores:
-            store.store_suite(self)
+            with span('store_suite', store=store.get_class_name()):
+                store.store_suite(self)
+
+    def flush_stores(self, logger: Logger):
+        for store in self.stores:
+            try:
+                with span('flush_store', store=store.get_class_name()):
+                    store.flush()
+            except Exception:
+                # NB: a failing store must not prevent others from writing their outputs
+                logger.exception(f'Error while flushing store {store.get_class_name()}')
 
     def store_output(self,
                      configuration: BenchmarkConfig,
                      output: BenchmarkOutput):
         for store in self.stores:
-            store.store(configuration, output)
+            with span('store_output', store=store.get_class_name()):
+                store.store(configuration, output)
 
     @classmethod
     def from_yaml(cls, file_path: str):
@@ -513,7 +1097,13 @@ class BenchmarkSuite(Model):
             'benchmarks_ids': self.benchmarks_ids,
             'start_time': self.start_time,
             'end_time': self.end_time,
-            'location': self.location
+            'location': self.location,
+            'preflight_results': self.preflight_results,
+            'plugins_timings': self.plugins_timings,
+            'hooks_timings': self.hooks_timings,
+            'collectors': self.collectors,
+            'result_cache': self.result_cache,
+            'cached_results': self.cached_results
         }
 
     @staticmethod
@@ -567,6 +1157,83 @@ class BenchmarkSuite(Model):
                 if root_name not in configuration or configuration.get(root_name) is None:
                     configuration[root_name] = root_value
 
+    @staticmethod
+    def _get_matrix_values(name: str, value) -> Sequence:
+        if isinstance(value, Mapping):
+            try:
+                start = value['start']
+                stop = value['stop']
+            except KeyError:
+                raise InvalidArgument(f'Invalid matrix range for `{name}`: `start` and `stop` are required')
+
+            factor = value.get('factor')
+            if factor is not None:
+                if factor <= 1 or start <= 0:
+                    raise InvalidArgument(f'Invalid matrix range for `{name}`: '
+                                          f'`factor` must be greater than 1 and `start` positive')
+                values = []
+                while start <= stop:
+                    values.append(start)
+                    # NB: small values multiplied by small factors would round to the same integer
+                    start = max(start + 1, math.ceil(start * factor))
+                return values
+
+            step = value.get('step', 1)
+            if step <= 0:
+                raise InvalidArgument(f'Invalid matrix range for `{name}`: `step` must be positive')
+            return list(range(start, stop + 1, step))
+
+        if isinstance(value, (str, bytes)) or not isinstance(value, Iterable):
+            return [value]
+        return list(value)
+
+    @staticmethod
+    def expand_matrix(configuration: Mapping, index: int) -> Generator[Mapping, None, None]:
+        """Yields the configurations described by the `matrix` section of a benchmark configuration,
+        one for each combination of its values. Generated configurations share the same `group`."""
+        matrix = configuration.get('matrix')
+
+        if not matrix:
+            yield configuration
+            return
+
+        if not isinstance(matrix, Mapping):
+            raise InvalidArgument('Invalid matrix: expected a mapping of settings to values')
+
+        unsupported = set(matrix) - BenchmarkSuite.matrix_settings
+        if unsupported:
+            raise InvalidArgument(f'Unsupported matrix settings: {", ".join(sorted(unsupported))}; '
+                                  f'supported settings are: {", ".join(sorted(BenchmarkSuite.matrix_settings))}')
+
+        group = configuration.get('test_id') or f'matrix_{index}'
+        names = list(matrix)
+        matrix_values = [list(enumerate(BenchmarkSuite._get_matrix_values(name, matrix[name]))) for name in names]
+
+        size = 1
+        for values in matrix_values:
+            size *= len(values)
+        if size > BenchmarkSuite.matrix_size_warning:
+            logging.getLogger('wrktoolbox').warning(f'The matrix of `{group}` generates {size} configurations, '
+                                                    f'which are all created and kept in memory')
+
+        for combination in itertools.product(*matrix_values):
+            parameters = {name: value for name, (_, value) in zip(names, combination)}
+            # numeric settings are used as they are in generated ids, others by their position
+            suffix = ''.join(f'_{name}_{value if name in BenchmarkSuite.root_settings else position}'
+                             for name, (position, value) in zip(names, combination))
+
+            item = {key: value for key, value in configuration.items() if key != 'matrix'}
+            item.update(parameters)
+            item['group'] = group
+            item['parameters'] = parameters
+            item['test_id'] = group + suffix
+            yield item
+
+    @staticmethod
+    def expand_matrices(configurations: Iterable[Mapping]) -> Generator[Mapping, None, None]:
+        for index, configuration in enumerate(configurations):
+            yield from BenchmarkSuite.expand_matrix(configuration, index)
+
     @staticmethod
     def normalize_configuration(data):
         configurations_key = 'configurations'
@@ -586,23 +1253,52 @@ class BenchmarkSuite(Model):
             if name not in data:
                 raise InvalidArgument(f'Missing `{name}` in configuration')
 
+        configurations = data[configurations_key]
+        if configurations and any('matrix' in configuration for configuration in configurations):
+            # NB: expanded settings are iterated by each of the following steps, and stored with normalized
+            # settings in the suites cache, so they are materialized here; configurations are created later
+            data[configurations_key] = list(BenchmarkSuite.expand_matrices(configurations))
+
+        for configuration in data[configurations_key] or []:
+            ab = configuration.get('ab')
+            if isinstance(ab, Mapping) and not configuration.get('url') and isinstance(ab.get('a'), Mapping):
+                # A/B tests use the url of variant A, unless a common url is configured
+                configuration['url'] = ab['a'].get('url')
+
         BenchmarkSuite.use_base_url(data)
         BenchmarkSuite.use_root_settings(data)
 
     @classmethod
-    def from_dict(cls, data):
-        cls.normalize_configuration(data)
+    def from_dict(cls, data, configurations: Optional[Sequence[BenchmarkConfig]] = None):
+        """Creates a suite from settings; configurations already created from the same normalized settings
+        can be given, in which case normalization and validation of configurations are skipped, and their scripts
+        paths are not joined again to the scripts folder."""
+        created = configurations is None
+        if created:
+            cls.normalize_configuration(data)
 
         # NB: plugins must be first imported, as they might register new types
         plugins = list(handle_plugins(data))
 
-        for benchmark in data.get('configurations'):
-            if 'goals' in benchmark:
-                benchmark['goals'] = _get_goals(benchmark.get('goals'))
+        if configurations is None:
+            for benchmark in data.get('configurations'):
+                if 'goals' in benchmark:
+                    benchmark['goals'] = _get_goals(benchmark.get('goals'))
+
+            configurations = [BenchmarkConfig(**item) for item in data.get('configurations')]
 
         host_data = HostData(**data.get('host')) if 'host' in data else None
 
-        return cls([BenchmarkConfig(**item) for item in data.get('configurations')],
+        if host_data is None and data.get('calibration'):
+            host_data = HostData()
+            host_data.use_calibration(Calibration.load(data['calibration']))
+
+        result_cache = None
+        if data.get('result_cache'):
+            from .resultcache import ResultCache
+            result_cache = ResultCache(**data['result_cache'])
+
+        return cls(configurations,
                    [BenchmarkOutputStore.from_configuration(item) for item in data.get('stores')],
                    data.get('scripts_folder'),
                    plugins,
@@ -614,4 +1310,7 @@ class BenchmarkSuite(Model):
                    metadata=data.get('metadata'),
                    start_time=data.get('start_time'),
                    end_time=data.get('end_time'),
-                   host_data=host_data)
+                   host_data=host_data,
+                   collectors=[MetricsCollector.from_configuration(item) for item in data.get('collectors') or []],
+                   result_cache=result_cache,
+                   resolve_scripts=created)
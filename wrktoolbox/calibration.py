@@ -0,0 +1,122 @@
+"""Calibration of the load generator: benchmarks with the threads and connections of a suite run against a local
+sink server, which answers immediately, to measure the maximum requests per second wrk can produce on this host.
+Results near that ceiling measure the client, not the target."""
+import json
+import multiprocessing
+from logging import Logger
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from rocore.exceptions import InvalidArgument
+
+
+CEILING_THRESHOLD = 0.9
+
+
+class CalibrationRun:
+
+    def __init__(self,
+                 threads: int,
+                 concurrency: int,
+                 requests_per_second: float,
+                 client_saturated: Optional[bool] = None):
+        self.threads = threads
+        self.concurrency = concurrency
+        self.requests_per_second = requests_per_second
+        self.client_saturated = client_saturated
+
+    def to_dict(self):
+        return self.__dict__.copy()
+
+
+class Calibration:
+
+    def __init__(self,
+                 runs: List[CalibrationRun],
+                 cpu_count: Optional[int] = None,
+                 time: Optional[str] = None,
+                 generator_ceiling: Optional[float] = None):
+        self.runs = [run if isinstance(run, CalibrationRun) else CalibrationRun(**run) for run in runs]
+        self.cpu_count = cpu_count or multiprocessing.cpu_count()
+        self.time = time or datetime.utcnow().isoformat()
+        if generator_ceiling is None:
+            generator_ceiling = max((run.requests_per_second for run in self.runs), default=None)
+        self.generator_ceiling = generator_ceiling
+
+    def to_dict(self):
+        return {
+            'generator_ceiling': self.generator_ceiling,
+            'cpu_count': self.cpu_count,
+            'time': self.time,
+            'runs': [run.to_dict() for run in self.runs]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Calibration':
+        return cls(data.get('runs') or [], data.get('cpu_count'), data.get('time'), data.get('generator_ceiling'))
+
+    @classmethod
+    def load(cls, file_path: str) -> 'Calibration':
+        try:
+            with open(file_path, mode='rt', encoding='utf8') as file:
+                return cls.from_dict(json.load(file))
+        except (OSError, ValueError) as e:
+            raise InvalidArgument(f'Cannot read calibration file `{file_path}`: {e}')
+
+    def write(self, file_path: str):
+        with open(file_path, mode='wt', encoding='utf8') as file:
+            json.dump(self.to_dict(), file, indent=4)
+
+
+def get_generator_settings(configurations: Iterable) -> List[Tuple[int, int]]:
+    """Returns the distinct pairs of threads and connections used by benchmark configurations."""
+    settings = []
+    for configuration in configurations:
+        item = (configuration.threads, configuration.concurrency)
+        if item not in settings:
+            settings.append(item)
+    return settings
+
+
+def calibrate(configurations: Iterable,
+              duration: int = 10,
+              workers: Optional[int] = None,
+              logger: Optional[Logger] = None) -> Calibration:
+    """Runs closed-loop wrk benchmarks with the threads and connections of the given configurations against a local
+    sink server; the sink uses half of the CPUs by default, so the generator can use the others."""
+    # NB: imported here, since benchmarks imports this module, and the sink is needed only by calibration
+    from .benchmarks import Benchmark, WrkVariant
+    from .sink import SinkServer
+
+    configurations = list(configurations)
+    if not configurations:
+        raise InvalidArgument('Missing benchmark configurations to calibrate')
+
+    runs = []
+
+    with SinkServer(workers or max(1, multiprocessing.cpu_count() // 2)) as sink:
+        for threads, concurrency in get_generator_settings(configurations):
+            # the executable of the first configuration is used, it is normally a root setting
+            configuration = configurations[0].copy(url=sink.url,
+                                                   test_id=None,
+                                                   threads=threads,
+                                                   concurrency=concurrency,
+                                                   duration=duration,
+                                                   app_variant=WrkVariant.WRK,
+                                                   responses_per_second=None,
+                                                   script=None,
+                                                   headers=None,
+                                                   latency_statistics=False)
+            if logger:
+                logger.info(f'Calibrating with {threads} threads and {concurrency} connections...')
+
+            output = Benchmark(configuration).run(logger)
+            client = getattr(output, 'client', None)
+            runs.append(CalibrationRun(threads,
+                                       concurrency,
+                                       output.requests_per_second,
+                                       client.saturated if client is not None else None))
+
+            if logger:
+                logger.info(f'  {output.requests_per_second:.2f} requests per second')
+
+    return Calibration(runs)
@@ -0,0 +1,2 @@
+from .collector import MetricsCollector, MetricSeries, PollingCollector, CollectorsContext
+from .prometheus import PrometheusCollector
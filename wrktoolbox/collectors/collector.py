@@ -0,0 +1,172 @@
+import logging
+import threading
+import time
+from abc import abstractmethod
+from typing import Dict, List, Optional, Sequence, Tuple
+from rocore.registry import Registry
+from wrktoolbox.wrkoutput import Result
+
+
+Point = Tuple[float, float]
+
+logger = logging.getLogger('wrktoolbox')
+
+
+def downsample(points: Sequence[Point], max_points: int) -> List[Point]:
+    """Reduces points to at most max_points, averaging times and values of consecutive points."""
+    if len(points) <= max_points:
+        return [(round(t, 3), value) for t, value in points]
+
+    size = len(points) / max_points
+    result = []
+    for index in range(max_points):
+        bucket = points[int(index * size):int((index + 1) * size)]
+        result.append((round(sum(t for t, _ in bucket) / len(bucket), 3),
+                       sum(value for _, value in bucket) / len(bucket)))
+    return result
+
+
+class MetricSeries(Result):
+    """Values of a target metric sampled during a benchmark; times are seconds since the benchmark start."""
+
+    def __init__(self,
+                 name: str,
+                 kind: str,
+                 points: Sequence[Sequence[float]],
+                 min_value: Optional[float] = None,
+                 avg_value: Optional[float] = None,
+                 max_value: Optional[float] = None):
+        values = [value for _, value in points]
+        self.name = name
+        self.kind = kind
+        self.points = [list(point) for point in points]
+        self.min_value = min_value if min_value is not None else min(values, default=None)
+        self.avg_value = avg_value if avg_value is not None else (sum(values) / len(values) if values else None)
+        self.max_value = max_value if max_value is not None else max(values, default=None)
+
+
+class MetricsCollector(Registry):
+    """A class that collects metrics of the benchmarked target, while benchmarks run."""
+
+    @abstractmethod
+    def start(self):
+        """Starts collecting metrics for a benchmark."""
+
+    @abstractmethod
+    def stop(self) -> Dict[str, MetricSeries]:
+        """Stops collecting metrics, returning the series collected since start, by name."""
+
+
+class PollingCollector(MetricsCollector):
+    """Base class for collectors that poll a source at an interval, in a background thread."""
+
+    def __init__(self, interval: float = 1.0, max_points: int = 60, name: Optional[str] = None):
+        self.interval = float(interval)
+        self.max_points = int(max_points)
+        self.name = name
+        self._samples = []  # type: List[Tuple[float, Dict[str, float]]]
+        self._kinds = {}  # type: Dict[str, str]
+        self._errors = 0
+        self._stopped = threading.Event()
+        self._thread = None  # type: Optional[threading.Thread]
+
+    def __getstate__(self):
+        return {key: value for key, value in self.__dict__.items() if not key.startswith('_')}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def to_dict(self):
+        data = self.__getstate__()
+        data['type'] = self.get_class_name()
+        return data
+
+    @abstractmethod
+    def poll(self) -> Dict[str, Tuple[str, float]]:
+        """Reads current values of metrics, by name, with their kind: gauge or counter."""
+
+    def close(self):
+        """Releases resources used while polling."""
+
+    def start(self):
+        self._samples = []
+        self._errors = 0
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name=f'{self.get_class_name()}-collector', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        start = time.monotonic()
+        while True:
+            try:
+                values = self.poll()
+            except Exception:
+                self._errors += 1
+                logger.debug('Error while polling target metrics', exc_info=True)
+            else:
+                self._samples.append((time.monotonic() - start,
+                                      {name: value for name, (_, value) in values.items()}))
+                self._kinds.update((name, kind) for name, (kind, _) in values.items())
+
+            if self._stopped.wait(self.interval):
+                return
+
+    def stop(self) -> Dict[str, MetricSeries]:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.close()
+
+        if self._errors:
+            logger.warning(f'[*] {self._errors} errors while collecting target metrics with '
+                           f'{self.name or self.get_class_name()}')
+        return self.get_series()
+
+    def get_series(self) -> Dict[str, MetricSeries]:
+        series = {}
+        prefix = f'{self.name}:' if self.name else ''
+
+        for name in sorted(self._kinds):
+            points = [(t, values[name]) for t, values in self._samples if name in values]
+            kind = self._kinds[name]
+
+            if kind == 'counter':
+                # counters are converted to rates per second between consecutive samples
+                points = [(t, (value - previous) / (t - previous_t))
+                          for (previous_t, previous), (t, value) in zip(points, points[1:])
+                          if t > previous_t and value >= previous]
+                kind = 'rate'
+
+            if points:
+                series[prefix + name] = MetricSeries(prefix + name, kind, downsample(points, self.max_points))
+        return series
+
+
+class CollectorsContext:
+    """Runs collectors for the duration of a with block; collected series are available in `series`."""
+
+    def __init__(self, collectors: Sequence[MetricsCollector]):
+        self.collectors = collectors
+        self.series = {}  # type: Dict[str, MetricSeries]
+
+    def __enter__(self):
+        for index, collector in enumerate(self.collectors):
+            try:
+                collector.start()
+            except Exception:
+                # collectors already started are stopped, since __exit__ is not called
+                self._stop(self.collectors[:index])
+                raise
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stop(self.collectors)
+
+    def _stop(self, collectors: Sequence[MetricsCollector]):
+        for collector in collectors:
+            try:
+                self.series.update(collector.stop())
+            except Exception:
+                # NB: a failing collector must not prevent others from stopping
+                logger.exception(f'Error while stopping collector '
+                                 f'{getattr(collector, "name", None) or collector.get_class_name()}')
@@ -0,0 +1,127 @@
+import re
+import fnmatch
+import http.client
+from typing import Dict, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+from rocore.exceptions import InvalidArgument
+from wrktoolbox.web import get_ssl_context
+from .collector import PollingCollector
+
+
+_SAMPLE_PATTERN = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{.*\})?\s+(\S+)')
+_TYPE_PATTERN = re.compile(r'^#\s*TYPE\s+(\S+)\s+(\S+)')
+
+
+def parse_metrics(text: str) -> Dict[str, Tuple[str, float]]:
+    """Parses metrics in Prometheus text format, returning values by series name (including labels),
+    with their kind. Histogram and summary samples are handled as counters, except quantiles."""
+    types = {}
+    values = {}
+
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+
+        if line.startswith('#'):
+            match = _TYPE_PATTERN.match(line)
+            if match:
+                types[match.group(1)] = match.group(2)
+            continue
+
+        match = _SAMPLE_PATTERN.match(line)
+        if not match:
+            continue
+
+        name, labels, value = match.groups()
+        try:
+            value = float(value)
+        except ValueError:
+            continue
+
+        family = re.sub(r'_(total|sum|count|bucket)$', '', name)
+        kind = types.get(name) or types.get(family) or ('counter' if name.endswith('_total') else 'gauge')
+        if kind in ('histogram', 'summary'):
+            kind = 'gauge' if 'quantile=' in (labels or '') else 'counter'
+        elif kind != 'counter':
+            kind = 'gauge'
+
+        values[name + (labels or '')] = (kind, value)
+    return values
+
+
+class PrometheusCollector(PollingCollector):
+    """Scrapes metrics in Prometheus text format from an endpoint, using a keep-alive connection."""
+
+    type_name = 'prometheus'
+
+    def __init__(self,
+                 url: str,
+                 metrics: Optional[Sequence[str]] = None,
+                 interval: float = 1.0,
+                 timeout: float = 5.0,
+                 max_points: int = 60,
+                 headers: Optional[Dict[str, str]] = None,
+                 name: Optional[str] = None):
+        """
+        Creates a new instance of PrometheusCollector.
+
+        :param url: url of the metrics endpoint
+        :param metrics: patterns of metric names to collect (e.g. process_*); by default all metrics are collected
+        :param interval: polling interval, in seconds
+        :param timeout: timeout of scrape requests, in seconds
+        :param max_points: maximum number of points stored for each series
+        :param headers: optional request headers, for example for authentication
+        :param name: optional prefix of series names, to distinguish collectors
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise InvalidArgument(f'Invalid metrics endpoint url: {url}')
+
+        super().__init__(interval, max_points, name)
+        self.url = url
+        self.metrics = list(metrics) if metrics else None
+        self.timeout = float(timeout)
+        self.headers = headers
+        self._connection = None  # type: Optional[http.client.HTTPConnection]
+
+    def _get_connection(self) -> http.client.HTTPConnection:
+        if self._connection is None:
+            parts = urlsplit(self.url)
+            if parts.scheme == 'https':
+                self._connection = http.client.HTTPSConnection(parts.hostname, parts.port, timeout=self.timeout,
+                                                               context=get_ssl_context())
+            else:
+                self._connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=self.timeout)
+        return self._connection
+
+    def _is_selected(self, name: str) -> bool:
+        if not self.metrics:
+            return True
+        name = name.split('{', 1)[0]
+        return any(fnmatch.fnmatch(name, pattern) for pattern in self.metrics)
+
+    def poll(self) -> Dict[str, Tuple[str, float]]:
+        parts = urlsplit(self.url)
+        path = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+        connection = self._get_connection()
+
+        try:
+            connection.request('GET', path, headers=self.headers or {})
+            response = connection.getresponse()
+            content = response.read()
+        except (OSError, http.client.HTTPException):
+            # the connection is opened again at the next poll
+            self.close()
+            raise
+
+        if response.status != 200:
+            raise http.client.HTTPException(f'Metrics endpoint responded with status {response.status}')
+
+        return {name: value for name, value in parse_metrics(content.decode('utf8')).items()
+                if self._is_selected(name)}
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
@@ -1,16 +1,17 @@
 import os
 import json
-import yaml
-import urllib.request
+import importlib
 from enum import Enum
-from typing import Tuple, Mapping
+from typing import Tuple, Mapping, Optional, TYPE_CHECKING
 from abc import ABC, abstractmethod
 from wrktoolbox.logs import get_app_logger
-from rocore.decorators import retry
 from rocore.exceptions import InvalidArgument, EmptyArgumentException
-from roconfiguration import Configuration, ConfigurationError
+from wrktoolbox.settingscache import CachedSettings, SettingsCache, DEFAULT_FOLDER as DEFAULT_SETTINGS_CACHE_FOLDER
 from wrktoolbox.web import get_ssl_context
 
+if TYPE_CHECKING:
+    from roconfiguration import Configuration
+
 
 logger = get_app_logger()
 
@@ -39,8 +40,12 @@ class SettingsSource(ABC):
         """Returns a value indicating whether a settings source is handled by this class."""
 
     @abstractmethod
-    def handle(self, value: str) -> Tuple[Mapping, SettingsFormat]:
-        """Obtains settings mapping and format from a value."""
+    def read(self, value: str) -> Tuple[str, SettingsFormat]:
+        """Obtains settings content and format from a value."""
+
+    def handle(self, value: str) -> Mapping:
+        """Obtains settings mapping from a value."""
+        return self.parse(*self.read(value))
 
     @staticmethod
     def parse(value: str, settings_format: SettingsFormat) -> Mapping:
@@ -49,6 +54,7 @@ class SettingsSource(ABC):
         if settings_format == SettingsFormat.JSON:
             return json.loads(value)
         if settings_format == SettingsFormat.YAML:
+            import yaml
             return yaml.safe_load(value)
 
         raise RuntimeError(f'Settings format not handled {settings_format}')
@@ -56,30 +62,87 @@ class SettingsSource(ABC):
 
 class SettingsHttpSource(SettingsSource):
 
+    def __init__(self, cache: Optional[SettingsCache] = None):
+        self.cache = cache
+
     def is_match(self, value: str) -> bool:
         return value.startswith('http://') or value.startswith('https://')
 
-    @retry(delay=0.5, on_exception=log_retry)
-    def _fetch_response(self, source_url):
-        return urllib.request.urlopen(source_url, context=get_ssl_context())
+    def _fetch_response(self, source_url, headers=None):
+        import urllib.error
+        import urllib.request
+        from rocore.decorators import retry
 
-    def handle(self, value: str) -> Mapping:
-        response = self._fetch_response(value)
-        content_type = response.headers['content-type']
+        request = urllib.request.Request(source_url, headers=headers or {})
 
-        if 'json' in content_type:
-            settings_format = SettingsFormat.JSON
-        elif 'yaml' in content_type:
-            settings_format = SettingsFormat.YAML
-        elif '.json' in value:
-            settings_format = SettingsFormat.JSON
-        elif '.yaml' in value:
-            settings_format = SettingsFormat.YAML
-        else:
-            raise ConfigurationError('Settings must be yaml or json')
+        @retry(delay=0.5, on_exception=log_retry)
+        def fetch():
+            try:
+                return urllib.request.urlopen(request, context=get_ssl_context())
+            except urllib.error.HTTPError as error:
+                if error.code < 500:
+                    # not modified responses to conditional requests, and client errors, are not retried
+                    return error
+                raise
+        return fetch()
 
+    @staticmethod
+    def _get_format(value: str, content_type: str) -> SettingsFormat:
+        if 'json' in content_type:
+            return SettingsFormat.JSON
+        if 'yaml' in content_type:
+            return SettingsFormat.YAML
+        if '.json' in value:
+            return SettingsFormat.JSON
+        if '.yaml' in value:
+            return SettingsFormat.YAML
+
+        from roconfiguration import ConfigurationError
+        raise ConfigurationError('Settings must be yaml or json')
+
+    def read(self, value: str) -> Tuple[str, SettingsFormat]:
+        import urllib.error
+
+        cached = self.cache.get(value) if self.cache is not None else None
+
+        if cached is not None and self.cache.is_fresh(cached):
+            logger.debug(f'Using cached settings downloaded {cached.age:.0f}s ago from {value}')
+            return cached.content, SettingsFormat(cached.settings_format)
+
+        try:
+            response = self._fetch_response(value, cached.get_conditional_headers() if cached else None)
+        except urllib.error.HTTPError as error:
+            if cached is None or error.code < 500:
+                raise
+            logger.warning(f'[*] Settings server responded with status {error.code}; using cached settings '
+                           f'downloaded {cached.age:.0f}s ago')
+            return cached.content, SettingsFormat(cached.settings_format)
+        except OSError as error:
+            # NB: URLError is a subclass of OSError
+            if cached is None:
+                raise
+            logger.warning(f'[*] Settings server is unreachable ({error}); using cached settings '
+                           f'downloaded {cached.age:.0f}s ago')
+            return cached.content, SettingsFormat(cached.settings_format)
+
+        if response.getcode() == 304 and cached is not None:
+            logger.debug(f'Cached settings are still valid for {value}')
+            self.cache.touch(cached)
+            return cached.content, SettingsFormat(cached.settings_format)
+
+        if response.getcode() >= 300:
+            raise response
+
+        settings_format = self._get_format(value, response.headers['content-type'] or '')
         content = response.read().decode('utf8')
-        return self.parse(content, settings_format)
+
+        if self.cache is not None:
+            self.cache.set(CachedSettings(value,
+                                          content,
+                                          settings_format.value,
+                                          etag=response.headers['etag'],
+                                          last_modified=response.headers['last-modified']))
+        return content, settings_format
 
 
 class SettingsFileSource(SettingsSource):
@@ -87,7 +150,7 @@ class SettingsFileSource(SettingsSource):
     def is_match(self, value: str) -> bool:
         return value.endswith('.json') or value.endswith('.yaml')
 
-    def handle(self, value: str) -> Mapping:
+    def read(self, value: str) -> Tuple[str, SettingsFormat]:
         if not os.path.exists(value):
             raise SettingsFileNotFound(value)
 
@@ -97,24 +160,64 @@ class SettingsFileSource(SettingsSource):
         settings_format = SettingsFormat.YAML if value.endswith('.yaml') else SettingsFormat.JSON
 
         with open(value, mode='rt', encoding='utf8') as settings_file:
-            content = settings_file.read()
-        return self.parse(content, settings_format)
+            return settings_file.read(), settings_format
 
 
-def normalize_settings(settings_file: str) -> Mapping:
+settings_cache = SettingsCache()  # type: Optional[SettingsCache]
+
+
+def configure_settings_cache(max_age: float = 0, folder: Optional[str] = None):
+    """Configures the cache of settings downloaded over HTTP; settings younger than max-age are used
+    without revalidation."""
+    global settings_cache
+    settings_cache = SettingsCache(folder or DEFAULT_SETTINGS_CACHE_FOLDER, max_age)
+
+
+def disable_settings_cache():
+    global settings_cache
+    settings_cache = None
+
+
+def get_settings_source(settings_file: str) -> SettingsSource:
     if not settings_file:
         raise EmptyArgumentException('settings_name')
 
-    for source in [SettingsHttpSource(), SettingsFileSource()]:
+    for source in [SettingsHttpSource(settings_cache), SettingsFileSource()]:
         if source.is_match(settings_file):
-            return source.handle(settings_file)
+            return source
 
     raise InvalidArgument(f'Settings argument `{settings_file}` is not handled.')
 
 
-def get_configuration(settings_file: str) -> Configuration:
-    settings = normalize_settings(settings_file)
+def read_settings(settings_file: str) -> Tuple[str, SettingsFormat]:
+    return get_settings_source(settings_file).read(settings_file)
+
+
+def normalize_settings(settings_file: str) -> Mapping:
+    return get_settings_source(settings_file).handle(settings_file)
+
+
+def create_configuration(settings: Mapping) -> 'Configuration':
+    from roconfiguration import Configuration
 
     configuration = Configuration(settings)
     configuration.add_environmental_variables('WRKTOOLBOX_', strip_prefix=True)
     return configuration
+
+
+def get_configuration(settings_file: str) -> 'Configuration':
+    return create_configuration(normalize_settings(settings_file))
+
+
+BUILTIN_TYPES_MODULES = ('wrktoolbox.goals',
+                         'wrktoolbox.stores',
+                         'wrktoolbox.results.importers.fs',
+                         'wrktoolbox.results.importers.sqlite',
+                         'wrktoolbox.reports')
+
+
+def import_builtin_types():
+    """Imports the modules defining built-in goals, stores, importers and report writers, registering their types
+    so they can be used in settings. Commands call this when they run, rather than at import time."""
+    for module_name in BUILTIN_TYPES_MODULES:
+        importlib.import_module(module_name)
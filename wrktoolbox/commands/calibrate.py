@@ -0,0 +1,72 @@
+import sys
+import click
+from wrktoolbox.logs import get_app_logger
+from wrktoolbox.commands import get_configuration, import_builtin_types, SettingsFileNotFound
+from rocore.exceptions import InvalidArgument
+
+
+logger = get_app_logger()
+
+
+def calibrate_core(settings, duration=10, workers=None, output_file='calibration.json'):
+    from roconfiguration import ConfigurationError
+    from wrktoolbox.benchmarks import BenchmarkSuite, BenchmarkException
+    from wrktoolbox.calibration import calibrate
+
+    sys.path.insert(0, '.')
+    import_builtin_types()
+
+    try:
+        configuration = get_configuration(settings)
+        suite = BenchmarkSuite.from_dict(configuration.values)
+    except SettingsFileNotFound as e:
+        logger.info(f'[*] Error: {e}')
+        exit(1)
+        return
+    except (InvalidArgument, ConfigurationError):
+        logger.exception('An error occurred while loading configuration')
+        exit(2)
+        return
+
+    try:
+        calibration = calibrate(suite.configurations, duration, workers, logger)
+    except (InvalidArgument, BenchmarkException) as e:
+        logger.error(f'[*] Calibration failed: {e}')
+        exit(1)
+        return
+
+    calibration.write(output_file)
+    logger.info(f'Ceiling of the load generator: {calibration.generator_ceiling:.2f} requests per second')
+    logger.info(f'Calibration written to {output_file}; reference it with `calibration: {output_file}` '
+                f'in settings to flag results near the ceiling')
+
+
+@click.command(name='calibrate')
+@click.option('--settings',
+              default='settings.yaml',
+              help='Settings source (YAML or JSON), whose threads and connections settings are calibrated; '
+                   'can be a file path or an URL.',
+              show_default=True)
+@click.option('--duration',
+              default=10,
+              type=int,
+              help='Duration of each calibration run, in seconds.',
+              show_default=True)
+@click.option('--workers',
+              default=None,
+              type=int,
+              help='Number of processes of the local sink server; defaults to half of the CPUs.')
+@click.option('--output',
+              default='calibration.json',
+              help='Path of the JSON file where calibration results are written.',
+              show_default=True)
+def calibrate_command(settings, duration, workers, output):
+    """
+    Measures the maximum requests per second the load generator can produce on this host, running the threads and
+    connections settings of a suite against a local server that answers immediately.
+    """
+    try:
+        calibrate_core(settings, duration, workers, output)
+    except KeyboardInterrupt:
+        logger.info('[*] User interrupted')
+        exit(1)
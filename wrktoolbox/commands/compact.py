@@ -0,0 +1,93 @@
+import os
+import click
+from rocore.exceptions import InvalidArgument
+from wrktoolbox.logs import get_app_logger
+
+
+logger = get_app_logger()
+
+
+def _get_seconds(days):
+    from wrktoolbox.compaction import DAY
+
+    return days * DAY if days is not None else None
+
+
+def compact_core(root_folder='out',
+                 pack_after=0,
+                 compact_after=None,
+                 retention=None,
+                 percentiles=None,
+                 compression=None,
+                 dry_run=False):
+    from wrktoolbox.compaction import ArchiveCompactor, DEFAULT_PERCENTILES
+
+    if not os.path.isdir(root_folder):
+        logger.info(f'[*] Error: folder {root_folder} does not exist')
+        exit(1)
+        return
+
+    try:
+        compactor = ArchiveCompactor(root_folder,
+                                     pack_after=_get_seconds(pack_after),
+                                     compact_after=_get_seconds(compact_after),
+                                     retention=_get_seconds(retention),
+                                     percentiles=percentiles or DEFAULT_PERCENTILES,
+                                     compression=compression,
+                                     dry_run=dry_run)
+    except InvalidArgument:
+        logger.exception('Invalid compaction options')
+        exit(2)
+        return
+
+    result = compactor.run(logger)
+
+    logger.info(f'{"[dry run] " if dry_run else ""}Packed suites: {result.packed_suites}; '
+                f'compacted outputs: {result.compacted_outputs}; deleted suites: {result.deleted_suites}; '
+                f'rollups: {result.rollups}')
+    if not dry_run:
+        logger.info(f'Size of changed files: {result.bytes_before} bytes, now {result.bytes_after} bytes')
+
+
+@click.command(name='compact')
+@click.option('--root-folder',
+              default='out',
+              help='Root folder of results stored by the JSON store.',
+              show_default=True)
+@click.option('--pack-after',
+              default=0,
+              type=float,
+              help='Days after which the outputs of a suite are packed with the suite in a single segment file.',
+              show_default=True)
+@click.option('--compact-after',
+              default=None,
+              type=float,
+              help='Days after which outputs are compacted, dropping the raw output of wrk and keeping only '
+                   'the percentiles given by --percentile of detailed percentile spectra.')
+@click.option('--retention',
+              default=None,
+              type=float,
+              help='Days after which suites are deleted; the mean of their metrics, by test and url, is kept in '
+                   'rollups.jsonl in the root folder.')
+@click.option('--percentile',
+              'percentiles',
+              multiple=True,
+              type=float,
+              help='Percentile kept in compacted outputs; can be repeated. Defaults to '
+                   '50, 75, 90, 95, 99, 99.9, 99.99 and 100.')
+@click.option('--compression',
+              default=None,
+              help='Compression of segment files: gzip, xz or zstd.')
+@click.option('--dry-run',
+              default=False,
+              help='Only logs what would be done, without changing files.',
+              is_flag=True)
+def compact_command(root_folder, pack_after, compact_after, retention, percentiles, compression, dry_run):
+    """
+    Compacts an archive of stored results, packing, compacting and deleting suites by age.
+    """
+    try:
+        compact_core(root_folder, pack_after, compact_after, retention, percentiles, compression, dry_run)
+    except KeyboardInterrupt:
+        logger.info('[*] User interrupted')
+        exit(1)
@@ -0,0 +1,127 @@
+import sys
+import click
+from typing import TYPE_CHECKING
+from rocore.exceptions import InvalidArgument
+from wrktoolbox.logs import get_app_logger
+from wrktoolbox.commands import get_configuration, import_builtin_types, SettingsFileNotFound
+
+if TYPE_CHECKING:
+    from wrktoolbox.comparison import OutputsIndex
+
+
+logger = get_app_logger()
+
+REGRESSIONS_EXIT_CODE = 3
+
+
+def _load_index(settings, match_by) -> 'OutputsIndex':
+    from wrktoolbox.comparison import OutputsIndex, select_suite
+    from wrktoolbox.results import ResultsImporter
+
+    importer = ResultsImporter.from_configuration(settings.get('importer'))
+    report = select_suite(importer, settings.get('suite_id'))
+    logger.info(f'Loaded suite {report.suite.id} ({report.suite.start_time})')
+    return OutputsIndex(report, match_by).add(importer.import_results(report))
+
+
+def _get_settings(settings, baseline, candidate, importer):
+    if baseline or candidate:
+        if not (baseline and candidate):
+            raise InvalidArgument('both --baseline and --candidate are required')
+        return {
+            'baseline': {'importer': {'type': importer, 'root_folder': baseline}},
+            'candidate': {'importer': {'type': importer, 'root_folder': candidate}}
+        }
+    return get_configuration(settings).values
+
+
+def compare_core(settings, baseline=None, candidate=None, importer='json', threshold=None, output_file=None):
+    from rocore.json import dumps
+    from roconfiguration import ConfigurationError
+    from wrktoolbox.benchmarks import handle_plugins
+    from wrktoolbox.comparison import compare_outputs, MATCH_FIELDS
+
+    sys.path.insert(0, '.')
+    import_builtin_types()
+
+    try:
+        values = _get_settings(settings, baseline, candidate, importer)
+        # NB: plugins must be first imported, as they might register new types of importers
+        list(handle_plugins(values))
+
+        match_by = values.get('match_by') or MATCH_FIELDS
+        baseline_index = _load_index(values['baseline'], match_by)
+        candidate_index = _load_index(values['candidate'], match_by)
+    except SettingsFileNotFound as e:
+        logger.info(f'[*] Error: {e}')
+        exit(1)
+        return
+    except (InvalidArgument, ConfigurationError, KeyError):
+        logger.exception('An error occurred while loading suites to compare')
+        exit(2)
+        return
+
+    if threshold is None:
+        threshold = float(values.get('threshold', 0.05))
+
+    comparison = compare_outputs(baseline_index,
+                                 candidate_index,
+                                 threshold,
+                                 float(values.get('noise_factor', 2.0)))
+
+    for item in comparison.comparisons:
+        logger.info(f'{item.status:>11}  {" ".join(str(value) for value in item.key)}  {item.metric}: '
+                    f'{item.baseline_mean:.3f} -> {item.candidate_mean:.3f} '
+                    f'({item.change:+.2%}, threshold {item.threshold:.2%})')
+
+    for key in comparison.only_baseline:
+        logger.info(f'Missing in candidate: {" ".join(str(value) for value in key)}')
+
+    for key in comparison.only_candidate:
+        logger.info(f'Missing in baseline: {" ".join(str(value) for value in key)}')
+
+    output_file = output_file or values.get('output_file')
+    if output_file:
+        with open(output_file, mode='wt', encoding='utf8') as file:
+            file.write(dumps(comparison, indent=4))
+
+    regressions = comparison.regressions
+    if regressions:
+        logger.info(f'[*] {len(regressions)} regressions found')
+        exit(REGRESSIONS_EXIT_CODE)
+
+    logger.info('No regressions found')
+
+
+@click.command(name='compare')
+@click.option('--settings',
+              default='compare.yaml',
+              help='Settings source (YAML or JSON) defining baseline and candidate importers; '
+                   'can be a file path or an URL.',
+              show_default=True)
+@click.option('--baseline',
+              default=None,
+              help='Root folder of baseline results; alternative to settings.')
+@click.option('--candidate',
+              default=None,
+              help='Root folder of candidate results; alternative to settings.')
+@click.option('--importer',
+              default='json',
+              help='Type of importer used with --baseline and --candidate.',
+              show_default=True)
+@click.option('--threshold',
+              default=None,
+              type=float,
+              help='Minimum relative change considered a regression (e.g. 0.05 for 5%).')
+@click.option('--output',
+              default=None,
+              help='Optional path of a JSON file where the comparison is written.')
+def compare_command(settings, baseline, candidate, importer, threshold, output):
+    """
+    Compares a candidate suite of benchmarks with a baseline, exiting with code 3 when regressions are found.
+    """
+    try:
+        compare_core(settings, baseline, candidate, importer, threshold, output)
+    except KeyboardInterrupt:
+        logger.info('[*] User interrupted')
+        exit(1)
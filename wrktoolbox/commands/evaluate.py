@@ -0,0 +1,120 @@
+import os
+import sys
+import click
+from rocore.exceptions import InvalidArgument
+from wrktoolbox.logs import get_app_logger
+from wrktoolbox.commands import get_configuration, import_builtin_types, SettingsFileNotFound
+
+
+logger = get_app_logger()
+
+
+def _get_importer(values, importer, source):
+    from wrktoolbox.results import ResultsImporter
+
+    if source:
+        return ResultsImporter.from_configuration({'type': importer, 'root_folder': source})
+    if not values.get('importer'):
+        raise InvalidArgument('an importer must be configured in goals settings, or given using --source')
+    return ResultsImporter.from_configuration(values['importer'])
+
+
+def evaluate_core(goals_settings, importer='json', source=None, suite_id=None, output_folder='out', workers=1):
+    from roconfiguration import ConfigurationError
+    from wrktoolbox.benchmarks import handle_plugins, _get_goals
+    from wrktoolbox.evaluation import GoalsEvaluator
+
+    sys.path.insert(0, '.')
+    import_builtin_types()
+
+    try:
+        values = get_configuration(goals_settings).values
+        # NB: plugins must be first imported, as they might register new types of goals and importers
+        list(handle_plugins(values))
+
+        goals = _get_goals(values.get('goals'))
+        if not goals:
+            raise InvalidArgument('no performance goals are configured')
+
+        results_importer = _get_importer(values, importer, source)
+        reports = [report for report in results_importer.import_suites()
+                   if not suite_id or str(report.suite.id) == suite_id]
+    except SettingsFileNotFound as e:
+        logger.info(f'[*] Error: {e}')
+        exit(1)
+        return
+    except (InvalidArgument, ConfigurationError, KeyError):
+        logger.exception('An error occurred while loading goals settings')
+        exit(2)
+        return
+
+    if not reports:
+        logger.info('[*] No suites found')
+        exit(1)
+        return
+
+    os.makedirs(output_folder, exist_ok=True)
+
+    with GoalsEvaluator(goals, workers) as evaluator:
+        for report in reports:
+            _evaluate_suite(evaluator, results_importer, report, goals, output_folder)
+
+
+def _evaluate_suite(evaluator, results_importer, report, goals, output_folder):
+    from rocore.json import dumps
+
+    evaluations = list(evaluator.evaluate(results_importer.import_results(report)))
+    satisfied = sum(1 for evaluation in evaluations if evaluation.success)
+    logger.info(f'Suite {report.suite.id}: goals satisfied by {satisfied} of {len(evaluations)} outputs')
+
+    for evaluation in evaluations:
+        for result in evaluation.goals_results:
+            if not result.success:
+                logger.info(f'  {evaluation.test_id or evaluation.url} ({evaluation.output_id}): '
+                            f'{result.goal} {result.error or ""}')
+
+    file_path = os.path.join(output_folder, f'goals_{report.suite.id}.json')
+    with open(file_path, mode='wt', encoding='utf8') as file:
+        file.write(dumps({
+            'suite_id': report.suite.id,
+            'goals': goals,
+            'evaluations': evaluations
+        }, indent=4))
+    logger.info(f'Goals results written to {file_path}')
+
+
+@click.command(name='evaluate')
+@click.option('--goals',
+              default='goals.yaml',
+              help='Settings source (YAML or JSON) defining the performance goals to evaluate, and optionally '
+                   'the importer of stored results; can be a file path or an URL.',
+              show_default=True)
+@click.option('--importer',
+              default='json',
+              help='Type of importer used with --source.',
+              show_default=True)
+@click.option('--source',
+              default=None,
+              help='Root folder of stored results; alternative to the importer defined in settings.')
+@click.option('--suite',
+              default=None,
+              help='Id of a suite to evaluate; by default all imported suites are evaluated.')
+@click.option('--output',
+              default='out',
+              help='Folder where goals results are written, in a JSON file for each suite.',
+              show_default=True)
+@click.option('--workers',
+              default=1,
+              type=int,
+              help='Number of processes evaluating goals. Outputs are loaded and parsed by the main process, '
+                   'so more workers help only with expensive goals.',
+              show_default=True)
+def evaluate_command(goals, importer, source, suite, output, workers):
+    """
+    Evaluates performance goals over stored benchmark outputs, without running benchmarks again.
+    """
+    try:
+        evaluate_core(goals, importer, source, suite, output, workers)
+    except KeyboardInterrupt:
+        logger.info('[*] User interrupted')
+        exit(1)
@@ -1,21 +1,19 @@
 import sys
 import click
 from wrktoolbox.logs import get_app_logger
-from roconfiguration import ConfigurationError
-from wrktoolbox.commands import get_configuration, SettingsFileNotFound
+from wrktoolbox.commands import get_configuration, import_builtin_types, SettingsFileNotFound
 from rocore.exceptions import InvalidArgument
-# noinspection PyUnresolvedReferences
-from wrktoolbox.goals import *
-# noinspection PyUnresolvedReferences
-from wrktoolbox.stores import *
-from wrktoolbox.reports.generation import ReportGeneration
 
 
 logger = get_app_logger()
 
 
 def reports_core(settings):
+    from roconfiguration import ConfigurationError
+    from wrktoolbox.reports.generation import ReportGeneration
+
     sys.path.insert(0, '.')
+    import_builtin_types()
 
     try:
         configuration = get_configuration(settings)
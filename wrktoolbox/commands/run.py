@@ -1,25 +1,41 @@
 import os
 import sys
 import click
-# noinspection PyUnresolvedReferences
-from wrktoolbox import stores, version
-from wrktoolbox.benchmarks import BenchmarkSuite
-# noinspection PyUnresolvedReferences
-from wrktoolbox.goals import *
 from wrktoolbox.logs import get_app_logger
-from wrktoolbox.commands import get_configuration, SettingsFileNotFound
+from wrktoolbox.commands import (create_configuration, import_builtin_types, read_settings, SettingsSource,
+                                 SettingsFileNotFound)
+from wrktoolbox.suitecache import SuiteCache, DEFAULT_FOLDER
+from wrktoolbox.tracing import span
 from rocore.exceptions import InvalidArgument
-from roconfiguration import ConfigurationError
 
 
 logger = get_app_logger()
 
 
-def run_core(settings):
+def run_core(settings, cache_folder=None, result_cache=True):
+    from roconfiguration import Configuration, ConfigurationError
+    from wrktoolbox.benchmarks import BenchmarkSuite
+    from wrktoolbox.preflight import Preflight, PreflightException
+
     sys.path.insert(0, '.')
+    import_builtin_types()
+
+    cache = SuiteCache(cache_folder) if cache_folder else None
+    cached = None
 
     try:
-        configuration = get_configuration(settings)
+        with span('load_settings'):
+            content, settings_format = read_settings(settings)
+
+            if cache is not None:
+                cache_key = cache.get_key(content)
+                cached = cache.load(cache_key)
+
+            if cached is not None:
+                # NB: cached settings already include environment variables
+                configuration = Configuration(cached[0])
+            else:
+                configuration = create_configuration(SettingsSource.parse(content, settings_format))
     except SettingsFileNotFound as e:
         logger.info(f'[*] Error: {e}')
         exit(1)
@@ -31,7 +47,17 @@ def run_core(settings):
     logger.info(f'Using settings file {settings}')
 
     try:
-        suite = BenchmarkSuite.from_dict(configuration.values)
+        with span('prepare_suite', cached=cached is not None):
+            if cached is not None:
+                logger.debug(f'Using cached suite {cache_key}')
+                suite = BenchmarkSuite.from_dict(*cached)
+            else:
+                values = configuration.values
+                suite = BenchmarkSuite.from_dict(values)
+
+                if cache is not None:
+                    with span('cache_suite'):
+                        cache.save(cache_key, values, suite.configurations)
     except Exception:
         logger.exception('An error occurred while preparing the suite of benchmarks')
         exit(1)
@@ -42,6 +68,9 @@ def run_core(settings):
     if 'metadata' in configuration:
         suite.metadata = configuration.metadata.values
 
+    if not result_cache:
+        suite.result_cache = None
+
     if not suite.configurations:
         logger.error('Missing benchmark configurations, exiting')
         exit(1)
@@ -59,13 +88,43 @@ def run_core(settings):
 
     if any(plugin.has_setup for plugin in suite.plugins):
         logger.info('Running setup functions for plugins:')
-        for plugin in suite.plugins:
-            if plugin.has_setup:
-                logger.info(f' - {plugin.name}')
-                plugin.setup(suite, logger)
+        try:
+            suite.setup_plugins(logger)
+        except Exception:
+            logger.exception('An error occurred while setting up plugins')
+            exit(1)
+            return
+
+        for name, duration in suite.plugins_timings.items():
+            logger.debug(f'Setup of plugin {name} took {duration:.1f} ms')
 
         logger.info('---')
 
+    if 'preflight' in configuration.values:
+        try:
+            preflight = Preflight.from_configuration(configuration.values['preflight'])
+        except (TypeError, ValueError, InvalidArgument):
+            logger.exception('Invalid preflight configuration')
+            exit(2)
+            return
+
+        if preflight.enabled:
+            logger.info('Running pre-flight checks:')
+            try:
+                with span('preflight'):
+                    preflight.run(suite, logger)
+            except PreflightException as e:
+                logger.error(f'[*] Error: {e}')
+                exit(1)
+                return
+
+            logger.info('---')
+
+        if not suite.configurations:
+            logger.error('No reachable benchmark configurations, exiting')
+            exit(1)
+            return
+
     if 'scripts_folder' in configuration.values:
         scripts_folder = configuration.scripts_folder
         if scripts_folder:
@@ -76,7 +135,8 @@ def run_core(settings):
                 logger.error('Invalid scripts folder: ')
                 exit(2)
 
-    suite.run(logger)
+    with span('suite'):
+        suite.run(logger)
 
     logger.info('Suite completed successfully')
 
@@ -86,9 +146,22 @@ def run_core(settings):
               default='settings.yaml',
               help='Settings source (YAML or JSON); can be a file path or an URL.',
               show_default=True)
-def run_command(settings):
+@click.option('--cache-folder',
+              default=DEFAULT_FOLDER,
+              help='Folder where suites created from settings are cached, to skip parsing and validation of '
+                   'the same settings in following runs.',
+              show_default=True)
+@click.option('--no-cache',
+              default=False,
+              help='Disables the cache of suites.',
+              is_flag=True)
+@click.option('--no-result-cache',
+              default=False,
+              help='Runs all benchmarks, ignoring cached results configured in settings.',
+              is_flag=True)
+def run_command(settings, cache_folder, no_cache, no_result_cache):
     try:
-        run_core(settings)
+        run_core(settings, None if no_cache else cache_folder, not no_result_cache)
     except KeyboardInterrupt:
         logger.info('[*] User interrupted')
         exit(1)
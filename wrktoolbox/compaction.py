@@ -0,0 +1,289 @@
+"""Compaction of file system archives of JSON results: outputs of a suite are packed with the suite in a segment file;
+older outputs are compacted, dropping the raw output of wrk and keeping only fixed percentiles of detailed percentile
+spectra; suites older than a retention period are deleted, keeping summary rollups of their metrics."""
+import os
+import json
+from collections import OrderedDict
+from datetime import datetime
+from logging import Logger
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from wrktoolbox.compression import get_compression, open_file, detect_compression, strip_extension
+from wrktoolbox.logs import get_app_logger
+from wrktoolbox.metrics import get_metrics
+from wrktoolbox.results import output_from_dict, to_utc
+from wrktoolbox.results.importers.fs import JsonResultsImporter
+from wrktoolbox.stores.fs import INDEX_FILE_NAME, parse_file_name
+from wrktoolbox.stores.segments import is_segment, get_segment_name, read_segment, write_segment
+from wrktoolbox.tracing import span
+
+
+DAY = 24 * 60 * 60
+
+DEFAULT_PERCENTILES = (50, 75, 90, 95, 99, 99.9, 99.99, 100)
+
+ROLLUPS_FILE_NAME = 'rollups.jsonl'
+
+
+def compact_output(data: Dict[str, Any], percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[str, Any]:
+    """Returns a copy of an output without the raw output of wrk, and with a detailed percentile spectrum
+    reduced to the first values reaching the given percentiles."""
+    data = dict(data)
+    data.pop('raw_output', None)
+
+    spectrum = data.get('detailed_percentile_spectrum')
+    if isinstance(spectrum, dict) and isinstance(spectrum.get('values'), list):
+        values = [value for value in spectrum['values'] if isinstance(value.get('percentile'), (int, float))]
+        selected = []
+        for percentile in sorted(float(item) / 100 for item in percentiles):
+            value = next((value for value in values if value['percentile'] >= percentile), None)
+            if value is not None and (not selected or selected[-1] is not value):
+                selected.append(value)
+        data['detailed_percentile_spectrum'] = dict(spectrum, values=selected)
+    return data
+
+
+def get_rollups(suite: Dict[str, Any], outputs: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Returns a summary of the outputs of a suite for each test and url: the number of outputs and of outputs
+    with errors, and the mean of each metric."""
+    groups: Dict[Tuple[Optional[str], Optional[str]], List[Any]] = OrderedDict()
+    for data in outputs:
+        groups.setdefault((data.get('test_id'), data.get('url')), []).append(output_from_dict(data))
+
+    rollups = []
+    for (test_id, url), items in groups.items():
+        values: Dict[str, List[float]] = {}
+        for item in items:
+            for name, value in get_metrics(item).items():
+                values.setdefault(name, []).append(value)
+
+        rollups.append({
+            'suite_id': suite.get('id'),
+            'location': suite.get('location'),
+            'start_time': suite.get('start_time'),
+            'end_time': suite.get('end_time'),
+            'metadata': suite.get('metadata'),
+            'test_id': test_id,
+            'url': url,
+            'group': getattr(items[0], 'group', None),
+            'outputs': len(items),
+            'outputs_with_errors': sum(1 for item in items if item.has_errors),
+            'metrics': {name: sum(metric_values) / len(metric_values) for name, metric_values in values.items()}
+        })
+    return rollups
+
+
+def _read_json(path: Path) -> Dict[str, Any]:
+    with open_file(str(path), 'rt') as file:
+        return json.load(file)
+
+
+class CompactionResult:
+
+    def __init__(self):
+        self.packed_suites = 0
+        self.compacted_outputs = 0
+        self.deleted_suites = 0
+        self.rollups = 0
+        self.bytes_before = 0
+        self.bytes_after = 0
+
+    def to_dict(self):
+        return self.__dict__.copy()
+
+
+class ArchiveCompactor:
+
+    def __init__(self,
+                 root_folder: str,
+                 pack_after: float = 0,
+                 compact_after: Optional[float] = None,
+                 retention: Optional[float] = None,
+                 percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+                 compression: Optional[str] = None,
+                 dry_run: bool = False):
+        """
+        Creates a new instance of ArchiveCompactor.
+
+        :param root_folder: root folder of an archive written by the JSON store
+        :param pack_after: seconds after which the outputs of a suite are packed in a segment
+        :param compact_after: seconds after which outputs are compacted; by default they are never compacted
+        :param retention: seconds after which suites are deleted, keeping rollups; by default they are never deleted
+        :param percentiles: percentiles kept in detailed percentile spectra of compacted outputs
+        :param compression: codec used for new segments
+        :param dry_run: whether to only report what would be done
+        """
+        self.root_folder = root_folder
+        self.pack_after = pack_after
+        self.compact_after = compact_after
+        self.retention = retention
+        self.percentiles = percentiles
+        self.compression = get_compression(compression)
+        self.dry_run = dry_run
+        self.now = datetime.utcnow()
+        self.result = CompactionResult()
+        self._rollups: List[Dict[str, Any]] = []
+
+    def get_age(self, suite: Dict[str, Any]) -> Optional[float]:
+        time = to_utc(suite.get('end_time') or suite.get('start_time'))
+        return (self.now - time).total_seconds() if time is not None else None
+
+    def _should_compact(self, age: float) -> bool:
+        return self.compact_after is not None and age >= self.compact_after
+
+    def _should_delete(self, age: float) -> bool:
+        return self.retention is not None and age >= self.retention
+
+    def _delete(self, paths: Sequence[Path]):
+        for path in paths:
+            self.result.bytes_before += path.stat().st_size
+            if not self.dry_run:
+                os.remove(str(path))
+
+    def _write_segment(self, path: Path, suite: Dict[str, Any], outputs: List[Dict[str, Any]], compression):
+        if self.dry_run:
+            return
+        write_segment(str(path), suite, outputs, compression)
+        self.result.bytes_after += path.stat().st_size
+
+    def _compact_outputs(self, outputs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        compacted = []
+        for data in outputs:
+            if data.get('raw_output'):
+                self.result.compacted_outputs += 1
+            compacted.append(compact_output(data, self.percentiles))
+        return compacted
+
+    def _drop_suite(self, suite: Dict[str, Any], outputs: List[Dict[str, Any]], paths: Sequence[Path]):
+        rollups = get_rollups(suite, outputs)
+        self._rollups.extend(rollups)
+        self.result.rollups += len(rollups)
+        self.result.deleted_suites += 1
+        self._delete(paths)
+
+    def _handle_suite_file(self, path: Path, outputs_paths: Dict[str, Path], logger: Logger):
+        suite = _read_json(path)
+        age = self.get_age(suite)
+        if age is None or age < self.pack_after:
+            return
+
+        outputs, paths = [], [path]
+        for output_id in suite.get('benchmarks_ids') or []:
+            output_path = outputs_paths.get(output_id)
+            if output_path is None:
+                continue
+            data = _read_json(output_path)
+            # NB: outputs of other suites, reused by this suite, are left where they are
+            if data.get('suite_id') not in (None, suite.get('id')):
+                continue
+            outputs.append(data)
+            paths.append(output_path)
+
+        if self._should_delete(age):
+            logger.info(f'Deleting suite {suite.get("id")} ({len(outputs)} outputs)')
+            self._drop_suite(suite, outputs, paths)
+            return
+
+        if self._should_compact(age):
+            outputs = self._compact_outputs(outputs)
+
+        parts = parse_file_name(path.name)
+        time_text = path.name[len(parts[0]) + 1:len(parts[0]) + 20] if parts else self.now.strftime('%Y-%m-%d-%H-%M-%S')
+        segment_path = path.parent / get_segment_name(suite.get('id'), time_text, self.compression)
+
+        logger.info(f'Packing suite {suite.get("id")} ({len(outputs)} outputs) in {segment_path.name}')
+        # NB: original files are deleted only once the segment is written, so a failure loses no results
+        self._write_segment(segment_path, suite, outputs, self.compression)
+        self._delete([item for item in paths if item != segment_path])
+        self.result.packed_suites += 1
+
+    def _handle_segment(self, path: Path, logger: Logger):
+        header, outputs = read_segment(str(path))
+        suite = header['suite']
+        age = self.get_age(suite)
+        if age is None:
+            return
+
+        if self._should_delete(age):
+            logger.info(f'Deleting suite {suite.get("id")} ({len(outputs)} outputs)')
+            self._drop_suite(suite, outputs, [path])
+            return
+
+        if self._should_compact(age) and any(not entry.get('compacted') for entry in header['outputs']):
+            logger.info(f'Compacting outputs of suite {suite.get("id")} in {path.name}')
+            # NB: the segment is replaced atomically by the compacted one, it must not be deleted before
+            self.result.bytes_before += path.stat().st_size
+            self._write_segment(path, suite, self._compact_outputs(outputs), detect_compression(path.name))
+
+    def _write_rollups(self):
+        if not self._rollups or self.dry_run:
+            return
+        with open(os.path.join(self.root_folder, ROLLUPS_FILE_NAME), mode='at', encoding='utf8') as file:
+            for rollup in self._rollups:
+                file.write(json.dumps(rollup) + '\n')
+
+    def _prune_indexes(self):
+        """Removes entries of deleted files from index files written by stores."""
+        if self.dry_run:
+            return
+        for folder, _, files in os.walk(self.root_folder):
+            if INDEX_FILE_NAME not in files:
+                continue
+
+            index_path = os.path.join(folder, INDEX_FILE_NAME)
+            with open(index_path, mode='rt', encoding='utf8') as index_file:
+                lines = index_file.readlines()
+
+            kept = []
+            for line in lines:
+                try:
+                    file_name = json.loads(line)['file']
+                except (ValueError, KeyError, TypeError):
+                    continue
+                if os.path.exists(os.path.join(folder, *file_name.split('/'))):
+                    kept.append(line)
+
+            if len(kept) < len(lines):
+                temp_path = f'{index_path}.{os.getpid()}.tmp'
+                with open(temp_path, mode='wt', encoding='utf8') as index_file:
+                    index_file.writelines(kept)
+                os.replace(temp_path, index_path)
+
+    def run(self, logger: Optional[Logger] = None) -> CompactionResult:
+        logger = logger or get_app_logger()
+        importer = JsonResultsImporter(self.root_folder)
+
+        suites_files, segments_files = [], []
+        outputs_paths: Dict[str, Path] = {}
+
+        for path, entry in importer.get_files():
+            if is_segment(path.name):
+                segments_files.append(path)
+                continue
+
+            if not strip_extension(path.name).endswith(importer.get_file_extension()):
+                continue
+
+            if entry is not None:
+                kind, file_id = entry.get('kind'), entry.get('id')
+            else:
+                parts = parse_file_name(path.name)
+                if parts is None:
+                    continue
+                kind, file_id = 'suite' if parts[0] == 'suite' else 'output', parts[1]
+
+            if kind == 'suite':
+                suites_files.append(path)
+            elif kind == 'output':
+                outputs_paths[file_id] = path
+
+        with span('compact_suites'):
+            for path in suites_files:
+                self._handle_suite_file(path, outputs_paths, logger)
+
+            for path in segments_files:
+                self._handle_segment(path, logger)
+
+        self._write_rollups()
+        self._prune_indexes()
+        return self.result
@@ -0,0 +1,158 @@
+import math
+from typing import Dict, List, Optional, Sequence, Tuple, Iterable
+from rocore.exceptions import InvalidArgument
+from wrktoolbox.metrics import HIGHER_IS_BETTER, get_metrics
+from wrktoolbox.results import ResultsImporter, SuiteReport, BenchmarkOutput
+
+
+MatchKey = Tuple[Optional[str], ...]
+MATCH_FIELDS = ('test_id', 'url', 'fingerprint')
+
+
+def select_suite(importer: ResultsImporter, suite_id: Optional[str] = None) -> SuiteReport:
+    """Returns the suite with the given id, or the most recent suite of an importer."""
+    reports = list(importer.import_suites())
+
+    if suite_id:
+        for report in reports:
+            if str(report.suite.id) == str(suite_id):
+                return report
+        raise InvalidArgument(f'Suite `{suite_id}` not found')
+
+    if not reports:
+        raise InvalidArgument('No suites found')
+
+    return max(reports, key=lambda item: str(item.suite.start_time or ''))
+
+
+class OutputsIndex:
+    """Groups the outputs of a suite by the values used to match them with outputs of another suite;
+    outputs of repeated benchmarks share the same key."""
+
+    def __init__(self, report: SuiteReport, match_by: Sequence[str] = MATCH_FIELDS):
+        unsupported = set(match_by) - set(MATCH_FIELDS)
+        if unsupported or not match_by:
+            raise InvalidArgument(f'Invalid match fields; supported fields are: {", ".join(MATCH_FIELDS)}')
+
+        self.match_by = list(match_by)
+        # url is matched separately, so that suites against different hosts can be compared by test_id
+        self._fingerprints = {configuration.test_id: configuration.get_fingerprint(exclude=('url',))
+                              for configuration in report.suite.configurations}
+        self.outputs: Dict[MatchKey, List[BenchmarkOutput]] = {}
+
+    def get_key(self, output: BenchmarkOutput) -> MatchKey:
+        test_id = getattr(output, 'test_id', None)
+        values = {
+            'test_id': test_id,
+            'url': output.url,
+            'fingerprint': self._fingerprints.get(test_id) or f'threads:{output.threads};'
+                                                                f'connections:{output.connections}'
+        }
+        return tuple(values[name] for name in self.match_by)
+
+    def add(self, outputs: Iterable[BenchmarkOutput]) -> 'OutputsIndex':
+        for output in outputs:
+            self.outputs.setdefault(self.get_key(output), []).append(output)
+        return self
+
+
+def _mean_and_stdev(values: Sequence[float]) -> Tuple[float, float]:
+    mean = sum(values) / len(values)
+    if len(values) < 2:
+        return mean, 0.0
+    return mean, math.sqrt(sum((value - mean) ** 2 for value in values) / (len(values) - 1))
+
+
+class MetricComparison:
+
+    def __init__(self,
+                 key: MatchKey,
+                 metric: str,
+                 baseline: Sequence[float],
+                 candidate: Sequence[float],
+                 threshold: float,
+                 noise_factor: float):
+        self.key = key
+        self.metric = metric
+        self.baseline_mean, self.baseline_stdev = _mean_and_stdev(baseline)
+        self.candidate_mean, self.candidate_stdev = _mean_and_stdev(candidate)
+        self.baseline_count = len(baseline)
+        self.candidate_count = len(candidate)
+        self.change = (self.candidate_mean - self.baseline_mean) / self.baseline_mean \
+            if self.baseline_mean else 0.0
+
+        # when repeats exist, the threshold grows with the relative standard error of the difference
+        noise = 0.0
+        if self.baseline_mean and (self.baseline_count > 1 or self.candidate_count > 1):
+            noise = noise_factor * math.sqrt(self.baseline_stdev ** 2 / self.baseline_count
+                                             + self.candidate_stdev ** 2 / self.candidate_count) \
+                / abs(self.baseline_mean)
+        self.threshold = max(threshold, noise)
+
+    @property
+    def status(self) -> str:
+        worse = -self.change if self.metric in HIGHER_IS_BETTER else self.change
+        if worse > self.threshold:
+            return 'regression'
+        if worse < -self.threshold:
+            return 'improvement'
+        return 'unchanged'
+
+    def to_dict(self):
+        data = self.__dict__.copy()
+        data['key'] = list(self.key)
+        data['status'] = self.status
+        return data
+
+
+class SuitesComparison:
+
+    def __init__(self,
+                 comparisons: List[MetricComparison],
+                 only_baseline: List[MatchKey],
+                 only_candidate: List[MatchKey]):
+        self.comparisons = comparisons
+        self.only_baseline = only_baseline
+        self.only_candidate = only_candidate
+
+    @property
+    def regressions(self) -> List[MetricComparison]:
+        return [item for item in self.comparisons if item.status == 'regression']
+
+    def to_dict(self):
+        return {
+            'comparisons': self.comparisons,
+            'only_baseline': [list(key) for key in self.only_baseline],
+            'only_candidate': [list(key) for key in self.only_candidate]
+        }
+
+
+def compare_outputs(baseline: OutputsIndex,
+                    candidate: OutputsIndex,
+                    threshold: float = 0.05,
+                    noise_factor: float = 2.0) -> SuitesComparison:
+    """Compares requests per second, average and max latency and every shared percentile of matching outputs.
+    A metric changed when its relative change is beyond the threshold, or beyond the noise measured
+    across repeated outputs, if greater."""
+    comparisons = []
+
+    for key, baseline_outputs in baseline.outputs.items():
+        candidate_outputs = candidate.outputs.get(key)
+        if not candidate_outputs:
+            continue
+
+        baseline_metrics = [get_metrics(output) for output in baseline_outputs]
+        candidate_metrics = [get_metrics(output) for output in candidate_outputs]
+        shared = set.intersection(*(set(metrics) for metrics in baseline_metrics + candidate_metrics))
+
+        for metric in sorted(shared, key=lambda name: (name not in HIGHER_IS_BETTER, name)):
+            comparisons.append(MetricComparison(key,
+                                                metric,
+                                                [metrics[metric] for metrics in baseline_metrics],
+                                                [metrics[metric] for metrics in candidate_metrics],
+                                                threshold,
+                                                noise_factor))
+
+    return SuitesComparison(comparisons,
+                            [key for key in baseline.outputs if key not in candidate.outputs],
+                            [key for key in candidate.outputs if key not in baseline.outputs])
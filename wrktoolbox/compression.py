@@ -0,0 +1,89 @@
+"""Compression of files written by file system stores. Codecs are selected by name when writing and detected by
+file extension when reading; zstd is supported when Python 3.14 `compression.zstd`, or the `zstandard` package,
+is available."""
+import io
+import gzip
+import lzma
+from typing import IO, Optional
+from rocore.exceptions import InvalidArgument
+from wrktoolbox.logs import get_app_logger
+
+
+logger = get_app_logger()
+
+EXTENSIONS = {
+    'gzip': '.gz',
+    'xz': '.xz',
+    'zstd': '.zst'
+}
+
+
+def _open_zstd(file_path: str, mode: str) -> IO:
+    try:
+        from compression import zstd
+        return zstd.open(file_path, mode=mode, encoding='utf8' if 't' in mode else None)
+    except ImportError:
+        import zstandard
+        return zstandard.open(file_path, mode=mode, encoding='utf8' if 't' in mode else None)
+
+
+def is_available(compression: str) -> bool:
+    if compression != 'zstd':
+        return compression in EXTENSIONS
+    for module_name in ('compression.zstd', 'zstandard'):
+        try:
+            __import__(module_name)
+            return True
+        except ImportError:
+            continue
+    return False
+
+
+def get_compression(compression: Optional[str]) -> Optional[str]:
+    """Validates the name of a codec; zstd falls back to gzip when it is not available."""
+    if not compression or compression == 'none':
+        return None
+
+    if compression not in EXTENSIONS:
+        raise InvalidArgument(f'Unsupported compression `{compression}`; use one of: {", ".join(EXTENSIONS)}')
+
+    if not is_available(compression):
+        logger.warning(f'[*] {compression} compression is not available; using gzip')
+        return 'gzip'
+    return compression
+
+
+def get_extension(compression: Optional[str]) -> str:
+    return EXTENSIONS[compression] if compression else ''
+
+
+def detect_compression(file_path: str) -> Optional[str]:
+    """Returns the codec of a file, by its extension."""
+    for name, extension in EXTENSIONS.items():
+        if file_path.endswith(extension):
+            return name
+    return None
+
+
+def strip_extension(file_path: str) -> str:
+    compression = detect_compression(file_path)
+    return file_path[:-len(EXTENSIONS[compression])] if compression else file_path
+
+
+def open_file(file_path: str, mode: str = 'rt', compression: Optional[str] = None) -> IO:
+    """Opens a file in text or binary mode; when reading, compression is detected by extension and files are
+    decompressed while they are read."""
+    if compression is None and 'r' in mode:
+        compression = detect_compression(file_path)
+
+    if compression is None:
+        return io.open(file_path, mode=mode, encoding='utf8' if 't' in mode else None)
+
+    if compression == 'gzip':
+        # NB: the default level 9 is much slower, for a small gain on JSON
+        return gzip.open(file_path, mode=mode, compresslevel=6, encoding='utf8' if 't' in mode else None)
+
+    if compression == 'xz':
+        return lzma.open(file_path, mode=mode, encoding='utf8' if 't' in mode else None)
+
+    return _open_zstd(file_path, mode)
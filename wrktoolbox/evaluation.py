@@ -0,0 +1,103 @@
+"""Functions to evaluate performance goals over stored benchmark outputs, outside of benchmark suites."""
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from typing import Generator, Iterable, List, Optional, Sequence
+from wrktoolbox.benchmarks import PerformanceGoal, PerformanceGoalResult, evaluate_goal
+from wrktoolbox.wrkoutput import BenchmarkOutput
+
+
+class OutputEvaluation:
+    """Results of performance goals evaluated over a stored output."""
+
+    def __init__(self,
+                 output_id: str,
+                 suite_id: Optional[str],
+                 test_id: Optional[str],
+                 url: str,
+                 goals_results: List[PerformanceGoalResult]):
+        self.output_id = output_id
+        self.suite_id = suite_id
+        self.test_id = test_id
+        self.url = url
+        self.goals_results = goals_results
+
+    @property
+    def success(self) -> bool:
+        return all(result.success for result in self.goals_results)
+
+    def to_dict(self):
+        data = self.__dict__.copy()
+        data['success'] = self.success
+        return data
+
+
+_worker_goals = []  # type: List[PerformanceGoal]
+
+
+def _init_worker(goals: Sequence[PerformanceGoal]):
+    global _worker_goals
+    _worker_goals = list(goals)
+
+
+def _evaluate(output: BenchmarkOutput) -> List[PerformanceGoalResult]:
+    return [evaluate_goal(goal, output) for goal in _worker_goals]
+
+
+def _batches(items: Iterable, size: int) -> Generator[list, None, None]:
+    iterator = iter(items)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _get_evaluation(output: BenchmarkOutput, results: List[PerformanceGoalResult]) -> OutputEvaluation:
+    return OutputEvaluation(output.id, output.suite_id, getattr(output, 'test_id', None), output.url, results)
+
+
+class GoalsEvaluator:
+    """Evaluates goals over outputs, in the calling process or, when more than one worker is used, streaming
+    outputs in batches to a pool of worker processes created once, and reused for all evaluated suites.
+    Outputs are loaded and parsed by the calling process, and sent to workers as they are: workers pay off
+    only for goals more expensive than pickling outputs."""
+
+    def __init__(self, goals: Sequence[PerformanceGoal], workers: int = 1, batch_size: int = 32):
+        self.goals = list(goals)
+        self.workers = max(1, workers or 1)
+        self.batch_size = batch_size
+        self._executor = None  # type: Optional[ProcessPoolExecutor]
+
+    def __enter__(self) -> 'GoalsEvaluator':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def evaluate(self, outputs: Iterable[BenchmarkOutput]) -> Generator[OutputEvaluation, None, None]:
+        """Yields the evaluations of outputs, in the same order of outputs."""
+        if self.workers == 1:
+            for output in outputs:
+                yield _get_evaluation(output, [evaluate_goal(goal, output) for goal in self.goals])
+            return
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.goals,))
+
+        for batch in _batches(outputs, self.batch_size * self.workers):
+            for output, results in zip(batch, self._executor.map(_evaluate, batch, chunksize=self.batch_size)):
+                yield _get_evaluation(output, results)
+
+
+def evaluate_outputs(outputs: Iterable[BenchmarkOutput],
+                     goals: Sequence[PerformanceGoal],
+                     workers: int = 1,
+                     batch_size: int = 32) -> Generator[OutputEvaluation, None, None]:
+    """Evaluates goals over outputs; evaluations are returned in the same order of outputs."""
+    with GoalsEvaluator(goals, workers, batch_size) as evaluator:
+        yield from evaluator.evaluate(outputs)
@@ -0,0 +1,187 @@
+"""
+A stand-in for wrk and wrk2, printing synthetic outputs without sending requests; useful to exercise
+benchmark suites, stores and reports where wrk or a target are not available.
+
+It accepts the options of wrk and wrk2 used by wrktoolbox, plus options describing the simulated target,
+which also read defaults from environment variables (FAKEWRK_LATENCY, FAKEWRK_SIGMA, ...):
+
+    fakewrk --fake-latency 20 --fake-capacity 5000 https://example.com -c 100 -t 4 -d 30 --latency
+
+Latencies follow a log-normal distribution with the given median; closed-loop throughput follows Little's law,
+limited by the capacity of the target. wrk2 outputs are printed when a rate is given with -R.
+"""
+import os
+import math
+import time
+import random
+import argparse
+from statistics import NormalDist
+from typing import List, Optional, Sequence
+
+
+PERCENTILES = (50, 75, 90, 99)
+HDR_PERCENTILES = (50, 75, 90, 99, 99.9, 99.99, 99.999, 100)
+
+
+def _seconds(value: str) -> float:
+    value = value.strip().lower()
+    for suffix, factor in (('ms', 0.001), ('s', 1), ('m', 60), ('h', 3600)):
+        if value.endswith(suffix):
+            return float(value[:-len(suffix)]) * factor
+    return float(value)
+
+
+def _env(name: str, default):
+    return type(default)(os.environ.get(f'FAKEWRK_{name}', default))
+
+
+def format_time(ms: float) -> str:
+    if ms < 1:
+        return f'{ms * 1000:.2f}us'
+    if ms < 1000:
+        return f'{ms:.2f}ms'
+    return f'{ms / 1000:.2f}s'
+
+
+def format_bytes(value: float) -> str:
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if value < 1024 or unit == 'GB':
+            return f'{value:.2f}{unit}'
+        value /= 1024
+
+
+class LatencyModel:
+    """Log-normal distribution of latencies, in milliseconds."""
+
+    def __init__(self, median: float, sigma: float):
+        self.median = median
+        self.sigma = sigma
+
+    def percentile(self, percentile: float) -> float:
+        percentile = min(max(percentile, 0.0001), 99.9999)
+        return self.median * math.exp(self.sigma * NormalDist().inv_cdf(percentile / 100))
+
+    @property
+    def mean(self) -> float:
+        return self.median * math.exp(self.sigma ** 2 / 2)
+
+    @property
+    def stdev(self) -> float:
+        return self.mean * math.sqrt(math.exp(self.sigma ** 2) - 1)
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='fakewrk', description='Prints synthetic outputs of wrk and wrk2.')
+    parser.add_argument('url')
+    parser.add_argument('-c', '--connections', type=int, default=10)
+    parser.add_argument('-t', '--threads', type=int, default=2)
+    parser.add_argument('-d', '--duration', type=_seconds, default=10)
+    parser.add_argument('--timeout', type=_seconds, default=2)
+    parser.add_argument('-s', '--script', default=None)
+    parser.add_argument('-H', '--header', action='append', default=[])
+    parser.add_argument('-L', '--latency', action='store_true')
+    parser.add_argument('-R', '--rate', type=int, default=None)
+    parser.add_argument('--fake-latency', type=float, default=_env('LATENCY', 20.0),
+                        help='Median latency in milliseconds, without queueing.')
+    parser.add_argument('--fake-sigma', type=float, default=_env('SIGMA', 0.5),
+                        help='Shape of the log-normal distribution of latencies.')
+    parser.add_argument('--fake-capacity', type=float, default=_env('CAPACITY', 0.0),
+                        help='Maximum requests per second handled by the target; 0 for no limit.')
+    parser.add_argument('--fake-error-rate', type=float, default=_env('ERROR_RATE', 0.0),
+                        help='Ratio of responses with status not in 2xx or 3xx.')
+    parser.add_argument('--fake-timeout-rate', type=float, default=_env('TIMEOUT_RATE', 0.0),
+                        help='Ratio of requests failing with timeout socket errors.')
+    parser.add_argument('--fake-spectrum', type=int, default=_env('SPECTRUM', 64),
+                        help='Lines of the detailed percentile spectrum of wrk2 outputs.')
+    parser.add_argument('--fake-response-size', type=int, default=_env('RESPONSE_SIZE', 350),
+                        help='Size of responses in bytes.')
+    parser.add_argument('--fake-time-scale', type=float, default=_env('TIME_SCALE', 0.0),
+                        help='Fraction of the duration actually waited; 0 prints outputs immediately.')
+    parser.add_argument('--fake-seed', type=int, default=_env('SEED', 0),
+                        help='Seed of the small random variations of outputs.')
+    return parser
+
+
+def _jitter(rng: random.Random, value: float) -> float:
+    return value * rng.uniform(0.98, 1.02)
+
+
+def get_output(args: argparse.Namespace) -> str:
+    rng = random.Random(f'{args.fake_seed}:{args.url}:{args.connections}:{args.threads}:{args.rate}')
+    latency = LatencyModel(_jitter(rng, args.fake_latency), args.fake_sigma)
+    capacity = args.fake_capacity or math.inf
+
+    if args.rate:
+        requests_per_second = min(args.rate, capacity)
+    else:
+        requests_per_second = min(args.connections / (latency.mean / 1000), capacity)
+        # queueing at the target increases latencies, according to Little's law
+        queueing = args.connections / requests_per_second * 1000 / latency.mean
+        if queueing > 1:
+            latency = LatencyModel(latency.median * queueing, latency.sigma)
+
+    requests = int(requests_per_second * args.duration)
+    timeouts = int(requests * args.fake_timeout_rate)
+    errors = int(requests * args.fake_error_rate)
+    per_thread = requests_per_second / args.threads
+
+    lines = [f'Running {int(args.duration)}s test @ {args.url}',
+             f'  {args.threads} threads and {args.connections} connections']
+
+    if args.rate:
+        for _ in range(args.threads):
+            lines.append(f'  Thread calibration: mean lat.: {_jitter(rng, latency.mean):.3f}ms, '
+                         f'rate sampling interval: {int(_jitter(rng, 10 * latency.mean))}ms')
+
+    lines += ['  Thread Stats   Avg      Stdev     Max   +/- Stdev',
+              f'    Latency   {format_time(latency.mean)}  {format_time(latency.stdev)} '
+              f'{format_time(latency.percentile(100))}   {_jitter(rng, 75):.2f}%',
+              f'    Req/Sec   {per_thread:.2f}     {per_thread * 0.1:.2f}   {per_thread * 1.3:.2f}     '
+              f'{_jitter(rng, 70):.2f}%']
+
+    if args.latency and args.rate:
+        lines.append('  Latency Distribution (HdrHistogram - Recorded Latency)')
+        lines += [f'{percentile:7.3f}%  {format_time(latency.percentile(percentile))}'
+                  for percentile in HDR_PERCENTILES]
+        lines += [''] + get_spectrum(latency, args.fake_spectrum, requests)
+    elif args.latency:
+        lines.append('  Latency Distribution')
+        lines += [f'     {percentile}%  {format_time(latency.percentile(percentile))}' for percentile in PERCENTILES]
+
+    lines.append(f'  {requests} requests in {args.duration:.2f}s, '
+                 f'{format_bytes(requests * args.fake_response_size)} read')
+    if timeouts:
+        lines.append(f'  Socket errors: connect 0, read 0, write 0, timeout {timeouts}')
+    if errors:
+        lines.append(f'  Non-2xx or 3xx responses: {errors}')
+    lines += [f'Requests/sec: {requests_per_second:10.2f}',
+              f'Transfer/sec: {format_bytes(requests_per_second * args.fake_response_size):>10}']
+    return '\n'.join(lines) + '\n'
+
+
+def get_spectrum(latency: LatencyModel, size: int, requests: int) -> List[str]:
+    lines = ['  Detailed Percentile spectrum:',
+             '       Value   Percentile   TotalCount 1/(1-Percentile)',
+             '']
+    for index in range(size - 1):
+        # like HdrHistogram, percentiles get closer to 1 with halving steps
+        percentile = 1 - 0.5 ** (index * 20 / size)
+        lines.append(f'{latency.percentile(percentile * 100):12.3f} {percentile:12.6f} '
+                     f'{int(requests * percentile):12d} {1 / (1 - percentile):12.2f}')
+    lines.append(f'{latency.percentile(100):12.3f} {1:12.6f} {requests:12d} {"inf":>12}')
+    lines += [f'#[Mean    = {latency.mean:12.3f}, StdDeviation   = {latency.stdev:12.3f}]',
+              f'#[Max     = {latency.percentile(100):12.3f}, Total count    = {requests:12d}]',
+              f'#[Buckets = {27:12d}, SubBuckets     = {2048:12d}]',
+              '-' * 58]
+    return lines
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    args = get_parser().parse_args(argv)
+    if args.fake_time_scale > 0:
+        time.sleep(args.duration * args.fake_time_scale)
+    print(get_output(args), end='', flush=True)
+
+
+if __name__ == '__main__':
+    main()
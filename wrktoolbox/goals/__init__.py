@@ -1,2 +1,4 @@
 from .common import *
 from .latency import *
+from .baseline import *
+from .expressions import *
@@ -0,0 +1,134 @@
+import json
+import math
+import importlib
+from typing import Any, Dict, List, Optional, Tuple
+from rocore.registry import RegistryException
+from wrktoolbox.benchmarks import PerformanceGoal, GoalException
+from wrktoolbox.comparison import select_suite
+from wrktoolbox.metrics import HIGHER_IS_BETTER, get_metrics, percentile_metric_name
+from wrktoolbox.results import ResultsImporter
+from wrktoolbox.wrkoutput import BenchmarkOutput
+from .common import LimitType
+
+
+class BaselineRepository:
+    """Outputs of a baseline suite, loaded once and indexed by test id and url.
+    Repositories are cached by the suite running goals, and shared by all its goals configured with the same
+    importer and suite."""
+
+    def __init__(self, importer: ResultsImporter, suite_id: Optional[str] = None):
+        report = select_suite(importer, suite_id)
+        self.suite_id = report.suite.id
+        self._outputs: Dict[Tuple[Optional[str], str], List[BenchmarkOutput]] = {}
+
+        for output in importer.import_results(report):
+            self._outputs.setdefault((getattr(output, 'test_id', None), output.url), []).append(output)
+
+    @classmethod
+    def get(cls,
+            cache: Dict[str, Any],
+            importer: dict,
+            suite_id: Optional[str] = None) -> Tuple[Optional['BaselineRepository'], Optional[str]]:
+        """Returns the repository of a baseline from the given cache, loading it the first time, or the
+        error that occurred loading it: a missing or empty baseline doesn't stop benchmarks."""
+        key = 'baseline:' + json.dumps([importer, suite_id], sort_keys=True, default=str)
+
+        if key not in cache:
+            # NB: built-in importers are registered by commands; goals can also be used without them
+            importlib.import_module('wrktoolbox.results.importers')
+            try:
+                cache[key] = cls(ResultsImporter.from_configuration(dict(importer)), suite_id), None
+            except (RegistryException, ValueError, TypeError, OSError) as error:
+                cache[key] = None, str(error)
+        return cache[key]
+
+    def find(self, output: BenchmarkOutput) -> List[BenchmarkOutput]:
+        return self._outputs.get((getattr(output, 'test_id', None), output.url), [])
+
+
+class NoRegressionGoal(PerformanceGoal):
+    """A performance goal satisfied when a metric is not worse than the same metric of a baseline output
+    for the same test, by more than a tolerance in percent; or, when `band` is set and the baseline has
+    repeated outputs, when it is inside a band of the given number of standard deviations."""
+
+    type_name = 'no-regression'
+
+    def __init__(self,
+                 importer: dict,
+                 metric: str = 'requests_per_second',
+                 percentile: Optional[LimitType] = None,
+                 tolerance: LimitType = 5,
+                 band: Optional[LimitType] = None,
+                 suite_id: Optional[str] = None,
+                 require_baseline: bool = False):
+        """
+        Creates a new instance of NoRegressionGoal.
+
+        :param importer: configuration of the importer used to load the baseline
+        :param metric: requests_per_second, avg_latency_ms, max_latency_ms, or a percentile latency like p99_latency_ms
+        :param percentile: shortcut to compare a percentile latency
+        :param tolerance: allowed degradation, in percent
+        :param band: number of standard deviations of repeated baseline outputs
+        :param suite_id: id of the baseline suite, defaults to the most recent suite
+        :param require_baseline: whether the goal fails when no baseline output exists for a test
+        """
+        self.importer = importer
+        self.metric = percentile_metric_name(float(percentile)) if percentile is not None else metric
+        self.tolerance = float(tolerance)
+        self.band = float(band) if band is not None else None
+        self.suite_id = suite_id
+        self.require_baseline = bool(require_baseline)
+        self._cache: Dict[str, Any] = {}
+
+    def use_cache(self, cache: Dict[str, Any]):
+        self._cache = cache
+
+    def __getstate__(self):
+        # NB: baselines are loaded again by unpickled goals, like the ones of evaluation workers
+        return dict(self.__dict__, _cache={})
+
+    def to_dict(self):
+        data = super().to_dict()
+        del data['_cache']
+        return data
+
+    def __repr__(self):
+        allowed = f'{self.band} standard deviations' if self.band is not None else f'{self.tolerance}%'
+        return f'{self.metric} must not be worse than the baseline by more than {allowed}.'
+
+    def get_limit(self, baseline: List[float]) -> float:
+        mean = sum(baseline) / len(baseline)
+        higher_is_better = self.metric in HIGHER_IS_BETTER
+
+        if self.band is not None and len(baseline) > 1:
+            stdev = math.sqrt(sum((value - mean) ** 2 for value in baseline) / (len(baseline) - 1))
+            return mean - self.band * stdev if higher_is_better else mean + self.band * stdev
+
+        return mean * (1 - self.tolerance / 100) if higher_is_better else mean * (1 + self.tolerance / 100)
+
+    def measure(self, output: BenchmarkOutput) -> Optional[Tuple[float, float]]:
+        value = get_metrics(output).get(self.metric)
+        if value is None:
+            raise GoalException(f'Metric {self.metric} is not available in output {output.id}')
+
+        repository, error = BaselineRepository.get(self._cache, self.importer, self.suite_id)
+        if repository is None:
+            if self.require_baseline:
+                raise GoalException(f'Cannot load the baseline: {error}')
+            return None
+
+        baseline = [item for item in (get_metrics(output).get(self.metric) for output in repository.find(output))
+                    if item is not None]
+
+        if not baseline:
+            if self.require_baseline:
+                raise GoalException(f'No baseline found for {getattr(output, "test_id", None)} {output.url} '
+                                    f'in suite {repository.suite_id}')
+            return None
+
+        limit = self.get_limit(baseline)
+        return value, value - limit if self.metric in HIGHER_IS_BETTER else limit - value
+
+    def is_satisfied(self, output: BenchmarkOutput) -> bool:
+        measure = self.measure(output)
+        return measure is None or measure[1] >= 0
@@ -1,4 +1,4 @@
-from typing import Union
+from typing import Union, Optional, Tuple
 from wrktoolbox.benchmarks import PerformanceGoal
 from wrktoolbox.wrkoutput import BenchmarkOutput
 
@@ -56,5 +56,22 @@ class RequestsPerSecondsGoal(PerformanceGoal):
     def is_satisfied(self, output: BenchmarkOutput) -> bool:
         return output.requests_per_second >= self.minimum
 
+    def measure(self, output: BenchmarkOutput) -> Optional[Tuple[float, float]]:
+        return output.requests_per_second, output.requests_per_second - self.minimum
+
     def __repr__(self):
         return f'The minimum amount of handled requests per seconds is {self.minimum}'
+
+
+class ClientNotSaturatedGoal(PerformanceGoal):
+    """A goal that is satisfied if the load generator was not the bottleneck of a benchmark,
+    according to host metrics sampled while it ran. Outputs without host metrics satisfy the goal."""
+
+    type_name = 'client-not-saturated'
+
+    def is_satisfied(self, output: BenchmarkOutput) -> bool:
+        client = getattr(output, 'client', None)
+        return client is None or not client.saturated
+
+    def __repr__(self):
+        return 'The load generator must not be saturated'
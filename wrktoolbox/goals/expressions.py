@@ -0,0 +1,229 @@
+import re
+import ast
+import operator
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+from rocore.exceptions import InvalidArgument
+from wrktoolbox.benchmarks import PerformanceGoal, GoalException
+from wrktoolbox.metrics import is_parsed, get_percentile
+from wrktoolbox.wrkoutput import BenchmarkOutput, ValueResult
+
+
+_LITERAL_UNITS = {'us': 0.001, 'ms': 1.0, 's': 1000.0, '%': 0.01}
+_LITERAL_PATTERN = re.compile(r'(?<![\w.])(\d+(?:\.\d*)?|\.\d+)\s*(us|ms|s|%)(?![\w%])')
+_KEYWORDS_PATTERN = re.compile(r'\b(AND|OR|NOT)\b')
+_PERCENTILE_PATTERN = re.compile(r'^p(\d+)(?:_(\d+))?$')
+_BYTES_UNITS = {'b': 1, 'kb': 1024, 'mb': 1024 ** 2, 'gb': 1024 ** 3, 'tb': 1024 ** 4}
+
+_COMPARISONS = {
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne
+}
+
+_BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv
+}
+
+
+def _bytes(value: ValueResult) -> float:
+    return value.value * _BYTES_UNITS[value.unit]
+
+
+def _errors(output: BenchmarkOutput) -> int:
+    return _socket_errors(output) + _non_2xx(output)
+
+
+def _socket_errors(output: BenchmarkOutput) -> int:
+    errors = output.socket_errors
+    if not is_parsed(errors):
+        return 0
+    return errors.connect_errors + errors.read_errors + errors.write_errors + errors.timeout_errors
+
+
+def _timeouts(output: BenchmarkOutput) -> int:
+    return output.socket_errors.timeout_errors if is_parsed(output.socket_errors) else 0
+
+
+def _non_2xx(output: BenchmarkOutput) -> int:
+    return output.not_successful_responses or 0
+
+
+def _requests(output: BenchmarkOutput) -> Optional[int]:
+    return output.total.requests if is_parsed(output.total) else None
+
+
+def _error_ratio(output: BenchmarkOutput) -> Optional[float]:
+    requests = _requests(output)
+    if requests is None:
+        return None
+    return _errors(output) / requests if requests else 0.0
+
+
+def _latency(name: str) -> Callable[[BenchmarkOutput], Optional[float]]:
+    def getter(output: BenchmarkOutput):
+        return getattr(output.latency, name).ms if is_parsed(output.latency) else None
+    return getter
+
+
+def _per(name: str) -> Callable[[BenchmarkOutput], Optional[float]]:
+    def getter(output: BenchmarkOutput):
+        divisor = getattr(output, name)
+        if output.requests_per_second is None or not divisor:
+            return None
+        return output.requests_per_second / divisor
+    return getter
+
+
+NAMES: Dict[str, Callable[[BenchmarkOutput], Any]] = {
+    'rps': lambda output: output.requests_per_second,
+    'requests_per_second': lambda output: output.requests_per_second,
+    'rps_per_thread': _per('threads'),
+    'rps_per_connection': _per('connections'),
+    'requests': _requests,
+    'errors': _errors,
+    'socket_errors': _socket_errors,
+    'timeouts': _timeouts,
+    'non_2xx': _non_2xx,
+    'error_ratio': _error_ratio,
+    'avg_latency': _latency('avg'),
+    'stdev_latency': _latency('stdev'),
+    'max_latency': _latency('max'),
+    'transfer': lambda output: _bytes(output.total.read) if is_parsed(output.total) else None,
+    'transfer_per_second': lambda output: _bytes(output.transfer_per_second)
+    if is_parsed(output.transfer_per_second) else None,
+    'threads': lambda output: output.threads,
+    'connections': lambda output: output.connections
+}
+
+
+def _percentile(name: str) -> Optional[float]:
+    match = _PERCENTILE_PATTERN.match(name)
+    if not match:
+        return None
+    return float(f'{match.group(1)}.{match.group(2)}' if match.group(2) else match.group(1))
+
+
+class ExpressionEnvironment:
+    """Values of names used by goal expressions, read lazily from an output and computed once."""
+
+    def __init__(self, output: BenchmarkOutput):
+        self.output = output
+        self._values = {}
+
+    def __getitem__(self, name: str):
+        try:
+            return self._values[name]
+        except KeyError:
+            pass
+
+        percentile = _percentile(name)
+        value = get_percentile(self.output, percentile) if percentile is not None else NAMES[name](self.output)
+
+        if value is None:
+            raise GoalException(f'`{name}` is not available in output {self.output.id}')
+        self._values[name] = value
+        return value
+
+
+def _compile_node(node: ast.AST) -> Callable[[ExpressionEnvironment], Any]:
+    if isinstance(node, ast.Expression):
+        return _compile_node(node.body)
+
+    if isinstance(node, ast.BoolOp):
+        operands = [_compile_node(value) for value in node.values]
+        if isinstance(node.op, ast.And):
+            return lambda env: all(operand(env) for operand in operands)
+        return lambda env: any(operand(env) for operand in operands)
+
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.Not, ast.USub)):
+        operand = _compile_node(node.operand)
+        if isinstance(node.op, ast.Not):
+            return lambda env: not operand(env)
+        return lambda env: -operand(env)
+
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+        function = _BINARY_OPERATORS[type(node.op)]
+        left, right = _compile_node(node.left), _compile_node(node.right)
+        return lambda env: function(left(env), right(env))
+
+    if isinstance(node, ast.Compare) and all(type(item) in _COMPARISONS for item in node.ops):
+        operands = [_compile_node(node.left)] + [_compile_node(item) for item in node.comparators]
+        functions = [_COMPARISONS[type(item)] for item in node.ops]
+
+        def compare(env):
+            values = [operand(env) for operand in operands]
+            return all(function(values[index], values[index + 1]) for index, function in enumerate(functions))
+        return compare
+
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        value = node.value
+        return lambda env: value
+
+    if isinstance(node, ast.Name):
+        name = node.id
+        if name not in NAMES and _percentile(name) is None:
+            raise InvalidArgument(f'Unknown name `{name}` in goal expression; '
+                                  f'supported names are pNN percentiles and: {", ".join(NAMES)}')
+        return lambda env: env[name]
+
+    raise InvalidArgument(f'Unsupported syntax in goal expression: {type(node).__name__}')
+
+
+def _replace_literal(match) -> str:
+    return repr(float(match.group(1)) * _LITERAL_UNITS[match.group(2)])
+
+
+@lru_cache(maxsize=None)
+def compile_expression(expression: str) -> Callable[[ExpressionEnvironment], Any]:
+    """Compiles a goal expression into a function of an expression environment. Expressions support
+    comparisons, arithmetic, and/or/not (also uppercase), and literals with units: us, ms, s, %."""
+    source = _KEYWORDS_PATTERN.sub(lambda match: match.group(1).lower(), expression)
+    source = _LITERAL_PATTERN.sub(_replace_literal, source)
+
+    try:
+        tree = ast.parse(source.strip(), mode='eval')
+    except SyntaxError as error:
+        raise InvalidArgument(f'Invalid goal expression `{expression}`: {error.msg}')
+    return _compile_node(tree)
+
+
+class ExpressionGoal(PerformanceGoal):
+    """A performance goal satisfied when an expression over output metrics is true,
+    for example: `p99 < 200ms and error_ratio < 0.1% or rps > 5000`."""
+
+    type_name = 'expr'
+
+    def __init__(self, expression: str):
+        """
+        Creates a new instance of ExpressionGoal, compiling its expression.
+
+        :param expression: boolean expression over output metrics; latencies are in milliseconds
+        """
+        self.expression = expression
+        self._function = compile_expression(expression)
+
+    def __repr__(self):
+        return f'Expression must be true: {self.expression}'
+
+    def __getstate__(self):
+        return {'expression': self.expression}
+
+    def __setstate__(self, state):
+        self.__init__(state['expression'])
+
+    def to_dict(self):
+        return {'expression': self.expression, 'repr': repr(self), 'type': self.get_class_name()}
+
+    def is_satisfied(self, output: BenchmarkOutput) -> bool:
+        try:
+            return bool(self._function(ExpressionEnvironment(output)))
+        except (ArithmeticError, TypeError) as error:
+            # for example, a division by a count of errors that is zero
+            raise GoalException(f'Cannot evaluate `{self.expression}` for output {output.id}: {error}')
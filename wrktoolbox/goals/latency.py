@@ -1,5 +1,5 @@
 import reprlib
-from typing import Union
+from typing import Union, Optional, Tuple
 from wrktoolbox.benchmarks import PerformanceGoal, GoalException
 from wrktoolbox.wrkoutput import BenchmarkOutput
 from .common import LimitType
@@ -29,6 +29,10 @@ class AverageLatencyGoal(PerformanceGoal):
         self.assert_parsed(output.latency)
         return output.latency.avg.ms <= self.limit
 
+    def measure(self, output: BenchmarkOutput) -> Optional[Tuple[float, float]]:
+        self.assert_parsed(output.latency)
+        return output.latency.avg.ms, self.limit - output.latency.avg.ms
+
 
 class PercentileLatencyGoal(PerformanceGoal):
     """A performance goal that is satisfied when the percentile latency of web requests is less than a limit in ms."""
@@ -48,7 +52,7 @@ class PercentileLatencyGoal(PerformanceGoal):
     def __repr__(self):
         return f'The {self.percentile} percentile latency of web requests must be less than {self.limit} ms.'
 
-    def is_satisfied(self, output: BenchmarkOutput) -> bool:
+    def get_value(self, output: BenchmarkOutput) -> float:
         self.assert_parsed(output.latency_distribution)
         value = output.latency_distribution.percentiles.get(self.percentile)
 
@@ -58,5 +62,12 @@ class PercentileLatencyGoal(PerformanceGoal):
                                 f'Configure performance goals to use percentiles returned by wrk. '
                                 f'Found percentiles are: {reprlib.repr(output.latency_distribution.percentiles)}')
 
-        return value.ms <= self.limit
+        return value.ms
+
+    def is_satisfied(self, output: BenchmarkOutput) -> bool:
+        return self.get_value(output) <= float(self.limit)
+
+    def measure(self, output: BenchmarkOutput) -> Optional[Tuple[float, float]]:
+        value = self.get_value(output)
+        return value, float(self.limit) - value
 
@@ -0,0 +1,223 @@
+"""Sampling of load generator host metrics from procfs, to detect benchmarks limited by the client."""
+import os
+import time
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+from wrktoolbox.wrkoutput import Result
+
+
+PROC = Path('/proc')
+SAMPLING_INTERVAL = 0.5
+CPU_SATURATION = 0.9
+PORTS_SATURATION = 0.9
+
+
+def is_supported() -> bool:
+    return (PROC / 'stat').exists()
+
+
+def _read(path: Path) -> Optional[str]:
+    try:
+        return path.read_text()
+    except OSError:
+        return None
+
+
+def read_host_cpu() -> Optional[Tuple[int, int]]:
+    """Returns busy and total jiffies of all CPUs, from /proc/stat."""
+    content = _read(PROC / 'stat')
+    if not content:
+        return None
+    values = [int(value) for value in content.splitlines()[0].split()[1:]]
+    # idle and iowait
+    idle = values[3] + (values[4] if len(values) > 4 else 0)
+    total = sum(values[:8])
+    return total - idle, total
+
+
+def read_process_cpu(pid: int) -> Optional[int]:
+    """Returns user and system jiffies of a process, from /proc/<pid>/stat."""
+    content = _read(PROC / str(pid) / 'stat')
+    if not content:
+        return None
+    # the command name, in parentheses, can contain spaces
+    fields = content[content.rfind(')') + 2:].split()
+    return int(fields[11]) + int(fields[12])
+
+
+def get_descendants(pid: int) -> Set[int]:
+    """Returns the ids of a process and of all its descendants."""
+    pids = {pid}
+    pending = [pid]
+
+    while pending:
+        current = pending.pop()
+        for children_file in (PROC / str(current) / 'task').glob('*/children'):
+            for child in (_read(children_file) or '').split():
+                if int(child) not in pids:
+                    pids.add(int(child))
+                    pending.append(int(child))
+    return pids
+
+
+def read_sockstat() -> Dict[str, int]:
+    """Returns TCP sockets counters (inuse, orphan, tw, alloc, mem) from /proc/net/sockstat."""
+    for line in (_read(PROC / 'net' / 'sockstat') or '').splitlines():
+        if line.startswith('TCP:'):
+            values = line.split()[1:]
+            return {name: int(value) for name, value in zip(values[::2], values[1::2])}
+    return {}
+
+
+def read_load_average() -> Optional[float]:
+    content = _read(PROC / 'loadavg')
+    return float(content.split()[0]) if content else None
+
+
+def read_ephemeral_ports() -> Optional[int]:
+    content = _read(PROC / 'sys' / 'net' / 'ipv4' / 'ip_local_port_range')
+    if not content:
+        return None
+    low, high = (int(value) for value in content.split())
+    return high - low + 1
+
+
+class ClientSummary(Result):
+    """Compact summary of load generator host metrics sampled during a benchmark.
+    CPU usage of the benchmark process is expressed in cores."""
+
+    def __init__(self,
+                 samples: int,
+                 interval: float,
+                 cpu_count: int,
+                 threads: Optional[int] = None,
+                 host_cpu_avg: Optional[float] = None,
+                 host_cpu_max: Optional[float] = None,
+                 process_cores_avg: Optional[float] = None,
+                 process_cores_max: Optional[float] = None,
+                 tcp_inuse_max: Optional[int] = None,
+                 tcp_tw_max: Optional[int] = None,
+                 ephemeral_ports: Optional[int] = None,
+                 load_average_max: Optional[float] = None,
+                 saturated: bool = False,
+                 reasons: Optional[List[str]] = None):
+        self.samples = samples
+        self.interval = interval
+        self.cpu_count = cpu_count
+        self.threads = threads
+        self.host_cpu_avg = host_cpu_avg
+        self.host_cpu_max = host_cpu_max
+        self.process_cores_avg = process_cores_avg
+        self.process_cores_max = process_cores_max
+        self.tcp_inuse_max = tcp_inuse_max
+        self.tcp_tw_max = tcp_tw_max
+        self.ephemeral_ports = ephemeral_ports
+        self.load_average_max = load_average_max
+        self.saturated = saturated
+        self.reasons = reasons or []
+
+
+def get_saturation_reasons(summary: ClientSummary) -> List[str]:
+    """Returns the reasons why the load generator was likely the bottleneck of a benchmark."""
+    reasons = []
+    cores = min(summary.threads or summary.cpu_count, summary.cpu_count)
+
+    if summary.process_cores_avg is not None and summary.process_cores_avg >= CPU_SATURATION * cores:
+        reasons.append(f'benchmark process used {summary.process_cores_avg:.2f} of {cores} available cores')
+
+    if summary.host_cpu_avg is not None and summary.host_cpu_avg >= CPU_SATURATION:
+        reasons.append(f'host CPU usage was {summary.host_cpu_avg:.0%} on average')
+
+    if summary.ephemeral_ports and summary.tcp_inuse_max is not None:
+        used = summary.tcp_inuse_max + (summary.tcp_tw_max or 0)
+        if used >= PORTS_SATURATION * summary.ephemeral_ports:
+            reasons.append(f'{used} TCP sockets in use or TIME_WAIT, '
+                           f'of {summary.ephemeral_ports} ephemeral ports')
+    return reasons
+
+
+class ClientMonitor:
+    """Samples host metrics and CPU usage of a process and its descendants in a background thread."""
+
+    def __init__(self, pid: int, threads: Optional[int] = None, interval: float = SAMPLING_INTERVAL):
+        self.pid = pid
+        self.threads = threads
+        self.interval = interval
+        self.clock_ticks = os.sysconf('SC_CLK_TCK')
+        self.host_cpu = []  # type: List[float]
+        self.process_cores = []  # type: List[float]
+        self.tcp_inuse = []  # type: List[int]
+        self.tcp_tw = []  # type: List[int]
+        self.load_average = []  # type: List[float]
+        self._processes = {}  # type: Dict[int, int]
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='client-monitor', daemon=True)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _read_process_jiffies(self) -> int:
+        # jiffies of exited processes are kept, since their last reading
+        for pid in get_descendants(self.pid):
+            value = read_process_cpu(pid)
+            if value is not None:
+                self._processes[pid] = value
+        return sum(self._processes.values())
+
+    def _run(self):
+        last_time = time.monotonic()
+        last_host = read_host_cpu()
+        last_process = self._read_process_jiffies()
+
+        while not self._stopped.wait(self.interval):
+            now = time.monotonic()
+            host = read_host_cpu()
+            process = self._read_process_jiffies()
+
+            if host and last_host and host[1] > last_host[1]:
+                self.host_cpu.append((host[0] - last_host[0]) / (host[1] - last_host[1]))
+            self.process_cores.append((process - last_process) / self.clock_ticks / (now - last_time))
+
+            sockets = read_sockstat()
+            if sockets:
+                self.tcp_inuse.append(sockets.get('inuse', 0))
+                self.tcp_tw.append(sockets.get('tw', 0))
+
+            load_average = read_load_average()
+            if load_average is not None:
+                self.load_average.append(load_average)
+
+            last_time, last_host, last_process = now, host, process
+
+    def get_summary(self) -> ClientSummary:
+        def avg(values):
+            return sum(values) / len(values) if values else None
+
+        summary = ClientSummary(len(self.process_cores),
+                                self.interval,
+                                os.cpu_count(),
+                                self.threads,
+                                avg(self.host_cpu),
+                                max(self.host_cpu, default=None),
+                                avg(self.process_cores),
+                                max(self.process_cores, default=None),
+                                max(self.tcp_inuse, default=None),
+                                max(self.tcp_tw, default=None),
+                                read_ephemeral_ports(),
+                                max(self.load_average, default=None))
+        reasons = get_saturation_reasons(summary)
+        summary.__dict__.update(saturated=bool(reasons), reasons=reasons)
+        return summary
@@ -1,13 +1,43 @@
 import click
 import logging
+import importlib
+from typing import Dict
 from wrktoolbox import version
-from wrktoolbox.commands.run import run_command
-from wrktoolbox.commands.reports import reports_command
+from wrktoolbox.commands import configure_settings_cache, disable_settings_cache
 from wrktoolbox.logs import get_app_logger
 from .web import disable_ssl_verification
+from .tracing import enable_tracing
 
 
-@click.group()
+COMMANDS = {
+    'run': 'wrktoolbox.commands.run:run_command',
+    'reports': 'wrktoolbox.commands.reports:reports_command',
+    'compare': 'wrktoolbox.commands.compare:compare_command',
+    'evaluate': 'wrktoolbox.commands.evaluate:evaluate_command',
+    'calibrate': 'wrktoolbox.commands.calibrate:calibrate_command',
+    'compact': 'wrktoolbox.commands.compact:compact_command'
+}
+
+
+class LazyGroup(click.Group):
+    """A group of commands importing the module of a command only when it is used, since the CLI is often
+    started many times by orchestration scripts and its startup time matters."""
+
+    def __init__(self, *args, lazy_commands: Dict[str, str] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = lazy_commands or {}
+
+    def list_commands(self, ctx):
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_commands))
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name not in self.commands and cmd_name in self.lazy_commands:
+            module_name, attribute_name = self.lazy_commands[cmd_name].split(':')
+            self.add_command(getattr(importlib.import_module(module_name), attribute_name), cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+
+@click.group(cls=LazyGroup, lazy_commands=COMMANDS)
 @click.option('--verbose',
               default=False,
               help='Whether to display debug output.',
@@ -16,8 +46,24 @@ from .web import disable_ssl_verification
               default=False,
               help='Allows to skip ssl verification.',
               is_flag=True)
+@click.option('--trace',
+              default=None,
+              help='Path of a JSON file where timings of wrktoolbox phases are written, in Chrome trace format; '
+                   'a summary is logged at exit.')
+@click.option('--settings-max-age',
+              default=0,
+              type=float,
+              help='Seconds during which settings downloaded over HTTP are used from the local cache without '
+                   'revalidation; after this time they are revalidated with conditional requests.',
+              show_default=True)
+@click.option('--no-settings-cache',
+              default=False,
+              help='Disables the local cache of settings downloaded over HTTP, which is also used when the '
+                   'settings server is unreachable.',
+              is_flag=True)
 @click.version_option(version=version)
-def main(verbose, no_ssl_verify):
+@click.pass_context
+def main(ctx, verbose, no_ssl_verify, trace, settings_max_age, no_settings_cache):
     """
     wrktoolbox is a tool to run HTTP benchmarks with wrk and wrk2 tools, store their output, and generate
     reports.
@@ -35,6 +81,18 @@ def main(verbose, no_ssl_verify):
         logger.debug('Disabling SSL verification')
         disable_ssl_verification()
 
+    if no_settings_cache:
+        disable_settings_cache()
+    else:
+        configure_settings_cache(settings_max_age)
+
+    if trace:
+        tracer = enable_tracing()
+
+        def write_trace():
+            tracer.write(trace)
+            tracer.log_summary(logger)
+            logger.info(f'Trace written to {trace}')
+
+        ctx.call_on_close(write_trace)
 
-main.add_command(run_command)
-main.add_command(reports_command)
@@ -0,0 +1,54 @@
+"""Functions to read scalar metrics from benchmark outputs, by name."""
+from typing import Dict, Optional
+from wrktoolbox.wrkoutput import BenchmarkOutput, ParseFailure
+
+
+HIGHER_IS_BETTER = {'requests_per_second'}
+
+
+def is_parsed(value) -> bool:
+    return value is not None and not isinstance(value, ParseFailure)
+
+
+def percentile_metric_name(percentile: float) -> str:
+    return f'p{float(percentile):g}_latency_ms'
+
+
+def get_percentiles(output: BenchmarkOutput) -> Dict[float, float]:
+    """Returns the latency percentiles of an output, in milliseconds."""
+    distribution = output.latency_distribution
+    if not is_parsed(distribution):
+        return {}
+    return {percentile: value.ms for percentile, value in distribution.percentiles.items()}
+
+
+def get_percentile(output: BenchmarkOutput, percentile: float) -> Optional[float]:
+    distribution = output.latency_distribution
+    if not is_parsed(distribution):
+        return None
+    value = distribution.percentiles.get(float(percentile))
+    return value.ms if value is not None else None
+
+
+def get_metrics(output: BenchmarkOutput) -> Dict[str, float]:
+    """Returns requests per second, average and max latency, and every latency percentile of an output;
+    missing metrics are not included."""
+    metrics = {}
+
+    if output.requests_per_second is not None:
+        metrics['requests_per_second'] = output.requests_per_second
+
+    latency = output.latency
+    if is_parsed(latency):
+        metrics['avg_latency_ms'] = latency.avg.ms
+        metrics['max_latency_ms'] = latency.max.ms
+
+    for percentile, value in get_percentiles(output).items():
+        metrics[percentile_metric_name(percentile)] = value
+    return metrics
+
+
+def get_target_metrics(output: BenchmarkOutput) -> Dict[str, float]:
+    """Returns the averages of target metrics collected while a benchmark ran, by series name."""
+    series = getattr(output, 'target_metrics', None) or {}
+    return {name: item.avg_value for name, item in series.items() if item.avg_value is not None}
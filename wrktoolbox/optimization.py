@@ -0,0 +1,139 @@
+import math
+from collections.abc import Mapping
+from typing import Callable, Dict, List, Optional
+from rocore.exceptions import InvalidArgument
+
+
+class Probe:
+    """Result of a short benchmark run at a given concurrency."""
+
+    def __init__(self,
+                 concurrency: int,
+                 requests_per_second: Optional[float],
+                 latency_ms: Optional[float],
+                 output_id: Optional[str] = None):
+        self.concurrency = concurrency
+        self.requests_per_second = requests_per_second or 0.0
+        self.latency_ms = latency_ms
+        self.output_id = output_id
+
+    def __repr__(self):
+        return f'<Probe c={self.concurrency} rps={self.requests_per_second} latency={self.latency_ms}ms>'
+
+
+ProbeFunction = Callable[[int], Probe]
+
+
+class ConcurrencySearch:
+    """Searches the concurrency that maximizes requests per second of closed-loop benchmarks,
+    while respecting an optional latency ceiling.
+
+    Concurrency is first increased geometrically until throughput stops improving, or latency exceeds the
+    ceiling; then the interval around the best probe is refined with golden-section search."""
+
+    supported_targets = {'concurrency'}
+
+    def __init__(self,
+                 target: str = 'concurrency',
+                 probe_duration: int = 5,
+                 min_concurrency: Optional[int] = None,
+                 max_concurrency: int = 1024,
+                 factor: float = 2,
+                 latency_limit: Optional[float] = None,
+                 latency_percentile: Optional[float] = None,
+                 tolerance: float = 0.02,
+                 refine_steps: int = 4):
+        if target not in self.supported_targets:
+            raise InvalidArgument(f'Unsupported optimization target `{target}`; '
+                                  f'supported targets are: {", ".join(sorted(self.supported_targets))}')
+        if factor <= 1:
+            raise InvalidArgument('Optimization `factor` must be greater than 1')
+        if min_concurrency is not None and min_concurrency > max_concurrency:
+            raise InvalidArgument('Optimization `min_concurrency` cannot be greater than `max_concurrency`')
+
+        self.target = target
+        self.probe_duration = probe_duration
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.factor = factor
+        self.latency_limit = float(latency_limit) if latency_limit is not None else None
+        self.latency_percentile = float(latency_percentile) if latency_percentile is not None else None
+        self.tolerance = tolerance
+        self.refine_steps = refine_steps
+
+    @classmethod
+    def from_configuration(cls, value) -> 'ConcurrencySearch':
+        if isinstance(value, str):
+            return cls(target=value)
+        if isinstance(value, Mapping):
+            return cls(**value)
+        raise InvalidArgument('Invalid `optimize` configuration; expected a target name or a mapping')
+
+    def to_dict(self):
+        return self.__dict__.copy()
+
+    def estimated_probes(self, min_concurrency: int) -> int:
+        climb = math.ceil(math.log(max(self.max_concurrency / max(min_concurrency, 1), 1), self.factor)) + 1
+        return climb + self.refine_steps
+
+    def is_acceptable(self, probe: Probe) -> bool:
+        if self.latency_limit is None:
+            return True
+        return probe.latency_ms is not None and probe.latency_ms <= self.latency_limit
+
+    def _score(self, probe: Probe) -> float:
+        return probe.requests_per_second if self.is_acceptable(probe) else -math.inf
+
+    def search(self, probe_function: ProbeFunction, min_concurrency: int) -> List[Probe]:
+        """Runs probes using the given function, returning them sorted by concurrency."""
+        probes: Dict[int, Probe] = {}
+
+        def probe(concurrency: int) -> Probe:
+            if concurrency not in probes:
+                probes[concurrency] = probe_function(concurrency)
+            return probes[concurrency]
+
+        concurrency = max(1, self.min_concurrency or min_concurrency)
+        best = probe(concurrency)
+
+        while concurrency < self.max_concurrency:
+            concurrency = min(self.max_concurrency, max(concurrency + 1, int(concurrency * self.factor)))
+            current = probe(concurrency)
+
+            if not self.is_acceptable(current):
+                break
+
+            if self._score(current) <= self._score(best) * (1 + self.tolerance):
+                if self._score(current) > self._score(best):
+                    best = current
+                break
+            best = current
+
+        # refine the interval around the best probe
+        levels = sorted(probes)
+        index = levels.index(best.concurrency)
+        low = levels[max(0, index - 1)]
+        high = levels[min(len(levels) - 1, index + 1)]
+
+        ratio = (math.sqrt(5) - 1) / 2
+        c = round(high - ratio * (high - low))
+        d = round(low + ratio * (high - low))
+
+        for _ in range(self.refine_steps):
+            if d - c < 1:
+                break
+            # each step reuses one interior probe of the previous one
+            if self._score(probe(c)) >= self._score(probe(d)):
+                high, d = d, c
+                c = round(high - ratio * (high - low))
+            else:
+                low, c = c, d
+                d = round(low + ratio * (high - low))
+
+        return [probes[key] for key in sorted(probes)]
+
+    def get_best(self, probes: List[Probe]) -> Probe:
+        acceptable = [probe for probe in probes if self.is_acceptable(probe)]
+        if not acceptable:
+            return min(probes, key=lambda item: item.concurrency)
+        return max(acceptable, key=lambda item: item.requests_per_second)
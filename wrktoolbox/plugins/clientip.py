@@ -8,6 +8,10 @@ from wrktoolbox.benchmarks import BenchmarkSuite
 from rocore.decorators import retry
 
 
+# the setup of this plugin only sets the public ip of the suite, it can run concurrently with other plugins
+setup_independent = True
+
+
 def capture_ips(text: str):
     return re.findall(r'[0-9]+(?:\.[0-9]+){3}', text) + re.findall(r'\b(?:(?:[0-9a-zA-Z]{1,4}|:):?){8}\b', text)
 
@@ -0,0 +1,317 @@
+import ssl
+import socket
+import threading
+import http.client
+from enum import Enum
+from time import perf_counter
+from logging import Logger
+from collections.abc import Mapping
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, Dict, List, Sequence, Tuple
+from rocore.exceptions import InvalidArgument
+from wrktoolbox.web import get_ssl_context
+from wrktoolbox.wrkoutput import Result
+from wrktoolbox.benchmarks import BenchmarkConfig, BenchmarkException
+
+
+Origin = Tuple[str, str, int]
+
+
+class PreflightException(BenchmarkException):
+
+    def __init__(self, results: Sequence['PreflightResult']):
+        super().__init__('Pre-flight check failed for: '
+                         + ', '.join(f'{result.url} ({result.error or result.status})' for result in results))
+        self.results = results
+
+
+class OnPreflightFailure(Enum):
+    FAIL = 'fail'
+    SKIP = 'skip'
+    WARN = 'warn'
+
+
+class PreflightResult(Result):
+    """Outcome of a single pre-flight request, with timings in milliseconds.
+    DNS, connect and TLS timings are None when a pooled connection was reused; the time to first byte is measured
+    from when the request is sent on an established connection, the total time includes connecting."""
+
+    def __init__(self,
+                 url: str,
+                 success: bool,
+                 status: Optional[int] = None,
+                 error: Optional[str] = None,
+                 reused_connection: bool = False,
+                 dns_ms: Optional[float] = None,
+                 connect_ms: Optional[float] = None,
+                 tls_ms: Optional[float] = None,
+                 first_byte_ms: Optional[float] = None,
+                 total_ms: Optional[float] = None):
+        self.url = url
+        self.success = success
+        self.status = status
+        self.error = error
+        self.reused_connection = reused_connection
+        self.dns_ms = dns_ms
+        self.connect_ms = connect_ms
+        self.tls_ms = tls_ms
+        self.first_byte_ms = first_byte_ms
+        self.total_ms = total_ms
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((perf_counter() - start) * 1000, 3)
+
+
+class ConnectionPool:
+    """A thread safe pool of keep-alive HTTP connections, grouped by origin."""
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self._idle = {}  # type: Dict[Origin, List[http.client.HTTPConnection]]
+        self._lock = threading.Lock()
+
+    def connect(self, origin: Origin, timings: Dict[str, float]) -> http.client.HTTPConnection:
+        """Opens a new connection to the given origin, recording DNS, connect and TLS timings."""
+        scheme, host, port = origin
+
+        start = perf_counter()
+        addresses = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        timings['dns_ms'] = _elapsed_ms(start)
+
+        start = perf_counter()
+        sock = None
+        last_error = None
+        for family, sock_type, proto, _, address in addresses:
+            sock = socket.socket(family, sock_type, proto)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(address)
+            except OSError as error:
+                sock.close()
+                sock = None
+                last_error = error
+            else:
+                break
+
+        if sock is None:
+            raise last_error or OSError(f'Cannot connect to {host}:{port}')
+
+        timings['connect_ms'] = _elapsed_ms(start)
+
+        if scheme == 'https':
+            start = perf_counter()
+            context = get_ssl_context()
+            try:
+                sock = context.wrap_socket(sock, server_hostname=host)
+            except (OSError, ssl.SSLError):
+                sock.close()
+                raise
+            timings['tls_ms'] = _elapsed_ms(start)
+            connection = http.client.HTTPSConnection(host, port, timeout=self.timeout, context=context)
+        else:
+            connection = http.client.HTTPConnection(host, port, timeout=self.timeout)
+
+        connection.sock = sock
+        return connection
+
+    def acquire(self, origin: Origin, timings: Dict[str, float]) -> Tuple[http.client.HTTPConnection, bool]:
+        """Returns a connection for the given origin, and whether it was reused from the pool."""
+        with self._lock:
+            idle = self._idle.get(origin)
+            if idle:
+                return idle.pop(), True
+        return self.connect(origin, timings), False
+
+    def release(self, origin: Origin, connection: http.client.HTTPConnection):
+        with self._lock:
+            self._idle.setdefault(origin, []).append(connection)
+
+    def close(self):
+        with self._lock:
+            for connections in self._idle.values():
+                for connection in connections:
+                    connection.close()
+            self._idle.clear()
+
+
+def _get_origin(url: str) -> Tuple[Origin, str]:
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+
+    if scheme not in {'http', 'https'}:
+        raise InvalidArgument(f'Unsupported url scheme: {url}')
+
+    port = parts.port or (443 if scheme == 'https' else 80)
+    path = parts.path or '/'
+    if parts.query:
+        path += '?' + parts.query
+    return (scheme, parts.hostname, port), path
+
+
+def _get_requests(configuration: BenchmarkConfig) -> List[Tuple[str, Optional[Dict[str, str]]]]:
+    requests = [(configuration.url, configuration.headers)]
+    if configuration.ab:
+        for variant in (configuration.ab.a, configuration.ab.b):
+            requests.append((variant.url or configuration.url, variant.headers or configuration.headers))
+    return requests
+
+
+class Preflight:
+    """Checks that configured urls are reachable, before running benchmarks. By default any response is accepted,
+    except 404, which usually indicates a wrong url, and server errors: endpoints answering 401 or 405 to the
+    pre-flight request are reachable. Accepted statuses can be configured explicitly."""
+
+    def __init__(self,
+                 enabled: bool = True,
+                 timeout: float = 5,
+                 concurrency: int = 10,
+                 on_failure: OnPreflightFailure = OnPreflightFailure.FAIL,
+                 method: str = 'GET',
+                 accepted_statuses: Optional[Sequence[int]] = None):
+        self.enabled = bool(enabled)
+        self.timeout = float(timeout)
+        self.concurrency = max(1, int(concurrency))
+        self.on_failure = OnPreflightFailure(on_failure or OnPreflightFailure.FAIL)
+        self.method = method.upper()
+        self.accepted_statuses = [int(status) for status in accepted_statuses] if accepted_statuses else None
+
+    def is_accepted(self, status: int) -> bool:
+        if self.accepted_statuses is not None:
+            return status in self.accepted_statuses
+        return status < 500 and status != 404
+
+    @classmethod
+    def from_configuration(cls, value) -> 'Preflight':
+        if isinstance(value, bool):
+            return cls(enabled=value)
+        if isinstance(value, Mapping):
+            return cls(**value)
+        raise InvalidArgument('Invalid `preflight` configuration; expected a boolean or a mapping')
+
+    def to_dict(self):
+        return {
+            'enabled': self.enabled,
+            'timeout': self.timeout,
+            'concurrency': self.concurrency,
+            'on_failure': self.on_failure.value,
+            'method': self.method,
+            'accepted_statuses': self.accepted_statuses
+        }
+
+    def _send(self,
+              connection: http.client.HTTPConnection,
+              path: str,
+              headers: Optional[Dict[str, str]]) -> Tuple[http.client.HTTPResponse, float]:
+        request_start = perf_counter()
+        connection.request(self.method, path, headers=headers or {})
+        response = connection.getresponse()
+        first_byte_ms = _elapsed_ms(request_start)
+        response.read()
+        return response, first_byte_ms
+
+    def _request(self,
+                 pool: ConnectionPool,
+                 url: str,
+                 headers: Optional[Dict[str, str]]) -> PreflightResult:
+        timings = {}
+        start = perf_counter()
+        try:
+            origin, path = _get_origin(url)
+            connection, reused = pool.acquire(origin, timings)
+        except (OSError, InvalidArgument) as error:
+            return PreflightResult(url, False, error=str(error), **timings)
+
+        try:
+            try:
+                response, first_byte_ms = self._send(connection, path, headers)
+            except (ConnectionResetError, BrokenPipeError):
+                # NB: RemoteDisconnected is a ConnectionResetError
+                if not reused:
+                    raise
+                # the server closed an idle keep-alive connection: retry once on a new connection
+                connection.close()
+                connection, reused = pool.connect(origin, timings), False
+                response, first_byte_ms = self._send(connection, path, headers)
+        except (OSError, http.client.HTTPException) as error:
+            connection.close()
+            return PreflightResult(url, False, error=str(error) or error.__class__.__name__,
+                                   reused_connection=reused, **timings)
+
+        total_ms = _elapsed_ms(start)
+
+        if response.will_close:
+            connection.close()
+        else:
+            pool.release(origin, connection)
+
+        return PreflightResult(url,
+                               self.is_accepted(response.status),
+                               status=response.status,
+                               reused_connection=reused,
+                               first_byte_ms=first_byte_ms,
+                               total_ms=total_ms,
+                               **timings)
+
+    def check(self, configurations: Sequence[BenchmarkConfig]) -> List[Optional[PreflightResult]]:
+        """Checks all configured urls concurrently, returning results in the same order of configurations;
+        identical requests are sent only once. Both variants of A/B tests are checked, and the result of a
+        configuration is its first failure, if any. When `on_failure` is `fail`, pending checks are cancelled at the
+        first failure and their results are None."""
+        requests = {}
+        for index, configuration in enumerate(configurations):
+            for url, headers in _get_requests(configuration):
+                key = (url, tuple(sorted((headers or {}).items())))
+                indexes = requests.setdefault(key, [])
+                if index not in indexes:
+                    indexes.append(index)
+
+        pool = ConnectionPool(self.timeout)
+        results = [None] * len(configurations)  # type: List[Optional[PreflightResult]]
+
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(requests) or 1)) as executor:
+            futures = {executor.submit(self._request, pool, url, dict(headers)): (url, headers)
+                       for url, headers in requests}
+            for future in as_completed(futures):
+                result = future.result()
+                for index in requests[futures[future]]:
+                    if results[index] is None or results[index].success:
+                        results[index] = result
+
+                if not result.success and self.on_failure == OnPreflightFailure.FAIL:
+                    for pending in futures:
+                        pending.cancel()
+                    break
+
+        pool.close()
+        return results
+
+    def run(self, suite, logger: Logger):
+        """Checks the configurations of a suite, applying the configured failure strategy."""
+        results = self.check(suite.configurations)
+        suite.preflight_results = [result for result in results if result is not None]
+
+        failed = []
+        for configuration, result in zip(suite.configurations, results):
+            if result is None:
+                continue
+            if result.success:
+                logger.info(f' - {configuration.test_id}: {result.status} '
+                            f'(first byte {result.first_byte_ms} ms)')
+            else:
+                failed.append(configuration)
+                logger.error(f' - {configuration.test_id}: unreachable {result.url}; '
+                             f'{result.error or result.status}')
+
+        if not failed:
+            return
+
+        if self.on_failure == OnPreflightFailure.FAIL:
+            raise PreflightException([result for result in results if result is not None and not result.success])
+
+        if self.on_failure == OnPreflightFailure.SKIP:
+            logger.warning(f'Skipping {len(failed)} unreachable benchmarks: '
+                           f'{", ".join(configuration.test_id for configuration in failed)}')
+            suite.configurations = [configuration for configuration in suite.configurations
+                                    if not any(configuration is item for item in failed)]
@@ -1 +1,3 @@
 from .writer import ReportWriter
+from .scalability import ScalabilityWriter
+from .table import MetricsTableWriter
@@ -5,6 +5,7 @@ from rocore.exceptions import InvalidArgument
 from wrktoolbox.benchmarks import BenchmarkPlugin, handle_plugins, BenchmarkOutput
 from wrktoolbox.results import ResultsImporter, SuiteReport
 from wrktoolbox.reports import ReportWriter
+from wrktoolbox.tracing import span
 # noinspection PyUnresolvedReferences
 from wrktoolbox.results.importers.fs import JsonResultsImporter, BinResultsImporter
 
@@ -36,14 +37,20 @@ class ReportGeneration(Model):
         else:
             yield from importer.import_suites()
 
+    def _import_results(self, importer, report):
+        # NB: details of outputs, like their raw output and percentile spectra, are read only when a writer uses them
+        if all(writer.reads_scalar_values for writer in self.writers):
+            return importer.import_scalar_results(report)
+        return importer.import_results(report)
+
     def _get_results(self, importer, report):
         if self.sort:
-            items = list(importer.import_results(report))  # type: List[BenchmarkOutput]
+            items = list(self._import_results(importer, report))  # type: List[BenchmarkOutput]
             items.sort(key=lambda item: item.url)
 
             yield from items
         else:
-            yield from importer.import_results(report)
+            yield from self._import_results(importer, report)
 
     def run(self, logger: Logger):
         if not self.importers:
@@ -58,16 +65,19 @@ class ReportGeneration(Model):
                 logger.info('Imported suite %s', report.suite.id)
 
                 for writer in self.writers:
-                    writer.write(report)
+                    with span('write_suite', writer=writer.get_class_name()):
+                        writer.write(report)
 
                 for result in self._get_results(importer, report):  # type: BenchmarkOutput
                     for writer in self.writers:
-                        writer.write_output(report, result)
+                        with span('write_output', writer=writer.get_class_name()):
+                            writer.write_output(report, result)
 
         for writer in self.writers:
             if hasattr(writer, 'close'):
                 logger.info('Closing writer %s', writer.get_class_name())
-                writer.close()
+                with span('close_writer', writer=writer.get_class_name()):
+                    writer.close()
 
         logger.debug('Finished processing report')
 
@@ -0,0 +1,247 @@
+"""
+Universal Scalability Law (USL) report, over results of the same benchmark run at different concurrency levels.
+
+    X(N) = λN / (1 + σ(N - 1) + κN(N - 1))
+
+where X is the throughput at concurrency N, λ the throughput of a single user, σ the contention coefficient and κ
+the coherency coefficient. For a closed system without think time, Little's law gives the latency R(N) = N / X(N).
+"""
+import math
+import json
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple
+from rocore.exceptions import InvalidArgument
+from wrktoolbox.reports.writer import ReportWriter
+from wrktoolbox.results import SuiteReport, BenchmarkOutput
+
+
+Point = Tuple[float, float]
+GOLDEN_RATIO = (math.sqrt(5) - 1) / 2
+
+
+class UslModel:
+
+    def __init__(self, throughput_one: float, contention: float, coherency: float):
+        self.throughput_one = throughput_one
+        self.contention = contention
+        self.coherency = coherency
+
+    def throughput(self, concurrency: float) -> float:
+        n = concurrency
+        return self.throughput_one * n / (1 + self.contention * (n - 1) + self.coherency * n * (n - 1))
+
+    def latency_ms(self, concurrency: float) -> float:
+        """Returns the latency predicted by Little's law, in milliseconds."""
+        return concurrency / self.throughput(concurrency) * 1000
+
+    @property
+    def peak_concurrency(self) -> Optional[float]:
+        if self.coherency <= 0 or self.contention >= 1:
+            return None
+        return math.sqrt((1 - self.contention) / self.coherency)
+
+    @property
+    def peak_throughput(self) -> Optional[float]:
+        peak_concurrency = self.peak_concurrency
+        if peak_concurrency is None:
+            # without coherency delay, throughput approaches an asymptote; without contention it grows linearly
+            return self.throughput_one / self.contention if self.contention > 0 else None
+        return self.throughput(peak_concurrency)
+
+
+def _fit_coefficients(points: Sequence[Point], throughput_one: float) -> Tuple[float, float]:
+    # for a given λ, λN/X - 1 = σ(N - 1) + κN(N - 1) is linear in σ and κ
+    saa = sab = sbb = say = sby = 0.0
+    for n, x in points:
+        a = n - 1
+        b = n * (n - 1)
+        y = throughput_one * n / x - 1
+        saa += a * a
+        sab += a * b
+        sbb += b * b
+        say += a * y
+        sby += b * y
+
+    determinant = saa * sbb - sab * sab
+    if determinant > 0:
+        contention = (say * sbb - sby * sab) / determinant
+        coherency = (sby * saa - say * sab) / determinant
+        if contention >= 0 and coherency >= 0:
+            return contention, coherency
+
+    # constrained solutions, with one of the coefficients equal to zero
+    candidates = [(max(0.0, say / saa) if saa else 0.0, 0.0),
+                  (0.0, max(0.0, sby / sbb) if sbb else 0.0)]
+    return min(candidates, key=lambda item: _error(points, UslModel(throughput_one, *item)))
+
+
+def _error(points: Sequence[Point], model: UslModel) -> float:
+    return sum(((model.throughput(n) - x) / x) ** 2 for n, x in points)
+
+
+def fit_usl(points: Sequence[Point]) -> UslModel:
+    """Fits the USL to (concurrency, throughput) points, minimizing the relative squared error."""
+    points = [(float(n), float(x)) for n, x in points if n and n > 0 and x and x > 0]
+
+    if len({n for n, _ in points}) < 3:
+        raise InvalidArgument('at least three distinct concurrency levels are required to fit the USL')
+
+    def evaluate(throughput_one):
+        model = UslModel(throughput_one, *_fit_coefficients(points, throughput_one))
+        return _error(points, model), model
+
+    # λ cannot be lower than the highest throughput per user, when coefficients are not negative;
+    # a coarse logarithmic scan is refined with golden-section search
+    low = max(x / n for n, x in points)
+    candidates = [low * 10 ** (i / 20) for i in range(41)]
+    errors = [evaluate(value)[0] for value in candidates]
+    best = errors.index(min(errors))
+
+    a = candidates[max(0, best - 1)]
+    b = candidates[min(len(candidates) - 1, best + 1)]
+    c = b - GOLDEN_RATIO * (b - a)
+    d = a + GOLDEN_RATIO * (b - a)
+
+    for _ in range(60):
+        if evaluate(c)[0] < evaluate(d)[0]:
+            b = d
+        else:
+            a = c
+        c = b - GOLDEN_RATIO * (b - a)
+        d = a + GOLDEN_RATIO * (b - a)
+
+    return evaluate((a + b) / 2)[1]
+
+
+class ScalabilityResult:
+
+    def __init__(self,
+                 url: str,
+                 fingerprint: str,
+                 points: List[Tuple[int, float, Optional[float]]],
+                 model: Optional[UslModel] = None,
+                 error: Optional[str] = None):
+        self.url = url
+        self.fingerprint = fingerprint
+        self.points = points
+        self.model = model
+        self.error = error
+
+    @property
+    def r_squared(self) -> Optional[float]:
+        if self.model is None:
+            return None
+        values = [x for _, x, _ in self.points]
+        mean = sum(values) / len(values)
+        total = sum((x - mean) ** 2 for x in values)
+        residual = sum((self.model.throughput(n) - x) ** 2 for n, x, _ in self.points)
+        return 1 - residual / total if total else 1.0
+
+    def to_dict(self):
+        data = {
+            'url': self.url,
+            'fingerprint': self.fingerprint,
+            'points': [{'concurrency': n,
+                        'requests_per_second': x,
+                        'avg_latency_ms': latency,
+                        'littles_law_latency_ms': n / x * 1000}
+                       for n, x, latency in self.points]
+        }
+        if self.error:
+            data['error'] = self.error
+            return data
+
+        model = self.model
+        peak_concurrency = model.peak_concurrency
+        data.update({
+            'lambda': model.throughput_one,
+            'contention': model.contention,
+            'coherency': model.coherency,
+            'r_squared': self.r_squared,
+            'peak_concurrency': peak_concurrency,
+            'peak_throughput': model.peak_throughput,
+            'peak_latency_ms': model.latency_ms(peak_concurrency) if peak_concurrency else None
+        })
+        return data
+
+
+class ScalabilityWriter(ReportWriter):
+    """A writer that fits throughput over concurrency to the Universal Scalability Law, for outputs sharing the
+    same url and configuration except for concurrency. Only scalar metrics of outputs are read and kept in memory."""
+
+    type_name = 'usl'
+
+    reads_scalar_values = True
+
+    def __init__(self,
+                 output_file: Optional[str] = None,
+                 logger_name: str = 'wrktoolbox'):
+        self.output_file = output_file
+        self.logger = logging.getLogger(logger_name)
+        self.results = None  # type: Optional[List[ScalabilityResult]]
+        self._points: Dict[Tuple[str, str], List[Tuple[int, float, Optional[float]]]] = {}
+        self._fingerprints: Dict[str, Dict[str, str]] = {}
+
+    def _get_fingerprint(self, report: SuiteReport, output: BenchmarkOutput) -> str:
+        suite_id = str(report.suite.id)
+        fingerprints = self._fingerprints.get(suite_id)
+
+        if fingerprints is None:
+            fingerprints = self._fingerprints[suite_id] = {
+                configuration.test_id: configuration.get_fingerprint(exclude=('concurrency',))
+                for configuration in report.suite.configurations
+            }
+
+        fingerprint = fingerprints.get(getattr(output, 'test_id', None))
+        # outputs stored by older versions are not linked to their configuration
+        return fingerprint or f'threads:{output.threads}'
+
+    def write(self, report: SuiteReport):
+        pass
+
+    def write_output(self, report: SuiteReport, output: BenchmarkOutput):
+        if not output.connections or not output.requests_per_second:
+            return
+
+        latency = output.latency.avg.ms if output.latency and hasattr(output.latency, 'avg') else None
+        key = (output.url, self._get_fingerprint(report, output))
+        self._points.setdefault(key, []).append((output.connections, output.requests_per_second, latency))
+
+    def get_results(self) -> List[ScalabilityResult]:
+        results = []
+        for (url, fingerprint), points in self._points.items():
+            points = sorted(points)
+
+            if len({n for n, _, _ in points}) < 3:
+                continue
+
+            try:
+                model = fit_usl([(n, x) for n, x, _ in points])
+            except (InvalidArgument, ArithmeticError) as error:
+                results.append(ScalabilityResult(url, fingerprint, points, error=str(error)))
+            else:
+                results.append(ScalabilityResult(url, fingerprint, points, model))
+        return results
+
+    def close(self):
+        self.results = self.get_results()
+
+        for result in self.results:
+            if result.error:
+                self.logger.info('USL fit failed for %s: %s', result.url, result.error)
+                continue
+
+            data = result.to_dict()
+            self.logger.info('USL %s; σ=%.5f κ=%.7f λ=%.2f R²=%.3f; peak concurrency: %s; peak throughput: %s',
+                             result.url,
+                             data['contention'],
+                             data['coherency'],
+                             data['lambda'],
+                             data['r_squared'],
+                             round(data['peak_concurrency']) if data['peak_concurrency'] else 'none',
+                             f'{data["peak_throughput"]:.2f}' if data['peak_throughput'] is not None
+                             else 'unbounded')
+
+        if self.output_file:
+            with open(self.output_file, mode='wt', encoding='utf8') as output_file:
+                json.dump([result.to_dict() for result in self.results], output_file, indent=4)
@@ -0,0 +1,53 @@
+import csv
+from typing import Dict, List, Optional
+from wrktoolbox.metrics import get_metrics, get_target_metrics
+from wrktoolbox.results import SuiteReport, BenchmarkOutput
+from .writer import ReportWriter
+
+
+class MetricsTableWriter(ReportWriter):
+    """A writer that outputs a CSV table with a row for each benchmark output, joining its metrics with
+    the averages of target metrics collected while it ran, and the ratio to the ceiling of the load generator
+    when the suite was calibrated."""
+
+    type_name = 'metrics-csv'
+
+    def __init__(self, output_file: str = 'metrics.csv', target_metrics: bool = True):
+        self.output_file = output_file
+        self.target_metrics = target_metrics
+        self.rows: List[Dict[str, Optional[object]]] = []
+
+    def write(self, report: SuiteReport):
+        pass
+
+    def write_output(self, report: SuiteReport, output: BenchmarkOutput):
+        row = {
+            'suite_id': report.suite.id,
+            'location': report.suite.location,
+            'output_id': output.id,
+            'test_id': getattr(output, 'test_id', None),
+            'url': output.url,
+            'threads': output.threads,
+            'connections': output.connections
+        }
+        row.update(get_metrics(output))
+
+        # results near the ceiling of the load generator measured by calibration are not reliable
+        host = getattr(report.suite, 'host', None)
+        ceiling = host.get_generator_ceiling(output.threads, output.connections) if host is not None else None
+        if ceiling and output.requests_per_second is not None:
+            row['generator_ceiling_ratio'] = round(output.requests_per_second / ceiling, 3)
+
+        if self.target_metrics:
+            row.update((f'target:{name}', value) for name, value in get_target_metrics(output).items())
+        self.rows.append(row)
+
+    def close(self):
+        columns = []
+        for row in self.rows:
+            columns.extend(name for name in row if name not in columns)
+
+        with open(self.output_file, mode='wt', encoding='utf8', newline='') as file:
+            writer = csv.DictWriter(file, columns)
+            writer.writeheader()
+            writer.writerows(self.rows)
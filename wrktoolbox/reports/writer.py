@@ -7,6 +7,9 @@ from wrktoolbox.results import SuiteReport, BenchmarkOutput
 class ReportWriter(Registry):
     """A class that can write a report for a sequence of results."""
 
+    # whether the writer reads only scalar values of outputs, which can then be imported without their details
+    reads_scalar_values = False
+
     @abstractmethod
     def write(self, report: SuiteReport):
         """Writes a report."""
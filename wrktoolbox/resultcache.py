@@ -0,0 +1,173 @@
+"""Cache of benchmark results: outputs of benchmarks previously run against the same version of the target, with the
+same settings, are reused instead of running the benchmarks again. Outputs are identified by a result key, a hash of
+the settings affecting results, of the content of Lua scripts, of the load generator and of the `target_version`
+defined in the metadata of suites.
+
+Stored outputs are selected using index files written by file system stores and headers of segments, and only the
+reused outputs are parsed; other archives are read entirely with their importer."""
+from datetime import datetime
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Union
+from rocore.exceptions import InvalidArgument
+from wrktoolbox.compression import strip_extension
+from wrktoolbox.logs import get_app_logger
+from wrktoolbox.results import ResultsImporter, to_utc
+from wrktoolbox.results.importers.fs import FileSystemResultsImporter
+from wrktoolbox.stores.segments import is_segment, read_segment_header
+from wrktoolbox.wrkoutput import BenchmarkOutput
+from wrktoolbox.tracing import span
+
+
+logger = get_app_logger()
+
+# stored outputs, or functions loading them
+StoredOutput = Union[BenchmarkOutput, Callable[[], BenchmarkOutput]]
+
+
+def _get_age(end_time: Optional[datetime]) -> Optional[float]:
+    end_time = to_utc(end_time)
+    if end_time is None:
+        return None
+    return (datetime.utcnow() - end_time).total_seconds()
+
+
+def _get_target_version(metadata: Any) -> Optional[str]:
+    if isinstance(metadata, dict) and metadata.get('target_version') is not None:
+        return str(metadata['target_version'])
+    return None
+
+
+class ResultCache:
+
+    def __init__(self, importer: dict, max_age: Optional[float] = None):
+        """
+        Creates a new instance of ResultCache.
+
+        :param importer: configuration of the importer used to load stored outputs
+        :param max_age: seconds after which stored outputs are not reused; by default they are always reused
+        """
+        self.importer = importer
+        self.max_age = float(max_age) if max_age is not None else None
+        self._outputs = {}  # type: Dict[str, Dict[str, List[StoredOutput]]]
+
+    def is_fresh(self, output: BenchmarkOutput) -> bool:
+        return self._is_fresh(output.end_time or output.start_time)
+
+    def _is_fresh(self, end_time) -> bool:
+        if self.max_age is None:
+            return True
+        age = _get_age(end_time)
+        return age is not None and age <= self.max_age
+
+    def _load_indexed(self,
+                      importer: FileSystemResultsImporter,
+                      target_version: str) -> Optional[Dict[str, List[StoredOutput]]]:
+        """Returns functions loading fresh stored outputs by result key, selected using index entries and segment
+        headers; or None when the archive has suites or outputs not indexed with target versions and result keys,
+        e.g. written by previous versions."""
+        versions = {}  # type: Dict[str, Optional[str]]
+        entries = []  # type: List[tuple]
+
+        for path, entry in importer.get_files():
+            if importer.reads_segments and is_segment(path.name):
+                header = read_segment_header(str(path))
+                suite = header['suite']
+                versions[str(suite.get('id'))] = _get_target_version(suite.get('metadata'))
+                for position, item in enumerate(header['outputs']):
+                    if 'result_key' not in item:
+                        return None
+                    entries.append((suite.get('id'), item, partial(importer.load_output, path, position)))
+                continue
+
+            if not strip_extension(path.name).endswith(importer.get_file_extension()):
+                continue
+
+            if entry is None:
+                return None
+
+            kind = entry.get('kind')
+            if kind == 'suite':
+                if 'target_version' not in entry:
+                    return None
+                versions[entry.get('id')] = entry['target_version']
+            elif kind == 'output':
+                if 'result_key' not in entry:
+                    return None
+                entries.append((entry.get('suite_id'), entry, partial(importer.load_output, path)))
+
+        selected = {}  # type: Dict[str, List[tuple]]
+        for suite_id, entry, load in entries:
+            key = entry.get('result_key')
+            if not key or versions.get(str(suite_id)) != target_version \
+                    or not self._is_fresh(entry.get('end_time') or entry.get('start_time')):
+                continue
+            selected.setdefault(key, []).append((to_utc(entry.get('start_time')) or datetime.min, load))
+
+        outputs = {}  # type: Dict[str, List[StoredOutput]]
+        for key, items in selected.items():
+            items.sort(key=lambda item: item[0], reverse=True)
+            outputs[key] = [load for _, load in items]
+        return outputs
+
+    def _load(self, target_version: str) -> Dict[str, List[StoredOutput]]:
+        outputs = {}  # type: Dict[str, List[StoredOutput]]
+
+        try:
+            importer = ResultsImporter.from_configuration(dict(self.importer))
+        except InvalidArgument as e:
+            # NB: e.g. the folder of results doesn't exist before the first run
+            logger.warning(f'[*] Cached results are not available: {e}')
+            return outputs
+
+        if isinstance(importer, FileSystemResultsImporter):
+            indexed = self._load_indexed(importer, target_version)
+            if indexed is not None:
+                return indexed
+
+        found = {}  # type: Dict[str, List[BenchmarkOutput]]
+        for report in importer.import_suites():
+            if _get_target_version(report.suite.metadata) != target_version:
+                continue
+
+            for output in importer.import_results(report):
+                # NB: outputs linked by suites from the cache are taken only from the suite that ran them
+                if str(output.suite_id) != str(report.suite.id):
+                    continue
+                key = getattr(output, 'result_key', None)
+                if key and self.is_fresh(output):
+                    found.setdefault(key, []).append(output)
+
+        for key, items in found.items():
+            items.sort(key=lambda item: item.start_time or datetime.min, reverse=True)
+            outputs[key] = items
+        return outputs
+
+    def get_outputs(self, target_version: str) -> Dict[str, List[StoredOutput]]:
+        """Returns fresh stored outputs of suites run against the given version of the target, or functions loading
+        them, by result key, most recent first; they are selected once."""
+        target_version = str(target_version)
+        outputs = self._outputs.get(target_version)
+
+        if outputs is None:
+            with span('load_result_cache'):
+                outputs = self._outputs[target_version] = self._load(target_version)
+        return outputs
+
+    def get(self, result_key: str, target_version: str, repetition: int = 0) -> Optional[BenchmarkOutput]:
+        """Returns the most recent stored output with the given result key, for the given repetition
+        of a benchmark, or None."""
+        outputs = self.get_outputs(target_version).get(result_key)
+        if not outputs or repetition >= len(outputs):
+            return None
+
+        output = outputs[repetition]
+        if not isinstance(output, BenchmarkOutput):
+            with span('load_cached_output'):
+                output = outputs[repetition] = output()
+        return output
+
+    def to_dict(self):
+        return {
+            'importer': self.importer,
+            'max_age': self.max_age
+        }
@@ -1,7 +1,140 @@
+import fnmatch
 from abc import abstractmethod
-from typing import Sequence, Generator
+from datetime import datetime, timezone
+from typing import Sequence, Generator, Optional, Union
 from rocore.registry import Registry
-from wrktoolbox.benchmarks import BenchmarkSuite, BenchmarkOutput
+from rocore.typesutils.dateutils import parse_datetime
+from wrktoolbox.benchmarks import BenchmarkSuite, BenchmarkOutput, PerformanceGoalResult
+from wrktoolbox.hostmetrics import ClientSummary
+from wrktoolbox.collectors import MetricSeries
+
+
+DateType = Union[datetime, str, None]
+
+
+def to_utc(value: DateType) -> Optional[datetime]:
+    """Returns a naive UTC datetime, like the ones of suites and outputs, from a datetime or ISO string."""
+    if value is None or value == '':
+        return None
+    if isinstance(value, str):
+        value = parse_datetime(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def output_from_dict(data: dict) -> BenchmarkOutput:
+    """Creates a benchmark output from its JSON representation, parsing again its raw output when available."""
+    kwargs = dict(test_id=data.get('test_id'),
+                  group=data.get('group'),
+                  parameters=data.get('parameters'),
+                  parent_id=data.get('parent_id'),
+                  probes_ids=data.get('probes_ids'),
+                  client=ClientSummary(**data['client']) if data.get('client') else None,
+                  target_metrics={name: MetricSeries(**item) for name, item in data['target_metrics'].items()}
+                  if data.get('target_metrics') else None,
+                  result_key=data.get('result_key'))
+
+    if data.get('raw_output'):
+        output = BenchmarkOutput.parse('\n'.join(data.get('raw_output')),
+                                       data.get('id'),
+                                       data.get('suite_id'),
+                                       parse_datetime(data.get('start_time')),
+                                       parse_datetime(data.get('end_time')),
+                                       **kwargs)
+    else:
+        # NB: compacted outputs are stored without the raw output of wrk
+        output = BenchmarkOutput.from_dict(data,
+                                           benchmark_id=data.get('id'),
+                                           suite_id=data.get('suite_id'),
+                                           start_time=to_utc(data.get('start_time')),
+                                           end_time=to_utc(data.get('end_time')),
+                                           **kwargs)
+    output.__dict__['goals_results'] = [PerformanceGoalResult(**item) for item in data.get('goals_results') or []]
+    return output
+
+
+# details of stored outputs that scalar metrics don't depend on
+OUTPUT_DETAILS = ('raw_output',
+                  'latency_distribution',
+                  'detailed_percentile_spectrum',
+                  'requests_summary',
+                  'goals_results',
+                  'client',
+                  'target_metrics')
+
+
+def scalar_output_from_dict(data: dict) -> BenchmarkOutput:
+    """Creates a benchmark output with only the scalar values of its JSON representation, like throughput, average
+    and max latency, connections, errors and times; the raw output of wrk is not parsed again, and details like
+    latency distributions and percentile spectra are not read."""
+    return output_from_dict({key: value for key, value in data.items() if key not in OUTPUT_DETAILS})
+
+
+class ResultsFilter:
+    """Criteria selecting the suites and outputs to import: patterns of urls and test ids, locations and ids of
+    suites, and a range of start times. Importers apply them to their source when possible, before loading data."""
+
+    def __init__(self,
+                 urls: Optional[Sequence[str]] = None,
+                 test_ids: Optional[Sequence[str]] = None,
+                 locations: Optional[Sequence[str]] = None,
+                 suites_ids: Optional[Sequence[str]] = None,
+                 since: DateType = None,
+                 until: DateType = None):
+        self.urls = list(urls) if urls else None
+        self.test_ids = list(test_ids) if test_ids else None
+        self.locations = list(locations) if locations else None
+        self.suites_ids = set(suites_ids) if suites_ids else None
+        self.since = to_utc(since)
+        self.until = to_utc(until)
+
+    def __bool__(self):
+        return any(value is not None for value in self.__dict__.values())
+
+    @staticmethod
+    def _match_any(value: Optional[str], patterns: Optional[Sequence[str]]) -> bool:
+        if patterns is None:
+            return True
+        return value is not None and any(fnmatch.fnmatchcase(value, pattern) for pattern in patterns)
+
+    def match_time(self, start_time: DateType, end_time: DateType = None) -> bool:
+        """Returns a value indicating whether a time interval overlaps the range of this filter;
+        unknown times always match."""
+        start_time = to_utc(start_time)
+        end_time = to_utc(end_time) or start_time
+        if self.since is not None and end_time is not None and end_time < self.since:
+            return False
+        if self.until is not None and start_time is not None and start_time > self.until:
+            return False
+        return True
+
+    def match_suite_values(self,
+                           suite_id: Optional[str],
+                           location: Optional[str],
+                           start_time: DateType,
+                           end_time: DateType) -> bool:
+        if self.suites_ids is not None and suite_id not in self.suites_ids:
+            return False
+        if not self._match_any(location, self.locations):
+            return False
+        return self.match_time(start_time, end_time)
+
+    def match_test_id(self, test_id: Optional[str]) -> bool:
+        return self._match_any(test_id, self.test_ids)
+
+    def match_output_values(self, url: Optional[str], test_id: Optional[str], start_time: DateType) -> bool:
+        if not self._match_any(url, self.urls):
+            return False
+        if not self.match_test_id(test_id):
+            return False
+        return self.match_time(start_time)
+
+    def match_suite(self, suite: BenchmarkSuite) -> bool:
+        return self.match_suite_values(str(suite.id), suite.location, suite.start_time, suite.end_time)
+
+    def match_output(self, output: BenchmarkOutput) -> bool:
+        return self.match_output_values(output.url, getattr(output, 'test_id', None), output.start_time)
 
 
 class SuiteReport:
@@ -25,3 +158,7 @@ class ResultsImporter(Registry):
     def import_results(self, report: SuiteReport) -> Generator[BenchmarkOutput, None, None]:
         """Imports the results of a suite."""
 
+    def import_scalar_results(self, report: SuiteReport) -> Generator[BenchmarkOutput, None, None]:
+        """Imports the results of a suite, with at least their scalar values; importers that can skip details of
+        outputs, like their raw output and percentile spectra, override this method."""
+        yield from self.import_results(report)
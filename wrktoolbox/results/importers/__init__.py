@@ -1 +1,2 @@
 from .fs import FileSystemResultsImporter, BinResultsImporter, JsonResultsImporter
+from .sqlite import SqliteResultsImporter
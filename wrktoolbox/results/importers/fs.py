@@ -1,26 +1,43 @@
+import os
 import json
 import pickle
 import fnmatch
 from base64 import b64decode
 from abc import abstractmethod
 from pathlib import Path
-from typing import Generator, Optional, Sequence
+from typing import Dict, Generator, List, Optional, Sequence, Set, Tuple
 from rocore.exceptions import InvalidArgument
-from rocore.typesutils.dateutils import parse_datetime
-from wrktoolbox.benchmarks import BenchmarkSuite, PerformanceGoalResult
-from wrktoolbox.results import ResultsImporter, SuiteReport, BenchmarkOutput
+from wrktoolbox.benchmarks import BenchmarkSuite
+from wrktoolbox.results import (ResultsImporter, ResultsFilter, SuiteReport, BenchmarkOutput, DateType, output_from_dict,
+                                scalar_output_from_dict)
+from wrktoolbox.stores.fs import INDEX_FILE_NAME, parse_file_name
+from wrktoolbox.stores.segments import is_segment, read_segment_header, read_segment_outputs
+from wrktoolbox.compression import open_file, strip_extension
+from wrktoolbox.tracing import span
 
 
 class FileSystemResultsImporter(ResultsImporter):
-    """Base class for importers that can read results from file system"""
+    """Base class for importers that can read results from file system. Files are selected using index files
+    written by stores and, for files not indexed, their names; only selected files are opened and parsed."""
+
+    # whether segments written by the compact command are read
+    reads_segments = False
 
     def __init__(self,
                  root_folder: str,
-                 filter_urls: Optional[Sequence[str]] = None):
+                 filter_urls: Optional[Sequence[str]] = None,
+                 filter_test_ids: Optional[Sequence[str]] = None,
+                 filter_locations: Optional[Sequence[str]] = None,
+                 filter_suites: Optional[Sequence[str]] = None,
+                 since: DateType = None,
+                 until: DateType = None):
         self._root_path = None
+        self._files = None  # type: Optional[List[Tuple[Path, Optional[dict]]]]
+        self._segments = {}  # type: Dict[Path, dict]
         self.root_path = root_folder
         self._ext_glob_pattern = '*' + self.get_file_extension()
         self.filter_urls = list(filter_urls) if filter_urls else None
+        self.filter = ResultsFilter(filter_urls, filter_test_ids, filter_locations, filter_suites, since, until)
 
     @property
     def root_path(self) -> Path:
@@ -37,6 +54,8 @@ class FileSystemResultsImporter(ResultsImporter):
             raise InvalidArgument('given root path is not a directory')
 
         self._root_path = root_path
+        self._files = None
+        self._segments = {}
 
     @abstractmethod
     def parse_suite(self, data: str) -> SuiteReport:
@@ -51,52 +70,173 @@ class FileSystemResultsImporter(ResultsImporter):
         """Returns the handled files extension"""
 
     def _load_suite(self, item: Path) -> SuiteReport:
-        with open(str(item), mode='rt', encoding='utf8') as file:
-            return self.parse_suite(file.read())
-
-    def _load_output(self, item: Path) -> BenchmarkOutput:
-        with open(str(item), mode='rt', encoding='utf8') as file:
-            return self.parse_output(file.read())
-
-    def _suites_from_dir(self, folder_path: Path) -> Generator[SuiteReport, None, None]:
-        for item in folder_path.iterdir():
-            if item.is_symlink():
+        with span('import_suite', importer=self.get_class_name()):
+            with open_file(str(item), 'rt') as file:
+                return self.parse_suite(file.read())
+
+    def parse_scalar_output(self, data: str) -> BenchmarkOutput:
+        """Parses an output with at least its scalar values; by default, the whole output is parsed."""
+        return self.parse_output(data)
+
+    def _load_output(self, item: Path, scalar: bool = False) -> BenchmarkOutput:
+        with span('import_output', importer=self.get_class_name()):
+            with open_file(str(item), 'rt') as file:
+                data = file.read()
+            return self.parse_scalar_output(data) if scalar else self.parse_output(data)
+
+    def load_output(self, path: Path, position: Optional[int] = None) -> BenchmarkOutput:
+        """Loads the output of a file, or the output at the given position of the index of a segment."""
+        if position is None:
+            return self._load_output(path)
+
+        data = next(read_segment_outputs(str(path), [position]))
+        with span('import_output', importer=self.get_class_name()):
+            return output_from_dict(data)
+
+    @staticmethod
+    def _read_index(folder_path: str) -> Dict[str, dict]:
+        entries = {}
+        try:
+            with open(os.path.join(folder_path, INDEX_FILE_NAME), mode='rt', encoding='utf8') as index_file:
+                for line in index_file:
+                    try:
+                        entry = json.loads(line)
+                        entries[os.path.join(folder_path, *entry['file'].split('/'))] = entry
+                    except (ValueError, KeyError, TypeError, AttributeError):
+                        # NB: a line might be incomplete, if a store is writing it
+                        continue
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def _files_from_dir(self,
+                        folder_path: str,
+                        index: Dict[str, dict]) -> Generator[Tuple[Path, Optional[dict]], None, None]:
+        with os.scandir(folder_path) as items:
+            items = list(items)
+
+        if any(item.name == INDEX_FILE_NAME for item in items):
+            index = dict(index, **self._read_index(folder_path))
+
+        for item in items:
+            if item.is_symlink() or item.name == INDEX_FILE_NAME:
                 continue
 
             if item.is_dir():
-                yield from self._suites_from_dir(item)
-
-            if 'suite' in item.name:
-                yield self._load_suite(item)
-        return
+                yield from self._files_from_dir(item.path, index)
+            else:
+                yield Path(item.path), index.get(item.path)
+
+    def get_files(self) -> List[Tuple[Path, Optional[dict]]]:
+        """Returns the files under the root folder, with their entries in index files written by stores;
+        the folder is scanned once."""
+        if self._files is None:
+            self._files = list(self._files_from_dir(str(self.root_path), {}))
+        return self._files
+
+    def _get_segment_header(self, path: Path) -> dict:
+        header = self._segments.get(path)
+        if header is None:
+            header = self._segments[path] = read_segment_header(str(path))
+        return header
+
+    def _suite_from_segment(self, path: Path) -> Optional[SuiteReport]:
+        suite = self._get_segment_header(path)['suite']
+        if not self.filter.match_suite_values(suite.get('id'),
+                                              suite.get('location'),
+                                              suite.get('start_time'),
+                                              suite.get('end_time')):
+            return None
+
+        with span('import_suite', importer=self.get_class_name()):
+            return SuiteReport(BenchmarkSuite.from_dict(suite))
+
+    def _results_from_segment(self,
+                              path: Path,
+                              benchmarks_ids: Set[str],
+                              scalar: bool = False) -> Generator[BenchmarkOutput, None, None]:
+        positions = [position for position, entry in enumerate(self._get_segment_header(path)['outputs'])
+                     if entry.get('id') in benchmarks_ids
+                     and self.filter.match_output_values(entry.get('url'), entry.get('test_id'), entry.get('start_time'))]
+        if not positions:
+            return
+
+        for data in read_segment_outputs(str(path), positions):
+            with span('import_output', importer=self.get_class_name()):
+                result = scalar_output_from_dict(data) if scalar else output_from_dict(data)
+            if self._should_import(result):
+                yield result
+
+    def _suites_from_dir(self) -> Generator[SuiteReport, None, None]:
+        item = self.filter
+
+        for path, entry in self.get_files():
+            if self.reads_segments and is_segment(path.name):
+                report = self._suite_from_segment(path)
+                if report is not None and item.match_suite(report.suite):
+                    yield report
+                continue
 
-    def _should_import(self, item: BenchmarkOutput) -> bool:
-        if self.filter_urls:
-            return any(fnmatch.fnmatch(item.url, pattern) for pattern in self.filter_urls)
-        return True
+            if entry is not None:
+                if entry.get('kind') != 'suite' or not item.match_suite_values(entry.get('id'),
+                                                                              entry.get('location'),
+                                                                              entry.get('start_time'),
+                                                                              entry.get('end_time')):
+                    continue
+            elif 'suite' in path.name:
+                parts = parse_file_name(path.name)
+                if parts is not None and item.suites_ids is not None and parts[1] not in item.suites_ids:
+                    continue
+            else:
+                continue
 
-    def _results_from_dir(self, folder_path: Path, report: SuiteReport) -> Generator[BenchmarkOutput, None, None]:
-        benchmarks_ids = report.suite.benchmarks_ids
+            report = self._load_suite(path)
+            if item.match_suite(report.suite):
+                yield report
 
-        for item in folder_path.iterdir():
-            if item.is_symlink():
+    def _should_import(self, item: BenchmarkOutput) -> bool:
+        return self.filter.match_output(item)
+
+    def _should_load(self, path: Path, entry: Optional[dict], benchmarks_ids: Set[str]) -> bool:
+        """Returns a value indicating whether an output file should be loaded, using index entries and file names."""
+        if entry is not None:
+            return entry.get('kind') == 'output' \
+                and entry.get('id') in benchmarks_ids \
+                and self.filter.match_output_values(entry.get('url'), entry.get('test_id'), entry.get('start_time'))
+
+        parts = parse_file_name(path.name)
+        if parts is None:
+            file_name = str(path)
+            return any(benchmark_id in file_name for benchmark_id in benchmarks_ids)
+
+        test_id, output_id = parts
+        if output_id not in benchmarks_ids:
+            return False
+        return self.filter.match_test_id(test_id)
+
+    def _results_from_dir(self, report: SuiteReport, scalar: bool = False) -> Generator[BenchmarkOutput, None, None]:
+        benchmarks_ids = set(report.suite.benchmarks_ids)
+
+        for path, entry in self.get_files():
+            if self.reads_segments and is_segment(path.name):
+                yield from self._results_from_segment(path, benchmarks_ids, scalar)
                 continue
 
-            if item.is_file():
-                file_name = str(item)
-                if fnmatch.fnmatch(file_name, self._ext_glob_pattern) \
-                        and any(benchmark_id in file_name for benchmark_id in benchmarks_ids):
-                    result = self._load_output(item)
-                    if self._should_import(result):
-                        yield result
-            else:
-                yield from self._results_from_dir(item, report)
+            # NB: compressed files are handled like uncompressed ones
+            if fnmatch.fnmatch(strip_extension(path.name), self._ext_glob_pattern) \
+                    and self._should_load(path, entry, benchmarks_ids):
+                result = self._load_output(path, scalar)
+                if self._should_import(result):
+                    yield result
 
     def import_suites(self) -> Generator[SuiteReport, None, None]:
-        yield from self._suites_from_dir(self.root_path)
+        yield from self._suites_from_dir()
 
     def import_results(self, report: SuiteReport) -> Generator[BenchmarkOutput, None, None]:
-        yield from self._results_from_dir(self.root_path, report)
+        yield from self._results_from_dir(report)
+
+    def import_scalar_results(self, report: SuiteReport) -> Generator[BenchmarkOutput, None, None]:
+        yield from self._results_from_dir(report, scalar=True)
 
 
 class BinResultsImporter(FileSystemResultsImporter):
@@ -119,6 +259,8 @@ class JsonResultsImporter(FileSystemResultsImporter):
 
     type_name = 'json'
 
+    reads_segments = True
+
     def get_file_extension(self) -> str:
         return '.json'
 
@@ -127,11 +269,7 @@ class JsonResultsImporter(FileSystemResultsImporter):
         return SuiteReport(BenchmarkSuite.from_dict(suite))
 
     def parse_output(self, data: str) -> BenchmarkOutput:
-        data = json.loads(data)
-        output = BenchmarkOutput.parse('\n'.join(data.get('raw_output')),
-                                       data.get('id'),
-                                       data.get('suite_id'),
-                                       parse_datetime(data.get('start_time')),
-                                       parse_datetime(data.get('end_time')))
-        output.__dict__['goals_results'] = [PerformanceGoalResult(**item) for item in data.get('goals_results')]
-        return output
+        return output_from_dict(json.loads(data))
+
+    def parse_scalar_output(self, data: str) -> BenchmarkOutput:
+        return scalar_output_from_dict(json.loads(data))
@@ -0,0 +1,108 @@
+import os
+import json
+import sqlite3
+from typing import Generator, List, Optional, Sequence, Tuple
+from rocore.exceptions import InvalidArgument
+from wrktoolbox.benchmarks import BenchmarkSuite
+from wrktoolbox.results import ResultsImporter, ResultsFilter, SuiteReport, BenchmarkOutput, DateType, output_from_dict
+from wrktoolbox.tracing import span
+
+
+# NB: SQLite versions before 3.32 support at most 999 parameters in a statement
+MAX_PARAMETERS = 900
+
+
+def _any_glob(column: str, patterns: Sequence[str]) -> Tuple[str, List[str]]:
+    return '(' + ' OR '.join(f'{column} GLOB ?' for _ in patterns) + ')', list(patterns)
+
+
+class SqliteResultsImporter(ResultsImporter):
+    """Imports suites and outputs stored by SqliteBenchmarkOutputStore; filters are applied by queries,
+    using the indexes of tables, so outputs that don't match are never loaded."""
+
+    type_name = 'sqlite'
+
+    def __init__(self,
+                 database: str = 'wrktoolbox.db',
+                 filter_urls: Optional[Sequence[str]] = None,
+                 filter_test_ids: Optional[Sequence[str]] = None,
+                 filter_locations: Optional[Sequence[str]] = None,
+                 filter_suites: Optional[Sequence[str]] = None,
+                 since: DateType = None,
+                 until: DateType = None):
+        if not os.path.isfile(database):
+            raise InvalidArgument('given database does not exist')
+
+        self.database = database
+        self.filter = ResultsFilter(filter_urls, filter_test_ids, filter_locations, filter_suites, since, until)
+
+    def _query(self, sql: str, parameters: Sequence) -> List[Tuple]:
+        connection = sqlite3.connect(f'file:{self.database}?mode=ro', uri=True)
+        try:
+            return connection.execute(sql, list(parameters)).fetchall()
+        finally:
+            connection.close()
+
+    def _get_suites_conditions(self) -> Tuple[List[str], List]:
+        conditions, parameters = [], []
+        item = self.filter
+
+        if item.suites_ids is not None:
+            conditions.append('id IN (' + ', '.join('?' for _ in item.suites_ids) + ')')
+            parameters.extend(sorted(item.suites_ids))
+
+        if item.locations is not None:
+            condition, values = _any_glob('location', item.locations)
+            conditions.append(condition)
+            parameters.extend(values)
+
+        if item.since is not None:
+            conditions.append('(end_time IS NULL OR end_time >= ?)')
+            parameters.append(item.since.isoformat())
+
+        if item.until is not None:
+            conditions.append('(start_time IS NULL OR start_time <= ?)')
+            parameters.append(item.until.isoformat())
+        return conditions, parameters
+
+    def _get_outputs_conditions(self) -> Tuple[List[str], List]:
+        conditions, parameters = [], []
+        item = self.filter
+
+        for column, patterns in (('url', item.urls), ('test_id', item.test_ids)):
+            if patterns is not None:
+                condition, values = _any_glob(column, patterns)
+                conditions.append(condition)
+                parameters.extend(values)
+
+        if item.since is not None:
+            conditions.append('start_time >= ?')
+            parameters.append(item.since.isoformat())
+
+        if item.until is not None:
+            conditions.append('start_time <= ?')
+            parameters.append(item.until.isoformat())
+        return conditions, parameters
+
+    def import_suites(self) -> Generator[SuiteReport, None, None]:
+        conditions, parameters = self._get_suites_conditions()
+        where = ' WHERE ' + ' AND '.join(conditions) if conditions else ''
+
+        for data, in self._query(f'SELECT data FROM suites{where} ORDER BY start_time', parameters):
+            with span('import_suite', importer=self.get_class_name()):
+                yield SuiteReport(BenchmarkSuite.from_dict(json.loads(data)))
+
+    def import_results(self, report: SuiteReport) -> Generator[BenchmarkOutput, None, None]:
+        conditions, parameters = self._get_outputs_conditions()
+        benchmarks_ids = list(report.suite.benchmarks_ids)
+        batch_size = MAX_PARAMETERS - len(parameters)
+
+        # NB: outputs are selected by id, since suites can reference outputs of other suites
+        for index in range(0, len(benchmarks_ids), batch_size):
+            batch = benchmarks_ids[index:index + batch_size]
+            where = ' AND '.join(['id IN (' + ', '.join('?' for _ in batch) + ')'] + conditions)
+
+            for data, in self._query(f'SELECT data FROM outputs WHERE {where} ORDER BY start_time',
+                                     batch + parameters):
+                with span('import_output', importer=self.get_class_name()):
+                    yield output_from_dict(json.loads(data))
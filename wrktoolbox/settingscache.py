@@ -0,0 +1,97 @@
+"""On-disk cache of settings downloaded over HTTP. Cached copies are used without requests while younger than
+a configurable max-age, then revalidated with conditional requests (ETag and Last-Modified); they are also used
+when the server is unreachable."""
+import os
+import json
+import time
+import hashlib
+from typing import Optional
+
+
+DEFAULT_FOLDER = os.path.join('.wrktoolbox', 'settings')
+
+
+class CachedSettings:
+
+    def __init__(self,
+                 url: str,
+                 content: str,
+                 settings_format: str,
+                 etag: Optional[str] = None,
+                 last_modified: Optional[str] = None,
+                 time: Optional[float] = None):
+        self.url = url
+        self.content = content
+        self.settings_format = settings_format
+        self.etag = etag
+        self.last_modified = last_modified
+        self.time = time
+
+    @property
+    def age(self) -> float:
+        return max(0.0, time.time() - (self.time or 0))
+
+    @property
+    def has_validators(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+    def get_conditional_headers(self):
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def to_dict(self):
+        return self.__dict__.copy()
+
+
+class SettingsCache:
+
+    def __init__(self, folder: str = DEFAULT_FOLDER, max_age: float = 0):
+        """
+        Creates a new instance of SettingsCache.
+
+        :param folder: folder where cached settings are stored
+        :param max_age: seconds during which cached settings are used without revalidation
+        """
+        self.folder = folder
+        self.max_age = max_age
+
+    def get_path(self, url: str) -> str:
+        return os.path.join(self.folder, hashlib.sha256(url.encode('utf8')).hexdigest() + '.json')
+
+    def get(self, url: str) -> Optional[CachedSettings]:
+        try:
+            with open(self.get_path(url), mode='rt', encoding='utf8') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return None
+
+        try:
+            item = CachedSettings(**data)
+        except TypeError:
+            return None
+        # NB: hash collisions are not realistic, but an entry must never be used for another url
+        return item if item.url == url else None
+
+    def is_fresh(self, item: CachedSettings) -> bool:
+        return self.max_age > 0 and item.age < self.max_age
+
+    def set(self, item: CachedSettings):
+        if item.time is None:
+            item.time = time.time()
+
+        os.makedirs(self.folder, exist_ok=True)
+        file_path = self.get_path(item.url)
+        temp_path = f'{file_path}.{os.getpid()}.tmp'
+        with open(temp_path, mode='wt', encoding='utf8') as file:
+            json.dump(item.to_dict(), file)
+        # NB: replace is atomic, agents starting together never read partial entries
+        os.replace(temp_path, file_path)
+
+    def touch(self, item: CachedSettings):
+        """Marks cached settings as validated now."""
+        item.time = time.time()
+        self.set(item)
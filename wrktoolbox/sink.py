@@ -0,0 +1,145 @@
+"""A minimal HTTP server answering every request with a small fixed response, used to measure how many requests
+per second a load generator can produce. Worker processes share the listening port with SO_REUSEPORT,
+where supported, each running an asyncio event loop."""
+import socket
+import asyncio
+import multiprocessing
+from typing import List, Optional
+
+
+RESPONSE = (b'HTTP/1.1 200 OK\r\n'
+            b'Content-Type: text/plain\r\n'
+            b'Content-Length: 2\r\n'
+            b'\r\n'
+            b'OK')
+
+HEADERS_END = b'\r\n\r\n'
+
+
+def supports_reuse_port() -> bool:
+    return hasattr(socket, 'SO_REUSEPORT')
+
+
+class SinkProtocol(asyncio.Protocol):
+    """Answers pipelined HTTP/1.1 requests on a keep-alive connection, skipping request bodies."""
+
+    __slots__ = ('transport', 'buffer', 'body_remaining')
+
+    def __init__(self):
+        self.transport = None
+        self.buffer = b''
+        self.body_remaining = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data: bytes):
+        buffer = self.buffer + data
+        responses = 0
+
+        while True:
+            if self.body_remaining:
+                skipped = min(self.body_remaining, len(buffer))
+                self.body_remaining -= skipped
+                buffer = buffer[skipped:]
+                if self.body_remaining:
+                    break
+
+            index = buffer.find(HEADERS_END)
+            if index < 0:
+                break
+
+            head = buffer[:index]
+            buffer = buffer[index + len(HEADERS_END):]
+            responses += 1
+
+            content_length = head.lower().find(b'\r\ncontent-length:')
+            if content_length >= 0:
+                value = head[content_length + 17:].split(b'\r\n', 1)[0]
+                self.body_remaining = int(value.strip() or 0)
+
+        self.buffer = buffer
+        if responses:
+            self.transport.write(RESPONSE * responses)
+
+
+def _create_socket(host: str, port: int, reuse_port: bool) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    return sock
+
+
+def _serve(host: str, port: int, reuse_port: bool, ready, sock: Optional[socket.socket] = None):
+    if sock is None:
+        sock = _create_socket(host, port, reuse_port)
+    sock.listen(4096)
+    sock.setblocking(False)
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    server = loop.run_until_complete(loop.create_server(SinkProtocol, sock=sock, backlog=4096))
+    ready.set()
+
+    try:
+        loop.run_forever()
+    finally:
+        server.close()
+        loop.close()
+
+
+class SinkServer:
+    """Runs the sink in worker processes; use as a context manager, requests are handled at `url`."""
+
+    def __init__(self, workers: int = 1, host: str = '127.0.0.1', port: int = 0):
+        self.workers = max(1, workers)
+        self.host = host
+        self.port = port
+        self.reuse_port = supports_reuse_port()
+        self._processes: List[multiprocessing.Process] = []
+
+    @property
+    def url(self) -> str:
+        return f'http://{self.host}:{self.port}/'
+
+    def start(self):
+        context = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods()
+                                              else None)
+        # the first socket reserves the port; other workers bind the same port when SO_REUSEPORT is supported
+        sock = _create_socket(self.host, self.port, self.reuse_port)
+        self.port = sock.getsockname()[1]
+        workers = self.workers if self.reuse_port else 1
+
+        try:
+            for index in range(workers):
+                ready = context.Event()
+                process = context.Process(target=_serve,
+                                          args=(self.host, self.port, self.reuse_port, ready,
+                                                sock if index == 0 else None),
+                                          name=f'wrktoolbox-sink-{index}',
+                                          daemon=True)
+                process.start()
+                self._processes.append(process)
+                if not ready.wait(10):
+                    raise RuntimeError('The sink server did not start in time')
+        except Exception:
+            self.stop()
+            raise
+        finally:
+            sock.close()
+
+    def stop(self):
+        for process in self._processes:
+            process.terminate()
+        for process in self._processes:
+            process.join(5)
+        self._processes = []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
@@ -1 +1,2 @@
 from .fs import FileSystemBenchmarkOutputStore, BinFileSystemBenchmarkOutputStore, JsonFileSystemBenchmarkOutputStore
+from .sqlite import SqliteBenchmarkOutputStore
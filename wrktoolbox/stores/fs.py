@@ -1,27 +1,59 @@
 import os
+import re
+import json
 import uuid
 import pickle
 from abc import abstractmethod
 from base64 import b64encode
 from datetime import datetime
+from typing import Optional, Tuple
 from rocore.json import dumps
 from rocore.folders import ensure_folder
 from wrktoolbox.benchmarks import BenchmarkOutputStore, BenchmarkOutput, BenchmarkConfig, BenchmarkSuite
+from wrktoolbox.compression import get_compression, get_extension, open_file
+
+
+# file appended with a JSON line for each stored suite and output, read by importers to select files without parsing
+INDEX_FILE_NAME = 'index.jsonl'
+
+_file_name_pattern = re.compile(r'^(?P<prefix>.*?)-\d{4}-\d{2}-\d{2}-\d{2}-\d{2}-\d{2}-(?P<id>[^.]+)\.')
+
+
+def parse_file_name(name: str) -> Optional[Tuple[str, str]]:
+    """Returns the prefix (test id, or `suite`) and the id of a file written by file system stores,
+    or None if the name has a different format."""
+    match = _file_name_pattern.match(name)
+    if match is None:
+        return None
+    return match.group('prefix'), match.group('id')
+
+
+def _to_text(value) -> Optional[str]:
+    return value.isoformat() if isinstance(value, datetime) else value
 
 
 class FileSystemBenchmarkOutputStore(BenchmarkOutputStore):
-    """Base class for file system stores."""
+    """Base class for file system stores; files can be compressed with gzip, xz or zstd."""
 
-    def __init__(self, output_folder: str = 'out'):
+    def __init__(self, output_folder: str = 'out', compression: Optional[str] = None):
         if output_folder == '$newid':
             output_folder = str(uuid.uuid4())
 
         ensure_folder(output_folder)
         self.output_folder = output_folder
+        self.compression = get_compression(compression)
 
-    def get_file_name(self, prefix: str, suffix: str = '') -> str:
+    def get_file_name(self, prefix: str, suffix: str = '', group: Optional[str] = None) -> str:
         ts = datetime.now().strftime('%Y-%m-%d-%H-%M-%S')
-        return os.path.join(self.output_folder, f'{prefix}-{ts}-{suffix}') + self.get_file_extension()
+        folder = self.output_folder
+
+        if group:
+            # outputs generated by the same matrix are stored together
+            folder = os.path.join(folder, group)
+            ensure_folder(folder)
+
+        return os.path.join(folder, f'{prefix}-{ts}-{suffix}') + self.get_file_extension() \
+            + get_extension(self.compression)
 
     @abstractmethod
     def get_file_extension(self) -> str:
@@ -35,18 +67,45 @@ class FileSystemBenchmarkOutputStore(BenchmarkOutputStore):
     def write_suite(self, suite: BenchmarkSuite):
         """Writes a suite to a string representation"""
 
+    def write_index_entry(self, file_name: str, **values):
+        values['file'] = os.path.relpath(file_name, self.output_folder).replace(os.sep, '/')
+        # NB: lines are small and written with a single call in append mode
+        with open(os.path.join(self.output_folder, INDEX_FILE_NAME), mode='at', encoding='utf8') as index_file:
+            index_file.write(json.dumps(values) + '\n')
+
     def store(self, config: BenchmarkConfig, output: BenchmarkOutput):
-        with open(self.get_file_name(config.test_id, output.id), mode='wt', encoding='utf8') as output_file:
+        file_name = self.get_file_name(config.test_id, output.id, config.group)
+        with open_file(file_name, 'wt', self.compression) as output_file:
             output_file.write(self.write_output(config, output))
 
+        self.write_index_entry(file_name,
+                               kind='output',
+                               id=output.id,
+                               suite_id=str(output.suite_id) if output.suite_id else None,
+                               test_id=config.test_id,
+                               url=output.url,
+                               start_time=_to_text(output.start_time),
+                               end_time=_to_text(output.end_time),
+                               result_key=getattr(output, 'result_key', None))
+
     def store_suite(self, suite: BenchmarkSuite):
-        with open(self.get_file_name('suite', suite.id), mode='wt', encoding='utf8') as output_file:
+        file_name = self.get_file_name('suite', suite.id)
+        with open_file(file_name, 'wt', self.compression) as output_file:
             output_file.write(self.write_suite(suite))
 
+        self.write_index_entry(file_name,
+                               kind='suite',
+                               id=str(suite.id),
+                               location=suite.location,
+                               start_time=_to_text(suite.start_time),
+                               end_time=_to_text(suite.end_time),
+                               target_version=suite.get_target_version())
+
     def to_dict(self):
         return {
             'type': self.get_class_name(),
-            'output_folder': self.output_folder
+            'output_folder': self.output_folder,
+            'compression': self.compression
         }
 
 
@@ -66,14 +125,28 @@ class BinFileSystemBenchmarkOutputStore(FileSystemBenchmarkOutputStore):
 
 
 class JsonFileSystemBenchmarkOutputStore(FileSystemBenchmarkOutputStore):
-    """A file system store that saves data in JSON format."""
+    """A file system store that saves data in JSON format; indentation can be disabled to write compact files."""
     type_name = 'json'
 
+    def __init__(self, output_folder: str = 'out', compression: Optional[str] = None, indent: Optional[int] = 4):
+        super().__init__(output_folder, compression)
+        self.indent = indent or None
+
     def get_file_extension(self) -> str:
         return '.json'
 
+    def _dumps(self, value) -> str:
+        if self.indent is None:
+            return dumps(value, separators=(',', ':'))
+        return dumps(value, indent=self.indent)
+
     def write_output(self, config: BenchmarkConfig, output: BenchmarkOutput) -> str:
-        return dumps(output, indent=4)
+        return self._dumps(output)
 
     def write_suite(self, suite: BenchmarkSuite):
-        return dumps(suite, indent=4)
+        return self._dumps(suite)
+
+    def to_dict(self):
+        data = super().to_dict()
+        data['indent'] = self.indent
+        return data
@@ -0,0 +1,89 @@
+"""Segment files, packing a suite and its outputs in a single file of JSON lines, written by the compact command.
+The first line is a header with the suite and an index of its outputs, used by importers to skip segments and
+outputs that don't match filters; each following line is an output, in the order of the index."""
+import os
+import json
+from typing import Any, Dict, Generator, Iterable, List, Optional, Tuple
+from wrktoolbox.compression import open_file, get_extension, strip_extension
+
+
+SEGMENT_PREFIX = 'segment-'
+SEGMENT_EXTENSION = '.jsonl'
+
+# incremented when the structure of segments changes
+SEGMENT_VERSION = 1
+
+
+def is_segment(file_name: str) -> bool:
+    return file_name.startswith(SEGMENT_PREFIX) and strip_extension(file_name).endswith(SEGMENT_EXTENSION)
+
+
+def get_segment_name(suite_id: str, time_text: str, compression: Optional[str] = None) -> str:
+    return f'{SEGMENT_PREFIX}{time_text}-{suite_id}{SEGMENT_EXTENSION}{get_extension(compression)}'
+
+
+def get_output_entry(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'id': data.get('id'),
+        'test_id': data.get('test_id'),
+        'url': data.get('url'),
+        'start_time': data.get('start_time'),
+        'end_time': data.get('end_time'),
+        'result_key': data.get('result_key'),
+        'compacted': not data.get('raw_output')
+    }
+
+
+def write_segment(file_path: str,
+                  suite: Dict[str, Any],
+                  outputs: Iterable[Dict[str, Any]],
+                  compression: Optional[str] = None):
+    """Writes a segment atomically: readers never see partial segments."""
+    outputs = list(outputs)
+    header = {
+        'kind': 'segment',
+        'version': SEGMENT_VERSION,
+        'suite': suite,
+        'outputs': [get_output_entry(output) for output in outputs]
+    }
+
+    temp_path = f'{file_path}.{os.getpid()}.tmp'
+    try:
+        with open_file(temp_path, 'wt', compression) as file:
+            file.write(json.dumps(header, separators=(',', ':')) + '\n')
+            for output in outputs:
+                file.write(json.dumps(output, separators=(',', ':')) + '\n')
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def read_segment_header(file_path: str) -> Dict[str, Any]:
+    with open_file(file_path, 'rt') as file:
+        return json.loads(file.readline())
+
+
+def read_segment_outputs(file_path: str,
+                         positions: Optional[Iterable[int]] = None) -> Generator[Dict[str, Any], None, None]:
+    """Yields the outputs of a segment, optionally only the ones at the given positions of its index; lines of other
+    outputs are read, since segments can be compressed, but they are not parsed."""
+    wanted = set(positions) if positions is not None else None
+
+    with open_file(file_path, 'rt') as file:
+        file.readline()
+        for position, line in enumerate(file):
+            if wanted is not None:
+                if position not in wanted:
+                    continue
+                wanted.discard(position)
+            yield json.loads(line)
+
+            if wanted is not None and not wanted:
+                return
+
+
+def read_segment(file_path: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    header = read_segment_header(file_path)
+    return header, list(read_segment_outputs(file_path))
@@ -0,0 +1,171 @@
+import sqlite3
+from typing import List, Optional, Tuple
+from rocore.json import dumps
+from wrktoolbox.benchmarks import BenchmarkOutputStore, BenchmarkOutput, BenchmarkConfig, BenchmarkSuite
+from wrktoolbox.metrics import get_metrics, get_percentiles
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS suites (
+    id TEXT PRIMARY KEY,
+    location TEXT,
+    start_time TEXT,
+    end_time TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_suites_location ON suites (location);
+CREATE INDEX IF NOT EXISTS ix_suites_start_time ON suites (start_time);
+
+CREATE TABLE IF NOT EXISTS configurations (
+    output_id TEXT PRIMARY KEY,
+    test_id TEXT,
+    url TEXT,
+    threads INTEGER,
+    concurrency INTEGER,
+    duration INTEGER,
+    responses_per_second INTEGER,
+    data TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS outputs (
+    id TEXT PRIMARY KEY,
+    suite_id TEXT,
+    test_id TEXT,
+    url TEXT,
+    group_name TEXT,
+    start_time TEXT,
+    end_time TEXT,
+    requests_per_second REAL,
+    avg_latency_ms REAL,
+    max_latency_ms REAL,
+    has_errors INTEGER,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_outputs_suite_id ON outputs (suite_id);
+CREATE INDEX IF NOT EXISTS ix_outputs_url ON outputs (url);
+CREATE INDEX IF NOT EXISTS ix_outputs_test_id ON outputs (test_id);
+CREATE INDEX IF NOT EXISTS ix_outputs_start_time ON outputs (start_time);
+
+CREATE TABLE IF NOT EXISTS percentiles (
+    output_id TEXT NOT NULL,
+    percentile REAL NOT NULL,
+    value_ms REAL,
+    PRIMARY KEY (output_id, percentile)
+);
+
+CREATE TABLE IF NOT EXISTS goals_results (
+    output_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    success INTEGER,
+    goal TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (output_id, position)
+);
+"""
+
+
+def to_text(value) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def connect(database: str) -> sqlite3.Connection:
+    connection = sqlite3.connect(database)
+    connection.executescript(SCHEMA)
+    return connection
+
+
+class SqliteBenchmarkOutputStore(BenchmarkOutputStore):
+    """A store that saves suites and outputs in a SQLite database, in tables indexed by suite id, url, test id,
+    location and start time. Outputs are written in batches, in a single transaction, when the suite stops running
+    and when it is stored."""
+
+    type_name = 'sqlite'
+
+    def __init__(self, database: str = 'wrktoolbox.db', batch_size: int = 20):
+        self.database = database
+        self.batch_size = batch_size
+        self._pending = []  # type: List[Tuple[BenchmarkConfig, BenchmarkOutput]]
+
+    def store(self, config: BenchmarkConfig, output: BenchmarkOutput):
+        self._pending.append((config, output))
+
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def store_suite(self, suite: BenchmarkSuite):
+        self.flush(suite)
+
+    def flush(self, suite: Optional[BenchmarkSuite] = None):
+        """Writes pending outputs, and optionally a suite, in a single transaction."""
+        if not self._pending and suite is None:
+            return
+
+        pending, self._pending = self._pending, []
+        connection = connect(self.database)
+        try:
+            with connection:
+                self._write_outputs(connection, pending)
+
+                if suite is not None:
+                    connection.execute('INSERT OR REPLACE INTO suites VALUES (?, ?, ?, ?, ?)',
+                                       (str(suite.id),
+                                        suite.location,
+                                        to_text(suite.start_time),
+                                        to_text(suite.end_time),
+                                        dumps(suite)))
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _write_outputs(connection: sqlite3.Connection, pending: List[Tuple[BenchmarkConfig, BenchmarkOutput]]):
+        if not pending:
+            return
+
+        configurations = []
+        outputs = []
+        percentiles = []
+        goals_results = []
+
+        for config, output in pending:
+            configurations.append((output.id,
+                                   config.test_id,
+                                   config.url,
+                                   config.threads,
+                                   config.concurrency,
+                                   config.duration,
+                                   config.responses_per_second,
+                                   dumps(config)))
+
+            metrics = get_metrics(output)
+            outputs.append((output.id,
+                            output.suite_id,
+                            getattr(output, 'test_id', None),
+                            output.url,
+                            getattr(output, 'group', None),
+                            to_text(output.start_time),
+                            to_text(output.end_time),
+                            metrics.get('requests_per_second'),
+                            metrics.get('avg_latency_ms'),
+                            metrics.get('max_latency_ms'),
+                            int(bool(output.has_errors)),
+                            dumps(output)))
+
+            percentiles.extend((output.id, percentile, value)
+                               for percentile, value in get_percentiles(output).items())
+
+            goals_results.extend((output.id, position, int(bool(result.success)), result.goal, dumps(result))
+                                 for position, result in enumerate(output.goals_results))
+
+        connection.executemany('INSERT OR REPLACE INTO configurations VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                               configurations)
+        connection.executemany('INSERT OR REPLACE INTO outputs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                               outputs)
+        connection.executemany('INSERT OR REPLACE INTO percentiles VALUES (?, ?, ?)', percentiles)
+        connection.executemany('INSERT OR REPLACE INTO goals_results VALUES (?, ?, ?, ?, ?)', goals_results)
+
+    def to_dict(self):
+        return {
+            'type': self.get_class_name(),
+            'database': self.database,
+            'batch_size': self.batch_size
+        }
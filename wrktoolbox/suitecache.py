@@ -0,0 +1,108 @@
+"""Cache of suites created from settings: normalized settings and validated benchmark configurations are pickled,
+keyed by a hash of the settings content, WRKTOOLBOX_ environment variables and the version of wrktoolbox; versions
+of plugins are verified when an entry is loaded. Repeated runs of large generated settings files skip parsing,
+normalization and validation of configurations."""
+import os
+import sys
+import pickle
+import hashlib
+import importlib
+from collections.abc import Mapping
+from typing import Any, Dict, List, Optional, Tuple
+from wrktoolbox import version
+from wrktoolbox.logs import get_app_logger
+
+
+logger = get_app_logger()
+
+DEFAULT_FOLDER = os.path.join('.wrktoolbox', 'suites')
+
+ENV_PREFIX = 'WRKTOOLBOX_'
+
+# incremented when the structure of cache entries changes
+FORMAT_VERSION = 1
+
+
+def get_module_version(name: str) -> str:
+    """Returns the version of a module, if defined, and the modification time and size of its file."""
+    module = importlib.import_module(name)
+    parts = [str(getattr(module, '__version__', ''))]
+    file_path = getattr(module, '__file__', None)
+    if file_path:
+        stat = os.stat(file_path)
+        parts.append(f'{stat.st_mtime_ns}:{stat.st_size}')
+    return ':'.join(parts)
+
+
+def get_plugins_versions(values: Mapping) -> Dict[str, str]:
+    names = [plugin.get('module') if isinstance(plugin, Mapping) else plugin
+             for plugin in values.get('plugins') or []]
+    return {name: get_module_version(name) for name in names if isinstance(name, str)}
+
+
+class SuiteCache:
+
+    def __init__(self, folder: str = DEFAULT_FOLDER, max_entries: int = 16):
+        self.folder = folder
+        self.max_entries = max_entries
+
+    def get_key(self, content: str) -> str:
+        digest = hashlib.sha256()
+        digest.update(f'{FORMAT_VERSION}:{version}:{sys.version_info[0]}.{sys.version_info[1]}\n'.encode('utf8'))
+        for name in sorted(os.environ):
+            if name.startswith(ENV_PREFIX):
+                digest.update(f'{name}={os.environ[name]}\n'.encode('utf8'))
+        digest.update(content.encode('utf8'))
+        return digest.hexdigest()
+
+    def get_path(self, key: str) -> str:
+        return os.path.join(self.folder, f'{key}.pickle')
+
+    def load(self, key: str) -> Optional[Tuple[Dict[str, Any], List[Any]]]:
+        """Returns the normalized settings and benchmark configurations stored with the given key,
+        or None if they are missing, unreadable or if plugins changed."""
+        try:
+            with open(self.get_path(key), mode='rb') as file:
+                entry = pickle.load(file)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # entries of previous versions might reference types that don't exist anymore
+            logger.debug(f'Ignoring unreadable cached suite {key}', exc_info=True)
+            return None
+
+        if entry.get('format') != FORMAT_VERSION or entry.get('plugins') != get_plugins_versions(entry['values']):
+            return None
+
+        return entry['values'], entry['configurations']
+
+    def save(self, key: str, values: Dict[str, Any], configurations: List[Any]):
+        os.makedirs(self.folder, exist_ok=True)
+        entry = {
+            'format': FORMAT_VERSION,
+            'plugins': get_plugins_versions(values),
+            'values': values,
+            'configurations': configurations
+        }
+
+        file_path = self.get_path(key)
+        temp_path = f'{file_path}.{os.getpid()}.tmp'
+        with open(temp_path, mode='wb') as file:
+            pickle.dump(entry, file, protocol=pickle.HIGHEST_PROTOCOL)
+        # NB: replace is atomic, concurrent runs never read partial entries
+        os.replace(temp_path, file_path)
+
+        self.prune()
+
+    def prune(self):
+        """Deletes the least recently written entries, exceeding the maximum number of entries."""
+        entries = [entry for entry in os.scandir(self.folder) if entry.name.endswith('.pickle')]
+        if len(entries) <= self.max_entries:
+            return
+
+        entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+        for entry in entries[self.max_entries:]:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,131 @@
+"""Spans measuring phases of wrktoolbox itself, written as Chrome trace events (chrome://tracing, Perfetto).
+When tracing is disabled, `span` returns a shared no-op context manager."""
+import os
+import json
+import threading
+from time import perf_counter
+from logging import Logger
+from typing import Dict, List, Optional
+
+
+class _NoopSpan:
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+
+    __slots__ = ('tracer', 'name', 'category', 'args', 'start')
+
+    def __init__(self, tracer: 'Tracer', name: str, category: str, args: Dict):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        end = perf_counter()
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer.add(self.name, self.category, self.start, end, self.args)
+        return False
+
+
+class SpanSummary:
+
+    def __init__(self, name: str, count: int, total_ms: float, max_ms: float):
+        self.name = name
+        self.count = count
+        self.total_ms = total_ms
+        self.max_ms = max_ms
+
+    def to_dict(self):
+        return self.__dict__.copy()
+
+
+class Tracer:
+    """Collects complete trace events; times are relative to the creation of the tracer."""
+
+    def __init__(self):
+        self.origin = perf_counter()
+        self.events = []  # type: List[Dict]
+        self._pid = os.getpid()
+
+    def span(self, name: str, category: str = 'wrktoolbox', **args) -> Span:
+        return Span(self, name, category, args)
+
+    def add(self, name: str, category: str, start: float, end: float, args: Optional[Dict] = None):
+        event = {
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': round((start - self.origin) * 1e6, 1),
+            'dur': round((end - start) * 1e6, 1),
+            'pid': self._pid,
+            'tid': threading.get_ident()
+        }
+        if args:
+            event['args'] = {key: str(value) for key, value in args.items()}
+        # list.append is atomic, spans can be closed by concurrent threads
+        self.events.append(event)
+
+    def get_summary(self) -> List[SpanSummary]:
+        """Returns the count, total and max duration of spans by name, sorted by total duration."""
+        totals = {}
+        for event in self.events:
+            duration = event['dur'] / 1000
+            count, total, maximum = totals.get(event['name'], (0, 0.0, 0.0))
+            totals[event['name']] = (count + 1, total + duration, max(maximum, duration))
+
+        return sorted((SpanSummary(name, count, round(total, 3), round(maximum, 3))
+                       for name, (count, total, maximum) in totals.items()),
+                      key=lambda item: item.total_ms,
+                      reverse=True)
+
+    def write(self, file_path: str):
+        with open(file_path, mode='wt', encoding='utf8') as file:
+            json.dump({'traceEvents': self.events, 'displayTimeUnit': 'ms'}, file)
+
+    def log_summary(self, logger: Logger):
+        wall_ms = (perf_counter() - self.origin) * 1000
+        logger.info(f'Trace summary (wall time {wall_ms:.1f} ms):')
+        for item in self.get_summary():
+            logger.info(f'  {item.name:<40} {item.count:>6}x  total {item.total_ms:>11.3f} ms  '
+                        f'max {item.max_ms:>10.3f} ms  ({item.total_ms / wall_ms:.1%})')
+
+
+_tracer = None  # type: Optional[Tracer]
+
+
+def enable_tracing() -> Tracer:
+    global _tracer
+    _tracer = Tracer()
+    return _tracer
+
+
+def disable_tracing():
+    global _tracer
+    _tracer = None
+
+
+def get_tracer() -> Optional[Tracer]:
+    return _tracer
+
+
+def span(name: str, category: str = 'wrktoolbox', **args):
+    """Returns a context manager measuring a span, when tracing is enabled."""
+    if _tracer is None:
+        return _NOOP_SPAN
+    return _tracer.span(name, category, **args)
@@ -1,26 +1,34 @@
 import ssl
-import certifi
+from functools import lru_cache
 
-SECURE_SSLCONTEXT = ssl.create_default_context(ssl.Purpose.SERVER_AUTH, cafile=certifi.where())
-SECURE_SSLCONTEXT.check_hostname = True
 
-INSECURE_SSLCONTEXT = ssl.SSLContext()
-INSECURE_SSLCONTEXT.check_hostname = False
+ssl_verify = True
 
 
-ssl_verify = True
+@lru_cache(maxsize=None)
+def _get_secure_context() -> ssl.SSLContext:
+    # NB: certifi is imported and its bundle loaded when the first request is sent
+    import certifi
+    context = ssl.create_default_context(ssl.Purpose.SERVER_AUTH, cafile=certifi.where())
+    context.check_hostname = True
+    return context
 
 
-def get_ssl_context() -> ssl.SSLContext:
-    global ssl_verify
+@lru_cache(maxsize=None)
+def _get_insecure_context() -> ssl.SSLContext:
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    return context
 
+
+def get_ssl_context() -> ssl.SSLContext:
     if ssl_verify:
-        return SECURE_SSLCONTEXT
+        return _get_secure_context()
 
-    return INSECURE_SSLCONTEXT
+    return _get_insecure_context()
 
 
 def disable_ssl_verification():
     global ssl_verify
     ssl_verify = False
-
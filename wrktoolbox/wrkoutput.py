@@ -1,125 +1,167 @@
 from uuid import uuid4
 from datetime import datetime
-from typing import Optional, Union
-from pyparsing import Literal, Word, nums, alphanums, OneOrMore, Group, Suppress
-
-
-unit_chars = 'ums'
-decimal_chars = nums + '.'
-bytes_size_chars = 'kKMmGgbB'
-bytes_size_chars_full = decimal_chars + 'kKMmGgbB'
-
-# Latency   196.94ms  183.71ms 944.41ms   89.18%
-latency_pattern = Literal('Latency').suppress() \
-  + Word(decimal_chars).setResultsName('latency') \
-  + Word(unit_chars).setResultsName('latency_unit') \
-  + Word(decimal_chars).setResultsName('stdev') \
-  + Word(unit_chars).setResultsName('stdev_unit') \
-  + Word(decimal_chars).setResultsName('max_value') \
-  + Word(unit_chars).setResultsName('max_unit') \
-  + Word(decimal_chars).setResultsName('stdev_perc') \
-  + Literal('%')
-
-# Running 5s test @ https://foo.org
-head_pattern = Literal("Running").suppress() \
-  + Word(nums).setResultsName('duration') \
-  + Literal('s').setResultsName('duration_unit') \
-  + Literal("test @ ").suppress() \
-  + Word(alphanums + "/-.:?&=%").setResultsName('url')
-
-# 10 threads and 10 connections
-threads_connections_pattern = Word(nums).setResultsName('threads_count') + Literal('threads and').suppress() \
-  + Word(nums).setResultsName('connections_count') + Literal('connections').suppress()
-
-# Req/Sec     7.65      2.98    10.00     71.19%
-req_sec_pattern = Literal('Req/Sec').suppress() \
-  + Word(decimal_chars).setResultsName('req_sec') \
-  + Word(decimal_chars).setResultsName('req_sec_stdev') \
-  + Word(decimal_chars).setResultsName('req_sec_max') \
-  + Word(decimal_chars).setResultsName('req_sec_stdev_perc') + Literal('%')
-
-# 302 requests in 5.07s, 148.32KB read
-# 4294 requests in 30.09s, 2.06MB read
-reqs_count_pattern = Word(nums).setResultsName('reqs_count') \
-                     + Literal('requests').suppress() \
-                     + Literal('in').suppress() \
-  + Word(decimal_chars).setResultsName('seconds_count') + Literal('s,').suppress() \
-  + Word(decimal_chars).setResultsName('total_transfer_read') \
-  + Word(bytes_size_chars).setResultsName('total_transfer_read_unit') \
-  + Literal('read').suppress()
-
-# Requests/sec:     59.61
-reqs_summary_pattern = Literal('Requests/sec:').suppress() \
-  + Word(decimal_chars).setResultsName('reqs_per_second_summary')
-
-# Transfer/sec:     29.28KB
-transfer_summary_pattern = Literal('Transfer/sec:').suppress() \
-  + Word(decimal_chars).setResultsName('transfer_per_second_summary') \
-  + Word(bytes_size_chars).setResultsName('transfer_per_second_summary_unit')
-
-# Latency Distribution
-latency_statistics_pattern = Literal('Latency Distribution').suppress() \
-  + OneOrMore(Group(Word(nums).setResultsName('percentile')
-                    + Literal('%').suppress()
-                    + Word(decimal_chars).setResultsName('value')
-                    + Word(unit_chars).setResultsName('value_unit'))).setResultsName('values')
-
-"""
-  Latency Distribution (HdrHistogram - Recorded Latency)
- 50.000%  129.15ms
- 75.000%  142.46ms
- 90.000%  148.09ms
- 99.000%  873.98ms
- 99.900%  876.54ms
- 99.990%  876.54ms
- 99.999%  876.54ms
-100.000%  876.54ms
-
-"""
-hdrhistogram_pattern = Literal('Latency Distribution (HdrHistogram - Recorded Latency)').suppress() \
-    + OneOrMore(Group(Word(decimal_chars) + Suppress('%')
-                      + Word(decimal_chars).setResultsName('value')
-                      + Word(unit_chars).setResultsName('value_unit'))).setResultsName('values')
-
-"""
-#[Mean    =      161.908, StdDeviation   =      150.488]
-#[Max     =      876.032, Total count    =           80]
-#[Buckets =           27, SubBuckets     =         2048]
-"""
-HASH, LSB, EQUALS, RSB, COMMA = map(Suppress, '#[=],')
-decimal_or_nan = decimal_chars + '-nan' + 'inf'
-detailed_percentile_spectrum_pattern = Literal('Detailed Percentile spectrum:').suppress() \
-    + Literal('Value').suppress() + Literal('Percentile').suppress() \
-    + Literal('TotalCount').suppress() + Literal('1/(1-Percentile)').suppress() \
-    + OneOrMore(Group(Word(decimal_or_nan).setResultsName('value') +
-                      Word(decimal_or_nan).setResultsName('percentile') +
-                      Word(nums).setResultsName('total_count') +
-                      Word(decimal_or_nan).setResultsName('percentile_1_1'))).setResultsName('values') \
-    + HASH + LSB + Suppress('Mean') + EQUALS + Word(decimal_or_nan).setResultsName('mean') \
-    + COMMA + Suppress('StdDeviation') \
-    + EQUALS + Word(decimal_or_nan).setResultsName('standard_deviation') + RSB \
-    + HASH + LSB + Suppress('Max') + EQUALS + Word(decimal_or_nan).setResultsName('max_value') \
-    + COMMA + Suppress('Total count') \
-    + EQUALS + Word(nums).setResultsName('total_count') + RSB \
-    + HASH + LSB + Suppress('Buckets') + EQUALS + Word(decimal_or_nan).setResultsName('buckets') \
-    + COMMA + Suppress('SubBuckets') \
-    + EQUALS + Word(nums).setResultsName('sub_buckets') + RSB
-
-
-comma = Literal(',').suppress()
-
-socket_errors_pattern = Literal('Socket errors: connect').suppress() + Word(nums).setResultsName('connect_errors') \
-  + comma \
-  + Literal('read').suppress() + Word(nums).setResultsName('read_errors') + comma  \
-  + Literal('write').suppress() + Word(nums).setResultsName('write_errors') + comma \
-  + Literal('timeout').suppress() + Word(nums).setResultsName('timeout_errors') \
-
-# Non-2xx or 3xx responses: 2400
-not_successful_responses_pattern = Literal('Non-2xx or 3xx responses:').suppress() \
-                                   + Word(nums).setResultsName('non_2xx_or_3xx_responses_count')
-
-
-start_pattern = head_pattern + threads_connections_pattern
+from functools import lru_cache
+from typing import Optional, Union, List, Dict
+
+
+@lru_cache(maxsize=None)
+def get_patterns() -> Dict[str, object]:
+    """Builds the pyparsing grammars of wrk outputs, by name; since importing pyparsing and building grammars
+    is expensive, this happens only when the first output is parsed."""
+    from pyparsing import Literal, Word, nums, alphanums, OneOrMore, Group, Suppress
+
+    unit_chars = 'ums'
+    decimal_chars = nums + '.'
+    bytes_size_chars = 'kKMmGgbB'
+    bytes_size_chars_full = decimal_chars + 'kKMmGgbB'
+
+    # Latency   196.94ms  183.71ms 944.41ms   89.18%
+    latency_pattern = Literal('Latency').suppress() \
+      + Word(decimal_chars).setResultsName('latency') \
+      + Word(unit_chars).setResultsName('latency_unit') \
+      + Word(decimal_chars).setResultsName('stdev') \
+      + Word(unit_chars).setResultsName('stdev_unit') \
+      + Word(decimal_chars).setResultsName('max_value') \
+      + Word(unit_chars).setResultsName('max_unit') \
+      + Word(decimal_chars).setResultsName('stdev_perc') \
+      + Literal('%')
+
+    # Running 5s test @ https://foo.org
+    head_pattern = Literal("Running").suppress() \
+      + Word(nums).setResultsName('duration') \
+      + Literal('s').setResultsName('duration_unit') \
+      + Literal("test @ ").suppress() \
+      + Word(alphanums + "/-.:?&=%").setResultsName('url')
+
+    # 10 threads and 10 connections
+    threads_connections_pattern = Word(nums).setResultsName('threads_count') + Literal('threads and').suppress() \
+      + Word(nums).setResultsName('connections_count') + Literal('connections').suppress()
+
+    # Req/Sec     7.65      2.98    10.00     71.19%
+    req_sec_pattern = Literal('Req/Sec').suppress() \
+      + Word(decimal_chars).setResultsName('req_sec') \
+      + Word(decimal_chars).setResultsName('req_sec_stdev') \
+      + Word(decimal_chars).setResultsName('req_sec_max') \
+      + Word(decimal_chars).setResultsName('req_sec_stdev_perc') + Literal('%')
+
+    # 302 requests in 5.07s, 148.32KB read
+    # 4294 requests in 30.09s, 2.06MB read
+    reqs_count_pattern = Word(nums).setResultsName('reqs_count') \
+                         + Literal('requests').suppress() \
+                         + Literal('in').suppress() \
+      + Word(decimal_chars).setResultsName('seconds_count') + Literal('s,').suppress() \
+      + Word(decimal_chars).setResultsName('total_transfer_read') \
+      + Word(bytes_size_chars).setResultsName('total_transfer_read_unit') \
+      + Literal('read').suppress()
+
+    # Requests/sec:     59.61
+    reqs_summary_pattern = Literal('Requests/sec:').suppress() \
+      + Word(decimal_chars).setResultsName('reqs_per_second_summary')
+
+    # Transfer/sec:     29.28KB
+    transfer_summary_pattern = Literal('Transfer/sec:').suppress() \
+      + Word(decimal_chars).setResultsName('transfer_per_second_summary') \
+      + Word(bytes_size_chars).setResultsName('transfer_per_second_summary_unit')
+
+    # Latency Distribution
+    latency_statistics_pattern = Literal('Latency Distribution').suppress() \
+      + OneOrMore(Group(Word(nums).setResultsName('percentile')
+                        + Literal('%').suppress()
+                        + Word(decimal_chars).setResultsName('value')
+                        + Word(unit_chars).setResultsName('value_unit'))).setResultsName('values')
+
+    """
+      Latency Distribution (HdrHistogram - Recorded Latency)
+     50.000%  129.15ms
+     75.000%  142.46ms
+     90.000%  148.09ms
+     99.000%  873.98ms
+     99.900%  876.54ms
+     99.990%  876.54ms
+     99.999%  876.54ms
+    100.000%  876.54ms
+
+    """
+    hdrhistogram_pattern = Literal('Latency Distribution (HdrHistogram - Recorded Latency)').suppress() \
+        + OneOrMore(Group(Word(decimal_chars) + Suppress('%')
+                          + Word(decimal_chars).setResultsName('value')
+                          + Word(unit_chars).setResultsName('value_unit'))).setResultsName('values')
+
+    """
+    #[Mean    =      161.908, StdDeviation   =      150.488]
+    #[Max     =      876.032, Total count    =           80]
+    #[Buckets =           27, SubBuckets     =         2048]
+    """
+    HASH, LSB, EQUALS, RSB, COMMA = map(Suppress, '#[=],')
+    decimal_or_nan = decimal_chars + '-nan' + 'inf'
+    detailed_percentile_spectrum_pattern = Literal('Detailed Percentile spectrum:').suppress() \
+        + Literal('Value').suppress() + Literal('Percentile').suppress() \
+        + Literal('TotalCount').suppress() + Literal('1/(1-Percentile)').suppress() \
+        + OneOrMore(Group(Word(decimal_or_nan).setResultsName('value') +
+                          Word(decimal_or_nan).setResultsName('percentile') +
+                          Word(nums).setResultsName('total_count') +
+                          Word(decimal_or_nan).setResultsName('percentile_1_1'))).setResultsName('values') \
+        + HASH + LSB + Suppress('Mean') + EQUALS + Word(decimal_or_nan).setResultsName('mean') \
+        + COMMA + Suppress('StdDeviation') \
+        + EQUALS + Word(decimal_or_nan).setResultsName('standard_deviation') + RSB \
+        + HASH + LSB + Suppress('Max') + EQUALS + Word(decimal_or_nan).setResultsName('max_value') \
+        + COMMA + Suppress('Total count') \
+        + EQUALS + Word(nums).setResultsName('total_count') + RSB \
+        + HASH + LSB + Suppress('Buckets') + EQUALS + Word(decimal_or_nan).setResultsName('buckets') \
+        + COMMA + Suppress('SubBuckets') \
+        + EQUALS + Word(nums).setResultsName('sub_buckets') + RSB
+
+    comma = Literal(',').suppress()
+
+    socket_errors_pattern = Literal('Socket errors: connect').suppress() + Word(nums).setResultsName('connect_errors') \
+      + comma \
+      + Literal('read').suppress() + Word(nums).setResultsName('read_errors') + comma  \
+      + Literal('write').suppress() + Word(nums).setResultsName('write_errors') + comma \
+      + Literal('timeout').suppress() + Word(nums).setResultsName('timeout_errors') \
+
+    # Non-2xx or 3xx responses: 2400
+    not_successful_responses_pattern = Literal('Non-2xx or 3xx responses:').suppress() \
+                                       + Word(nums).setResultsName('non_2xx_or_3xx_responses_count')
+
+    start_pattern = head_pattern + threads_connections_pattern
+
+    return {
+        'latency_pattern': latency_pattern,
+        'head_pattern': head_pattern,
+        'threads_connections_pattern': threads_connections_pattern,
+        'req_sec_pattern': req_sec_pattern,
+        'reqs_count_pattern': reqs_count_pattern,
+        'reqs_summary_pattern': reqs_summary_pattern,
+        'transfer_summary_pattern': transfer_summary_pattern,
+        'latency_statistics_pattern': latency_statistics_pattern,
+        'hdrhistogram_pattern': hdrhistogram_pattern,
+        'detailed_percentile_spectrum_pattern': detailed_percentile_spectrum_pattern,
+        'socket_errors_pattern': socket_errors_pattern,
+        'not_successful_responses_pattern': not_successful_responses_pattern,
+        'start_pattern': start_pattern
+    }
+
+
+def __getattr__(name: str):
+    # grammars are module attributes, like when they were built at import time
+    if name.endswith('_pattern') and name in get_patterns():
+        return get_patterns()[name]
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+class LazyPattern:
+    """Class attribute returning a grammar by name, built on first access."""
+
+    __slots__ = ('name', 'value')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.value = None
+
+    def __get__(self, instance, owner):
+        if self.value is None:
+            self.value = get_patterns()[self.name]
+        return self.value
 
 
 class ParseFailure:
@@ -159,6 +201,17 @@ class Result:
     def to_dict(self):
         return self.__dict__.copy()
 
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(**data)
+
+
+def _result_from_dict(result_type, data):
+    """Creates a result from its dictionary representation; None and parse failures are returned as None."""
+    if not isinstance(data, dict) or 'exception_message' in data:
+        return None
+    return result_type.from_dict(data)
+
 
 class ValueResult(Result):
 
@@ -166,6 +219,10 @@ class ValueResult(Result):
         self.value = value
         self.unit = unit.lower()
 
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(data['value'], data['unit'])
+
     def __repr__(self):
         return f'{self.value}{self.unit}'
 
@@ -192,7 +249,7 @@ class TimeResult(ValueResult):
 
 class SocketErrorsResult(Result):
 
-    pattern = socket_errors_pattern
+    pattern = LazyPattern('socket_errors_pattern')
 
     def __init__(self,
                  connect_errors,
@@ -207,7 +264,7 @@ class SocketErrorsResult(Result):
 
 class LatencyResult(Result):
 
-    pattern = latency_pattern
+    pattern = LazyPattern('latency_pattern')
 
     def __init__(self,
                  latency,
@@ -222,11 +279,18 @@ class LatencyResult(Result):
         self.max = TimeResult(float(max_value), max_unit)
         self.stdev_perc = float(stdev_perc)
 
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(data['avg']['value'], data['avg']['unit'],
+                   data['stdev']['value'], data['stdev']['unit'],
+                   data['max']['value'], data['max']['unit'],
+                   data['stdev_perc'])
+
 
 class LatencyDistributionResult(Result):
     """wrk latency distribution output"""
 
-    pattern = latency_statistics_pattern
+    pattern = LazyPattern('latency_statistics_pattern')
 
     def __init__(self, values):
         percentiles = {}
@@ -234,6 +298,10 @@ class LatencyDistributionResult(Result):
             percentiles[float(percentile)] = TimeResult(float(value), value_unit)
         self.percentiles = percentiles
 
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls([(percentile, value['value'], value['unit']) for percentile, value in data['percentiles'].items()])
+
     def __eq__(self, other):
         if isinstance(other, LatencyDistributionResult):
             return self.percentiles == other.percentiles
@@ -253,7 +321,7 @@ class LatencyDistributionResult(Result):
 class HdrHistogramLatencyDistributionResult(LatencyDistributionResult):
     """wrk2 latency distribution output"""
 
-    pattern = hdrhistogram_pattern
+    pattern = LazyPattern('hdrhistogram_pattern')
 
     @staticmethod
     def line_matches(value: str):
@@ -266,7 +334,7 @@ class HdrHistogramLatencyDistributionResult(LatencyDistributionResult):
 
 class RequestsSummaryResult(Result):
 
-    pattern = reqs_summary_pattern
+    pattern = LazyPattern('reqs_summary_pattern')
 
     def __init__(self, reqs_per_second_summary):
         self.reqs_per_second_summary = float(reqs_per_second_summary)
@@ -274,15 +342,19 @@ class RequestsSummaryResult(Result):
 
 class TransferSummaryResult(Result):
 
-    pattern = transfer_summary_pattern
+    pattern = LazyPattern('transfer_summary_pattern')
 
     def __init__(self, transfer_per_second_summary, transfer_per_second_summary_unit):
         self.transfer_per_second_avg = ValueResult(float(transfer_per_second_summary), transfer_per_second_summary_unit)
 
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(data['transfer_per_second_avg']['value'], data['transfer_per_second_avg']['unit'])
+
 
 class RequestsPerSecondResult(Result):
 
-    pattern = req_sec_pattern
+    pattern = LazyPattern('req_sec_pattern')
 
     def __init__(self, req_sec, req_sec_stdev, req_sec_max, req_sec_stdev_perc):
         self.avg = float(req_sec)
@@ -290,20 +362,28 @@ class RequestsPerSecondResult(Result):
         self.max = float(req_sec_max)
         self.stdev_perc = float(req_sec_stdev_perc)
 
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(data['avg'], data['stdev'], data['max'], data['stdev_perc'])
+
 
 class TotalRequestsResult(Result):
 
-    pattern = reqs_count_pattern
+    pattern = LazyPattern('reqs_count_pattern')
 
     def __init__(self, reqs_count, seconds_count, total_transfer_read, total_transfer_read_unit):
         self.requests = int(reqs_count)
         self.seconds = float(seconds_count)
         self.read = ValueResult(float(total_transfer_read), total_transfer_read_unit)
 
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(data['requests'], data['seconds'], data['read']['value'], data['read']['unit'])
+
 
 class NotSuccessfulResponses(Result):
 
-    pattern = not_successful_responses_pattern
+    pattern = LazyPattern('not_successful_responses_pattern')
 
     def __init__(self, non_2xx_or_3xx_responses_count):
         self.non_2xx_or_3xx_responses_count = int(non_2xx_or_3xx_responses_count)
@@ -332,7 +412,7 @@ class DetailedPercentileSpectrumValue(Result):
 
 class DetailedPercentileSpectrum(Result):
 
-    pattern = detailed_percentile_spectrum_pattern
+    pattern = LazyPattern('detailed_percentile_spectrum_pattern')
 
     def __init__(self, values, mean, standard_deviation, max_value, total_count, buckets, sub_buckets):
         self.mean = try_parse(mean, float)
@@ -343,6 +423,17 @@ class DetailedPercentileSpectrum(Result):
         self.sub_buckets = try_parse(sub_buckets, int)
         self.values = [DetailedPercentileSpectrumValue(*value) for value in values]
 
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls([(value['value'], value['percentile'], value['total_count'], value['percentile_1_1'])
+                    for value in data['values']],
+                   data['mean'],
+                   data['standard_deviation'],
+                   data['max'],
+                   data['total_count'],
+                   data['buckets'],
+                   data['sub_buckets'])
+
     @staticmethod
     def line_matches(value: str):
         return 'Detailed Percentile spectrum' in value
@@ -425,7 +516,15 @@ class BenchmarkOutput(Result):
                  total: Optional[TotalRequestsResult] = None,
                  suite_id: Optional[str] = None,
                  start_time: Optional[datetime] = None,
-                 end_time: Optional[datetime] = None):
+                 end_time: Optional[datetime] = None,
+                 test_id: Optional[str] = None,
+                 group: Optional[str] = None,
+                 parameters: Optional[dict] = None,
+                 parent_id: Optional[str] = None,
+                 probes_ids: Optional[List[str]] = None,
+                 client: Optional[Result] = None,
+                 target_metrics: Optional[Dict[str, Result]] = None,
+                 result_key: Optional[str] = None):
         self.id = benchmark_id or str(uuid4())
         self.raw_output = raw_output
         self.url = url
@@ -446,6 +545,14 @@ class BenchmarkOutput(Result):
         self.suite_id = suite_id
         self.start_time = start_time
         self.end_time = end_time
+        self.test_id = test_id
+        self.group = group
+        self.parameters = parameters
+        self.parent_id = parent_id
+        self.probes_ids = probes_ids
+        self.client = client
+        self.target_metrics = target_metrics
+        self.result_key = result_key
 
     def __repr__(self):
         return f'<BenchmarkOutput {self.id} {self.url}>'
@@ -456,12 +563,14 @@ class BenchmarkOutput(Result):
               benchmark_id: Optional[str] = None,
               suite_id: Optional[str] = None,
               start_time: Optional[datetime] = None,
-              end_time: Optional[datetime] = None):
+              end_time: Optional[datetime] = None,
+              **kwargs):
+        """Parses the output of wrk or wrk2; additional keyword arguments are passed to the constructor."""
         if not benchmark_id:
             benchmark_id = str(uuid4())
 
         raw_output = raw_output.strip()
-        head = start_pattern.parseString(raw_output)
+        head = get_patterns()['start_pattern'].parseString(raw_output)
 
         line_match = get_lines(raw_output)
 
@@ -514,10 +623,41 @@ class BenchmarkOutput(Result):
                    total=total,
                    suite_id=suite_id,
                    start_time=start_time,
-                   end_time=end_time)
+                   end_time=end_time,
+                   **kwargs)
+
+    @classmethod
+    def from_dict(cls, data: dict, **kwargs):
+        """Creates an output from its dictionary representation, without parsing the raw output of wrk;
+        used for compacted outputs, stored without it. Additional keyword arguments are passed to the constructor."""
+        requests_summary = data.get('requests_summary')
+        if isinstance(requests_summary, list):
+            # NB: this value is stored in a tuple
+            requests_summary = requests_summary[0] if requests_summary else None
+
+        spectrum = _result_from_dict(DetailedPercentileSpectrum, data.get('detailed_percentile_spectrum'))
+        distribution_type = HdrHistogramLatencyDistributionResult if spectrum is not None \
+            else LatencyDistributionResult
+
+        return cls(raw_output=None,
+                   url=data.get('url'),
+                   threads=data.get('threads'),
+                   connections=data.get('connections'),
+                   latency=_result_from_dict(LatencyResult, data.get('latency')),
+                   duration=_result_from_dict(TimeResult, data.get('duration')),
+                   socket_errors=_result_from_dict(SocketErrorsResult, data.get('socket_errors')),
+                   detailed_percentile_spectrum=spectrum,
+                   not_successful_responses=data.get('not_successful_responses') or 0,
+                   latency_distribution=_result_from_dict(distribution_type, data.get('latency_distribution')),
+                   requests_summary=_result_from_dict(RequestsPerSecondResult, requests_summary),
+                   requests_per_second=data.get('requests_per_second'),
+                   transfer_per_second=_result_from_dict(ValueResult, data.get('transfer_per_second')),
+                   total=_result_from_dict(TotalRequestsResult, data.get('total')),
+                   **kwargs)
 
     def to_dict(self):
         data = super().to_dict()
-        data['raw_output'] = data['raw_output'].splitlines()
+        if data['raw_output'] is not None:
+            data['raw_output'] = data['raw_output'].splitlines()
         return data
 